@@ -0,0 +1,92 @@
+"""
+Bytes on the wire and CPU cost per response for each response encoding.
+
+Usage:
+    python -m benchmarks.encoding [--iterations 500] [--rows 50]
+
+Starts from the JSON body a route sends and applies what the middleware in
+utils.response_encoding does for each negotiated encoding:
+
+    json            the body as it is (no Accept-Encoding)
+    gzip / br       CompressionMiddleware (br only when brotli is installed)
+    msgpack         MsgpackMiddleware, JSON re-encoded as MessagePack
+    msgpack+gzip    both
+
+Reports wire bytes, ratio to JSON, mean time and peak traced memory per response.
+"""
+
+import argparse
+from typing import Callable, Dict, List
+from pydantic_core import to_json
+from utils.response_encoding import brotli, compress, from_json, msgpack
+from benchmarks.serialization import PAYLOADS, measure
+
+
+def encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """
+    Encodings to compare, skipping those whose package is not installed
+
+    Returns:
+        dict: {name: JSON body -> wire bytes}
+    """
+    result = {
+        "json": lambda body: body,
+        "gzip": lambda body: compress(body, "gzip"),
+    }
+    if brotli is not None:
+        result["br"] = lambda body: compress(body, "br")
+    if msgpack is not None:
+        result["msgpack"] = lambda body: msgpack.packb(from_json(body))
+        result["msgpack+gzip"] = lambda body: compress(
+            msgpack.packb(from_json(body)), "gzip"
+        )
+
+    return result
+
+
+def run(iterations: int, rows: int) -> List[dict]:
+    """
+    Measure every encoding on every payload
+
+    Args:
+        iterations (int): Timed calls per measurement
+        rows (int): Rows per response
+
+    Returns:
+        list: One result per payload and encoding
+    """
+    results = []
+
+    for name, (build, _) in PAYLOADS.items():
+        body = to_json(build(rows))
+
+        for encoding, fn in encoders().items():
+            size = len(fn(body))
+            results.append(
+                {
+                    "payload": name,
+                    "encoding": encoding,
+                    "bytes": size,
+                    "ratio": round(size / len(body), 3),
+                    **measure(fn, body, iterations),
+                }
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response encodings")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'payload':<15}{'encoding':<14}{'bytes':>8}{'ratio':>8}{'mean_us':>10}"
+        f"{'peak_kib':>10}"
+    )
+    for result in run(max(args.iterations, 1), max(args.rows, 1)):
+        print(
+            f"{result['payload']:<15}{result['encoding']:<14}{result['bytes']:>8}"
+            f"{result['ratio']:>8}{result['mean_us']:>10}{result['peak_kib']:>10}"
+        )
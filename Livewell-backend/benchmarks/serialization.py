@@ -0,0 +1,204 @@
+"""
+Serialization cost per response for the main response shapes.
+
+Usage:
+    python -m benchmarks.serialization [--iterations 2000] [--rows 50]
+
+Each serializer turns the same rows into JSON bytes, the way a route would:
+
+    generic         jsonable_encoder + json.dumps, routes without a response model
+    response_model  validate + dump_json with the route's model, what FastAPI
+                    does for routes that declare one
+    to_json         pydantic_core.to_json, the pre-serialized responses
+                    (ETag'd tracking ranges, local resources)
+    orjson          orjson.dumps, for reference when orjson is installed
+
+Reports mean time and peak traced memory (tracemalloc) per response.
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from models import Medication, TrackingRecord, Vaccination
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ============================================================================
+# Payloads
+# ============================================================================
+
+
+def medication_rows(count: int) -> List[dict]:
+    return [
+        {
+            "med_id": 1000 + i,
+            "id": "8f14e45f-ceea-467f-a0e6-5b1a3c4d5e6f",
+            "name": f"Medication {i}",
+            "dose_value": 1 + i % 4,
+            "dose_unit": "mg",
+            "frequency_type": "daily",
+            "frequency_time": "08:00",
+            "start_date": "2026-01-01",
+            "durations": 30,
+            "notes": "Take with food" if i % 2 else None,
+            "created_at": "2026-01-01T08:00:00+00:00",
+            "updated_at": "2026-01-02T08:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def vaccination_rows(count: int) -> List[dict]:
+    return [
+        {
+            "vac_id": 2000 + i,
+            "id": "8f14e45f-ceea-467f-a0e6-5b1a3c4d5e6f",
+            "name": f"Vaccination {i}",
+            "dose_date": "2026-03-01",
+            "next_dose_date": "2027-03-01",
+            "location": "Melbourne",
+            "notes": None,
+            "updated_at": "2026-03-01T08:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def tracking_rows(count: int) -> List[dict]:
+    start = date(2026, 1, 1)
+
+    return [
+        {
+            "id": "8f14e45f-ceea-467f-a0e6-5b1a3c4d5e6f",
+            "today_date": (start + timedelta(days=i)).isoformat(),
+            "current_steps": 4000 + i * 10,
+            "current_water_intake_ml": 1200,
+            "target_steps": 8000,
+            "target_water_intake_ml": 2000,
+            "updated_at": "2026-01-01T20:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+PAYLOADS = {
+    "medications": (medication_rows, Medication),
+    "vaccinations": (vaccination_rows, Vaccination),
+    "tracking_data": (tracking_rows, TrackingRecord),
+}
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+
+def serializers(model) -> Dict[str, Callable[[List[dict]], bytes]]:
+    """
+    Serializers to compare for one response model
+
+    Args:
+        model: The route's row model
+
+    Returns:
+        dict: {name: rows -> JSON bytes}
+    """
+    adapter = TypeAdapter(List[model])
+
+    result = {
+        "generic": lambda rows: json.dumps(
+            jsonable_encoder(rows), ensure_ascii=False, separators=(",", ":")
+        ).encode(),
+        "response_model": lambda rows: adapter.dump_json(adapter.validate_python(rows)),
+        "to_json": to_json,
+    }
+    if orjson is not None:
+        result["orjson"] = orjson.dumps
+
+    return result
+
+
+def measure(fn: Callable, arg, iterations: int) -> dict:
+    """
+    Time a call and trace its memory
+
+    Args:
+        fn (Callable): Function to measure
+        arg: Its argument
+        iterations (int): Timed calls
+
+    Returns:
+        dict: {"mean_us", "peak_kib"}
+    """
+    fn(arg)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    elapsed = time.perf_counter() - start
+
+    # Traced separately, tracing slows the timed loop down
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mean_us": round(elapsed / iterations * 1e6, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(iterations: int, rows: int) -> List[dict]:
+    """
+    Measure every serializer on every payload
+
+    Args:
+        iterations (int): Timed calls per measurement
+        rows (int): Rows per response
+
+    Returns:
+        list: One result per payload and serializer
+    """
+    results = []
+
+    for name, (build, model) in PAYLOADS.items():
+        data = build(rows)
+
+        for serializer, fn in serializers(model).items():
+            results.append(
+                {
+                    "payload": name,
+                    "serializer": serializer,
+                    "bytes": len(fn(data)),
+                    **measure(fn, data, iterations),
+                }
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'payload':<15}{'serializer':<16}{'bytes':>8}{'mean_us':>10}{'peak_kib':>10}"
+    )
+    for result in run(max(args.iterations, 1), max(args.rows, 1)):
+        print(
+            f"{result['payload']:<15}{result['serializer']:<16}{result['bytes']:>8}"
+            f"{result['mean_us']:>10}{result['peak_kib']:>10}"
+        )
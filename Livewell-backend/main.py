@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
@@ -15,9 +15,26 @@ from routers import (
     chatbot,
     recommendation,
     local_resources,
+    locations,
+    sync,
+    batch,
 )
 from utils import goal_recommendation
+from utils.dispatch_queue import dispatch_queue
+from utils.notification_outbox import notification_outbox
+from utils.medication_reminders import medication_reminders
+from utils.vaccination_reminders import send_vaccination_reminders
+from utils.device_tokens import prune_stale_tokens
+from utils.local_resource_index import local_resource_index, REFRESH_SECONDS
+from utils.location_autocomplete import location_autocomplete
+from utils.single_flight import single_flight
+from utils.jwt_handler import verify_metrics_token
+from utils.response_encoding import CompressionMiddleware, MsgpackMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Scheduler setup
 scheduler = AsyncIOScheduler()
@@ -25,16 +42,61 @@ scheduler = AsyncIOScheduler()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Weekly recommendations are prepared, stored and queued in one job, started
+    # ahead of Monday morning anywhere in Australia (earliest is 07:00 AEDT =
+    # Sunday 20:00 UTC), the dispatch queue then holds each bucket until
+    # NOTI_LOCAL_HOUR in its time zone
+    scheduler.add_job(
+        goal_recommendation.send_weekly_recommendations,
+        "cron",
+        day_of_week="sun",
+        hour=18,
+        timezone="UTC",
+    )
+    scheduler.add_job(medication_reminders.dispatch_due, "interval", minutes=1)
+    scheduler.add_job(send_vaccination_reminders, "cron", hour=9)
+    scheduler.add_job(prune_stale_tokens, "cron", hour=3)
     scheduler.add_job(
-        goal_recommendation.prepare_recommendation, "cron", day_of_week="mon", hour=0
+        asyncio.to_thread,
+        "interval",
+        args=[local_resource_index.refresh],
+        seconds=REFRESH_SECONDS,
     )
     scheduler.add_job(
-        goal_recommendation.send_fcm_noti, "cron", day_of_week="mon", hour=8
+        asyncio.to_thread,
+        "interval",
+        args=[location_autocomplete.refresh],
+        seconds=REFRESH_SECONDS,
     )
+
+    # Build the medication reminder index before serving
+    try:
+        await asyncio.to_thread(medication_reminders.load)
+    except Exception as e:
+        logger.error(f"Failed to load medication reminders: {e}")
+
+    # Local resources are served from memory
+    try:
+        await asyncio.to_thread(local_resource_index.load)
+    except Exception as e:
+        logger.error(f"Failed to load local resources: {e}")
+
+    try:
+        await asyncio.to_thread(location_autocomplete.load)
+    except Exception as e:
+        logger.error(f"Failed to load suburbs: {e}")
+
+    # Weekly pushes that were stored but not sent before the last shutdown
+    await goal_recommendation.restore_pushes()
+
     scheduler.start()
+    notification_outbox.start()
+    dispatch_queue.start()
     yield
     # Shutdown
     scheduler.shutdown()
+    await dispatch_queue.stop()
+    await notification_outbox.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -48,15 +110,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# MessagePack for clients that ask for it, then brotli / gzip on the way out
+app.add_middleware(MsgpackMiddleware)
+app.add_middleware(CompressionMiddleware)
+
 
 @app.get("/")
 def read_root():
-    return {"Welcome to Livewell Backend"}
+    return ["Welcome to Livewell Backend"]
 
 
 @app.head("/health")
 def read_health():
-    return {"Backend is running"}
+    return ["Backend is running"]
+
+
+@app.get("/metrics")
+async def read_metrics(authorization: str = Header(...)):
+    await verify_metrics_token(authorization)
+
+    return {"single_flight": single_flight.metrics()}
 
 
 # Routers
@@ -69,3 +142,6 @@ app.include_router(vaccinations.router)
 app.include_router(chatbot.router)
 app.include_router(recommendation.router)
 app.include_router(local_resources.router)
+app.include_router(locations.router)
+app.include_router(sync.router)
+app.include_router(batch.router)
@@ -0,0 +1,27 @@
+-- fcm_tokens: one row per device instead of one row per user.
+-- Needed by utils/device_tokens.py, which upserts on device_token and prunes
+-- on last_seen. Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+-- The user id is no longer unique, a user can have many devices
+alter table fcm_tokens drop constraint if exists fcm_tokens_pkey;
+
+alter table fcm_tokens
+    add column if not exists last_seen timestamptz not null default now();
+
+-- Rows that cannot be keyed, and all but one row per token
+delete from fcm_tokens where device_token is null;
+delete from fcm_tokens a
+    using fcm_tokens b
+    where a.device_token = b.device_token and a.ctid < b.ctid;
+
+-- Upserts conflict on the device token (a device moving to another account
+-- is reassigned, not duplicated)
+alter table fcm_tokens add primary key (device_token);
+
+-- Lookups by user (get_tokens_for_users, unregister) and the daily prune
+create index if not exists fcm_tokens_id_idx on fcm_tokens (id);
+create index if not exists fcm_tokens_last_seen_idx on fcm_tokens (last_seen);
+
+commit;
@@ -0,0 +1,18 @@
+-- goal_recommendations.notified_at: when the weekly push of a recommendation
+-- was handed to the notification outbox. Rows are stored before their push is
+-- sent, at startup utils/goal_recommendation.py queues again the pushes of
+-- recent rows that are still null, so a restart does not drop them.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+alter table goal_recommendations add column if not exists notified_at timestamptz;
+
+-- Pushes of existing rows were sent by the old in-memory queue, or are too old
+update goal_recommendations set notified_at = now() where notified_at is null;
+
+create index if not exists goal_recommendations_unsent_idx
+    on goal_recommendations (created_at)
+    where notified_at is null;
+
+commit;
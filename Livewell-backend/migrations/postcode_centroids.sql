@@ -0,0 +1,24 @@
+-- postcode_centroids: one point per postcode, for the radius search of
+-- /api/local-resources/nearby (utils/local_resource_index.py). Load it with
+--   python -m utils.local_resource_import centroids.csv --table postcode_centroids
+-- from a CSV with postcode, latitude and longitude columns, e.g. the ABS postal
+-- area centroids. Postcodes without a row answer /nearby with 404.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+create table if not exists postcode_centroids (
+    postcode text primary key,
+    latitude double precision not null check (latitude between -90 and 90),
+    longitude double precision not null check (longitude between -180 and 180),
+    updated_at timestamptz not null default now()
+);
+
+-- The index reload check reads the latest updated_at
+create index if not exists postcode_centroids_updated_at_idx
+    on postcode_centroids (updated_at);
+
+-- Read and written by the backend's service role only
+alter table postcode_centroids enable row level security;
+
+commit;
@@ -0,0 +1,19 @@
+-- recommendation_fingerprints: the inputs and the model's reply of each user's
+-- last weekly recommendation. Read by utils/recommendation_fingerprint.py so
+-- users whose info has not changed reuse the reply instead of a new model call.
+-- Only model replies are stored, users who got local goals have no row.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+create table if not exists recommendation_fingerprints (
+    id uuid primary key references auth.users (id) on delete cascade,
+    fingerprint text not null,
+    recommendation jsonb not null,
+    updated_at timestamptz not null default now()
+);
+
+-- Written by the backend's service role only
+alter table recommendation_fingerprints enable row level security;
+
+commit;
@@ -0,0 +1,24 @@
+-- suburbs: suburb / postcode pairs behind /api/locations/autocomplete
+-- (utils/location_autocomplete.py). Load it with
+--   python -m utils.local_resource_import suburbs.csv --table suburbs
+-- from a CSV with suburb and postcode columns, e.g. the Australia Post postcode
+-- list. The backend reloads the autocomplete index when the table changes.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+create table if not exists suburbs (
+    id bigint generated always as identity primary key,
+    suburb text not null,
+    postcode text not null check (postcode ~ '^[0-9]{4}$'),
+    updated_at timestamptz not null default now(),
+    unique (suburb, postcode)
+);
+
+-- The index reload check reads the latest updated_at
+create index if not exists suburbs_updated_at_idx on suburbs (updated_at);
+
+-- Read and written by the backend's service role only
+alter table suburbs enable row level security;
+
+commit;
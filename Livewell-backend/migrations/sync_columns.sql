@@ -0,0 +1,45 @@
+-- updated_at on the synced tables and the sync_tombstones table.
+-- utils/sync.py pages /api/sync by (updated_at, row key) and returns deleted
+-- rows from sync_tombstones; utils/data_versions.py builds the ETag of the list
+-- GETs from count and latest updated_at; the update routes write updated_at.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+-- Existing rows get the migration time, clients syncing from scratch get them all
+alter table medications
+    add column if not exists updated_at timestamptz not null default now();
+alter table vaccinations
+    add column if not exists updated_at timestamptz not null default now();
+alter table tracking_data
+    add column if not exists updated_at timestamptz not null default now();
+alter table goal_recommendations
+    add column if not exists updated_at timestamptz not null default now();
+
+-- A user's changed rows in sync order, and the latest one for the ETag
+create index if not exists medications_sync_idx
+    on medications (id, updated_at, med_id);
+create index if not exists vaccinations_sync_idx
+    on vaccinations (id, updated_at, vac_id);
+create index if not exists tracking_data_sync_idx
+    on tracking_data (id, updated_at, today_date);
+create index if not exists goal_recommendations_sync_idx
+    on goal_recommendations (id, updated_at, recommend_id);
+
+-- Rows deleted through the API, so clients drop them on their next sync
+create table if not exists sync_tombstones (
+    tombstone_id bigint generated always as identity primary key,
+    id uuid not null references auth.users (id) on delete cascade,
+    collection text not null,
+    row_id text not null,
+    deleted_at timestamptz not null default now()
+);
+
+-- A user's tombstones of one collection in sync order
+create index if not exists sync_tombstones_sync_idx
+    on sync_tombstones (id, collection, deleted_at, row_id);
+
+-- Written by the backend's service role only
+alter table sync_tombstones enable row level security;
+
+commit;
@@ -0,0 +1,16 @@
+-- vaccinations.reminded_at: when the reminder of the current next_dose_date was
+-- queued. utils/vaccination_reminders.py only reads doses where it is null and
+-- sets it once a reminder is queued, the vaccination update routes clear it
+-- when next_dose_date changes.
+-- Run once in the Supabase SQL editor before deploying.
+
+begin;
+
+alter table vaccinations add column if not exists reminded_at timestamptz;
+
+-- The daily job reads doses not reminded about yet, by due date
+create index if not exists vaccinations_unreminded_idx
+    on vaccinations (next_dose_date, vac_id)
+    where reminded_at is null;
+
+commit;
@@ -1,26 +1,68 @@
-from models.med_model import MedicationRequest
-from models.vac_model import VaccinationRequest
+from models.response_model import MessageResponse, RowId
+from models.med_model import (
+    MedicationRequest,
+    MedicationBatchUpdate,
+    Medication,
+    MedicationBatchResult,
+)
+from models.vac_model import (
+    VaccinationRequest,
+    VaccinationBatchUpdate,
+    Vaccination,
+    VaccinationBatchResult,
+)
 from models.tracking_model import (
     UpdateCurrentTrackingRequest,
     UpdateTargetTrackingRequest,
+    TrackingRecord,
 )
 from models.chatbot_model import ChatbotRequest
 from models.goal_recommend_model import (
     GoalDetails,
     RecommendationResponse,
     WeeklyGoal,
+    GoalRecommendation,
 )
+from models.profile_model import Profile
 
-from models.local_resource_model import LocalResource
+from models.local_resource_model import (
+    LocalResource,
+    NearbyLocalResource,
+    PostcodeCentroid,
+    LocalResourceSearchResponse,
+)
+from models.location_model import LocationSuggestion, Suburb
+from models.sync_model import SyncChanges
+from models.batch_model import BatchItem, BatchRequest, BatchResult
 
 __all__ = [
+    "MessageResponse",
+    "RowId",
     "MedicationRequest",
+    "MedicationBatchUpdate",
+    "Medication",
+    "MedicationBatchResult",
     "VaccinationRequest",
+    "VaccinationBatchUpdate",
+    "Vaccination",
+    "VaccinationBatchResult",
     "UpdateCurrentTrackingRequest",
     "UpdateTargetTrackingRequest",
+    "TrackingRecord",
     "ChatbotRequest",
     "GoalDetails",
     "RecommendationResponse",
     "WeeklyGoal",
+    "GoalRecommendation",
+    "Profile",
     "LocalResource",
+    "NearbyLocalResource",
+    "PostcodeCentroid",
+    "LocalResourceSearchResponse",
+    "LocationSuggestion",
+    "Suburb",
+    "SyncChanges",
+    "BatchItem",
+    "BatchRequest",
+    "BatchResult",
 ]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+# Most sub-requests in one batch
+BATCH_MAX_REQUESTS = 20
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str
+    body: Optional[Any] = None
+    # Only Accept, If-None-Match and Idempotency-Key are passed on
+    headers: Optional[Dict[str, str]] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Optional[Any] = None
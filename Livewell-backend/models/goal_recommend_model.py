@@ -1,9 +1,12 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from models.response_model import RowId
 
 
 class GoalDetails(BaseModel):
     target_water_intake_ml: str
     target_steps: str
+    description: Optional[str] = None
 
 
 class WeeklyGoal(BaseModel):
@@ -12,5 +15,16 @@ class WeeklyGoal(BaseModel):
 
 class RecommendationResponse(BaseModel):
     user_id: str
-    device_token: str
+    device_tokens: List[str]
     recommendation: WeeklyGoal
+    timezone: Optional[str] = None
+
+
+class GoalRecommendation(BaseModel):
+    # Other columns (e.g. targets, already_set) are passed through as they are
+    model_config = ConfigDict(extra="allow")
+
+    recommend_id: RowId
+    id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 
 class LocalResource(BaseModel):
@@ -10,3 +10,19 @@ class LocalResource(BaseModel):
     address: str
     postcode: str
     contact_info: str
+
+
+class NearbyLocalResource(LocalResource):
+    distance_km: float
+
+
+class PostcodeCentroid(BaseModel):
+    postcode: str
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class LocalResourceSearchResponse(BaseModel):
+    results: List[LocalResource]
+    facets: Dict[str, int]
+    total: int
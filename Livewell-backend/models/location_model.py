@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class LocationSuggestion(BaseModel):
+    suburb: str
+    postcode: str
+
+
+class Suburb(BaseModel):
+    suburb: str = Field(min_length=1)
+    postcode: str = Field(pattern=r"^\d{4}$")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+from models.response_model import RowId
 
 
 class MedicationRequest(BaseModel):
@@ -11,3 +12,30 @@ class MedicationRequest(BaseModel):
     start_date: str
     durations: Optional[int] = None
     notes: Optional[str] = None
+
+
+class MedicationBatchUpdate(MedicationRequest):
+    med_id: str
+
+
+class Medication(BaseModel):
+    # Stored rows, nullable so older rows still serialize, other columns
+    # (e.g. created_at, updated_at) are passed through as they are
+    model_config = ConfigDict(extra="allow")
+
+    med_id: RowId
+    id: Optional[str] = None
+    name: Optional[str] = None
+    dose_value: Optional[int] = None
+    dose_unit: Optional[str] = None
+    frequency_type: Optional[str] = None
+    frequency_time: Optional[str] = None
+    start_date: Optional[str] = None
+    durations: Optional[int] = None
+    notes: Optional[str] = None
+
+
+class MedicationBatchResult(BaseModel):
+    index: int
+    med_id: RowId
+    status: Literal["created", "updated", "deleted", "not_found"]
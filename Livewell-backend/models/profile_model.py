@@ -0,0 +1,10 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+
+
+class Profile(BaseModel):
+    # users_info columns (e.g. age_range, suburb, postcode) are passed through
+    model_config = ConfigDict(extra="allow")
+
+    user_name: Optional[str] = None
+    email: Optional[str] = None
@@ -0,0 +1,7 @@
+from typing import List, Union
+
+# Success responses are a list holding one message, e.g. ["Medication added successfully"]
+MessageResponse = List[str]
+
+# Key columns, integer or uuid
+RowId = Union[int, str]
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+
+class SyncChanges(BaseModel):
+    changes: List[Dict[str, Any]]
+    deleted: List[str]
+    cursor: Optional[str] = None
+    has_more: bool
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
 
 
 class UpdateCurrentTrackingRequest(BaseModel):
@@ -9,3 +10,15 @@ class UpdateCurrentTrackingRequest(BaseModel):
 class UpdateTargetTrackingRequest(BaseModel):
     target_steps: int
     target_water_intake_ml: int
+
+
+class TrackingRecord(BaseModel):
+    # Other columns (e.g. created_at, updated_at) are passed through as they are
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = None
+    today_date: str
+    current_steps: Optional[int] = None
+    current_water_intake_ml: Optional[int] = None
+    target_steps: Optional[int] = None
+    target_water_intake_ml: Optional[int] = None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+from models.response_model import RowId
 
 
 class VaccinationRequest(BaseModel):
@@ -8,3 +9,27 @@ class VaccinationRequest(BaseModel):
     next_dose_date: Optional[str] = None
     location: Optional[str] = None
     notes: Optional[str] = None
+
+
+class VaccinationBatchUpdate(VaccinationRequest):
+    vac_id: str
+
+
+class Vaccination(BaseModel):
+    # Stored rows, nullable so older rows still serialize, other columns
+    # (e.g. created_at, updated_at) are passed through as they are
+    model_config = ConfigDict(extra="allow")
+
+    vac_id: RowId
+    id: Optional[str] = None
+    name: Optional[str] = None
+    dose_date: Optional[str] = None
+    next_dose_date: Optional[str] = None
+    location: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class VaccinationBatchResult(BaseModel):
+    index: int
+    vac_id: RowId
+    status: Literal["created", "updated", "deleted", "not_found"]
@@ -1,27 +1,47 @@
 from routers.medications import (
     create_medication,
+    get_all_medications,
     get_medication_by_id,
     update_medication,
     delete_medication,
+    create_medications,
+    update_medications,
+    delete_medications,
     MedicationRequest,
+    MedicationBatchUpdate,
 )
 from routers.vaccinations import (
     create_vaccination,
+    get_all_vaccinations,
     get_vaccination_by_id,
     update_vaccination,
     delete_vaccination,
+    create_vaccinations,
+    update_vaccinations,
+    delete_vaccinations,
     VaccinationRequest,
+    VaccinationBatchUpdate,
 )
 
 __all__ = [
     "create_medication",
+    "get_all_medications",
     "get_medication_by_id",
     "update_medication",
     "delete_medication",
+    "create_medications",
+    "update_medications",
+    "delete_medications",
     "MedicationRequest",
+    "MedicationBatchUpdate",
     "create_vaccination",
+    "get_all_vaccinations",
     "get_vaccination_by_id",
     "update_vaccination",
     "delete_vaccination",
+    "create_vaccinations",
+    "update_vaccinations",
+    "delete_vaccinations",
     "VaccinationRequest",
+    "VaccinationBatchUpdate",
 ]
@@ -0,0 +1,216 @@
+import json
+import asyncio
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Header, Body, Request
+from typing import List
+from utils import verify_es256_token, verify_hs256_token
+from utils.response_encoding import MSGPACK_MEDIA_TYPES, msgpack
+from models import BatchRequest, BatchResult
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+# Reads can run alongside each other, anything else runs on its own and in order
+CONCURRENT_METHODS = {"GET", "HEAD"}
+
+# Item headers passed on to its sub-request, they only make sense per request
+FORWARDED_HEADERS = {"accept", "if-none-match", "idempotency-key"}
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def read_body(content: bytes, content_type: str):
+    """
+    Decode a sub-response body to embed it in the batch response
+
+    Args:
+        content (bytes): Sub-response body
+        content_type (str): Sub-response Content-Type
+
+    Returns:
+        The decoded JSON or MessagePack value, None for an empty JSON body,
+        otherwise the body as text (also when it doesn't decode)
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+
+    try:
+        if media_type == "application/json":
+            return json.loads(content) if content else None
+        if media_type in MSGPACK_MEDIA_TYPES and msgpack is not None:
+            return msgpack.unpackb(content)
+    except ValueError:
+        # json.JSONDecodeError and msgpack's errors are ValueErrors
+        pass
+
+    return content.decode(errors="replace")
+
+
+async def dispatch(request: Request, authorization: str, item: dict) -> dict:
+    """
+    Run one sub-request through the app in-process, so it takes the same
+    routes, dependencies and error handling as a normal request
+
+    Args:
+        request (Request): The batch request
+        authorization (str): Authorization header, passed on to the sub-request
+        item (dict): Sub-request (id, method, path, body, headers)
+
+    Returns:
+        dict: {"id", "status", "body"}
+    """
+    url = urlsplit(item["path"])
+
+    if not url.path.startswith("/api/") or url.path.startswith(router.prefix):
+        return {"id": item.get("id"), "status": 400, "body": "Invalid path"}
+
+    body = b"" if item.get("body") is None else json.dumps(item["body"]).encode()
+
+    headers = [
+        (b"authorization", authorization.encode()),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    headers += [
+        (name.lower().encode(), value.encode())
+        for name, value in (item.get("headers") or {}).items()
+        if name.lower() in FORWARDED_HEADERS
+    ]
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": item["method"].upper(),
+        "scheme": request.url.scheme,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "app": request.app,
+    }
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = {"status": 500, "headers": {}, "chunks": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                key.decode().lower(): value.decode()
+                for key, value in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        return {"id": item.get("id"), "status": 500, "body": str(e)}
+
+    content = read_body(
+        b"".join(response["chunks"]), response["headers"].get("content-type", "")
+    )
+
+    return {"id": item.get("id"), "status": response["status"], "body": content}
+
+
+async def run_batch(request: Request, authorization: str, items: List[dict]):
+    """
+    Run sub-requests, consecutive reads concurrently and writes one at a time
+
+    Args:
+        request (Request): The batch request
+        authorization (str): Authorization header
+        items (list): Sub-requests
+
+    Returns:
+        list: Results in request order
+    """
+    results = []
+    group = []
+
+    async def flush():
+        results.extend(
+            await asyncio.gather(
+                *(dispatch(request, authorization, item) for item in group)
+            )
+        )
+        group.clear()
+
+    for item in items:
+        if item["method"].upper() in CONCURRENT_METHODS:
+            group.append(item)
+            continue
+
+        await flush()
+        results.append(await dispatch(request, authorization, item))
+
+    await flush()
+
+    return results
+
+
+# ============================================================================
+# APIs
+# ============================================================================
+
+
+@router.post("/email", response_model=List[BatchResult])
+async def batch_email(
+    request: Request,
+    authorization: str = Header(...),
+    body: BatchRequest = Body(...),
+):
+    """
+    Run many requests in one round trip (email authentication)
+
+    Args:
+        request (Request): The batch request
+        authorization (str): Authorization header (contains jwt token)
+        body (BatchRequest): Sub-requests (method, path, body)
+
+    Returns:
+        list: Results (id, status, body) in request order
+    """
+    await verify_es256_token(authorization)
+
+    return await run_batch(
+        request, authorization, [item.model_dump() for item in body.requests]
+    )
+
+
+@router.post("/google", response_model=List[BatchResult])
+async def batch_google(
+    request: Request,
+    authorization: str = Header(...),
+    body: BatchRequest = Body(...),
+):
+    """
+    Run many requests in one round trip (google authentication)
+
+    Args:
+        request (Request): The batch request
+        authorization (str): Authorization header (contains jwt token)
+        body (BatchRequest): Sub-requests (method, path, body)
+
+    Returns:
+        list: Results (id, status, body) in request order
+    """
+    await verify_hs256_token(authorization)
+
+    return await run_batch(
+        request, authorization, [item.model_dump() for item in body.requests]
+    )
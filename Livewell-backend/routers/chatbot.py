@@ -4,6 +4,7 @@ from fastapi.responses import StreamingResponse
 from google import genai
 from google.genai import types
 from datetime import datetime
+from pydantic import ValidationError
 from utils import init_supabase
 from models import ChatbotRequest
 from routers import *
@@ -26,6 +27,12 @@ tools = types.Tool(
         create_new_vaccination_list_declaration,
         create_update_vaccination_list_declaration,
         create_delete_vaccination_list_declaration,
+        create_new_medication_lists_declaration,
+        create_update_medication_lists_declaration,
+        create_delete_medication_lists_declaration,
+        create_new_vaccination_lists_declaration,
+        create_update_vaccination_lists_declaration,
+        create_delete_vaccination_lists_declaration,
     ]
 )
 
@@ -34,6 +41,60 @@ tools = types.Tool(
 # ============================================================================
 
 
+async def update_lists(
+    payload: dict, items: list, current: dict, key: str, model, update_many
+) -> list:
+    """
+    Merge each item's changes into the user's current row, then update them in
+    one statement. Rows the user doesn't have, and merged rows that fail
+    validation, get their own result instead of failing the whole call.
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        items (list): Changes from Gemini, each with its row key
+        current (dict): {row key: the user's current row}
+        key (str): Row key, "med_id" or "vac_id"
+        model: Batch update model, e.g. MedicationBatchUpdate
+        update_many (Callable): Batch update function, e.g. update_medications
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    results = {}
+    updates = []
+    positions = []
+
+    for index, item in enumerate(items):
+        item = dict(item)
+        row_id = str(item.pop(key, ""))
+
+        if row_id not in current:
+            results[index] = {"index": index, key: row_id, "status": "not_found"}
+            continue
+
+        changes = {field: value for field, value in item.items() if value is not None}
+
+        try:
+            updates.append(model(**{**current[row_id], **changes, key: row_id}))
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                key: row_id,
+                "status": "invalid",
+                "detail": str(e),
+            }
+            continue
+
+        positions.append(index)
+
+    if updates:
+        for result in await update_many(payload, updates):
+            index = positions[result["index"]]
+            results[index] = {**result, "index": index}
+
+    return [results[index] for index in sorted(results)]
+
+
 async def handle_function_calls(
     payload: dict,
     client: genai.Client,
@@ -129,6 +190,78 @@ async def handle_function_calls(
         await delete_vaccination(payload, vac_id)
         response_result = {"result": "Vaccination deleted successfully"}
 
+    elif function_name == "create_new_medication_lists":
+        # Insert several medication lists in one statement
+        med_requests = []
+        for med_args in args.get("medications", []):
+            med_args = dict(med_args)
+            med_args.setdefault("start_date", datetime.now().strftime("%Y-%m-%d"))
+            med_args.setdefault("frequency_time", "08:00")
+            med_requests.append(MedicationRequest(**med_args))
+
+        results = (
+            await create_medications(payload, med_requests) if med_requests else []
+        )
+        response_result = {"result": results}
+
+    elif function_name == "update_medication_lists":
+        # Merge the changes into the current medications, then update in one statement
+        current_meds = {
+            str(med["med_id"]): med for med in await get_all_medications(payload)
+        }
+
+        results = await update_lists(
+            payload,
+            args.get("medications", []),
+            current_meds,
+            "med_id",
+            MedicationBatchUpdate,
+            update_medications,
+        )
+        response_result = {"result": results}
+
+    elif function_name == "delete_medication_lists":
+        # Delete several medication lists in one statement
+        med_ids = [str(med_id) for med_id in args.get("med_ids", [])]
+
+        results = await delete_medications(payload, med_ids) if med_ids else []
+        response_result = {"result": results}
+
+    elif function_name == "create_new_vaccination_lists":
+        # Insert several vaccination records in one statement
+        vac_requests = [
+            VaccinationRequest(**dict(vac_args))
+            for vac_args in args.get("vaccinations", [])
+        ]
+
+        results = (
+            await create_vaccinations(payload, vac_requests) if vac_requests else []
+        )
+        response_result = {"result": results}
+
+    elif function_name == "update_vaccination_lists":
+        # Merge the changes into the current vaccinations, then update in one statement
+        current_vacs = {
+            str(vac["vac_id"]): vac for vac in await get_all_vaccinations(payload)
+        }
+
+        results = await update_lists(
+            payload,
+            args.get("vaccinations", []),
+            current_vacs,
+            "vac_id",
+            VaccinationBatchUpdate,
+            update_vaccinations,
+        )
+        response_result = {"result": results}
+
+    elif function_name == "delete_vaccination_lists":
+        # Delete several vaccination records in one statement
+        vac_ids = [str(vac_id) for vac_id in args.get("vac_ids", [])]
+
+        results = await delete_vaccinations(payload, vac_ids) if vac_ids else []
+        response_result = {"result": results}
+
     if response_result:
         # Send result back to Gemini to get a natural response
         function_response_part = types.Part(
@@ -232,7 +365,7 @@ async def chatbot(payload: dict, body: ChatbotRequest):
 # ============================================================================
 
 
-@router.post("/email")
+@router.post("/email", response_class=StreamingResponse)
 async def chat_google(
     authorization: str = Header(...), body: ChatbotRequest = Body(...)
 ):
@@ -252,7 +385,7 @@ async def chat_google(
     return StreamingResponse(chatbot(payload, body), media_type="text/plain")
 
 
-@router.post("/google")
+@router.post("/google", response_class=StreamingResponse)
 async def chat_google(
     authorization: str = Header(...), body: ChatbotRequest = Body(...)
 ):
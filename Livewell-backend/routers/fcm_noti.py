@@ -1,6 +1,15 @@
 from fastapi import APIRouter, Header, Body, HTTPException
-from utils.jwt_handler import verify_es256_token, verify_hs256_token
+from typing import Dict, Optional, Union
+from utils.jwt_handler import (
+    verify_es256_token,
+    verify_hs256_token,
+    verify_metrics_token,
+)
 from utils import init_supabase
+from utils.notification_outbox import notification_outbox
+from utils.device_tokens import register_token, unregister_token
+from utils.idempotency import idempotency_store
+from models import MessageResponse
 import os
 
 router = APIRouter(prefix="/api/fcm-noti", tags=["fcm-noti"])
@@ -12,7 +21,8 @@ supabase_admin = init_supabase()
 
 def register_device(payload: dict, body: dict):
     """
-    Check and insert the device token to the user's fcm_tokens table
+    Add or refresh the device token in the user's fcm_tokens table,
+    each device of the user keeps its own row
 
     Args:
         Authorization header (contains jwt token) and body dictionary (contains user's device token and type)
@@ -20,14 +30,8 @@ def register_device(payload: dict, body: dict):
     user_id = payload["sub"]
 
     try:
-        # Check and insert to fcm_tokens table
-        supabase_admin.table("fcm_tokens").upsert(
-            {
-                "id": user_id,
-                "device_token": body["device_token"],
-                "platform": body["platform"],
-            }
-        ).execute()
+        # Upsert on device token and refresh last_seen
+        register_token(user_id, body["device_token"], body["platform"])
 
     except Exception as e:
         raise HTTPException(
@@ -35,9 +39,11 @@ def register_device(payload: dict, body: dict):
         )
 
 
-@router.post("/register-device/email")
+@router.post("/register-device/email", response_model=MessageResponse)
 async def register_device_email(
-    authorization: str = Header(...), body: dict = Body(...)
+    authorization: str = Header(...),
+    body: dict = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Register the device token to the user (email)
@@ -52,14 +58,20 @@ async def register_device_email(
     # Verify jwt
     payload = await verify_es256_token(authorization)
 
-    register_device(payload, body)
+    def register():
+        register_device(payload, body)
+        return ["Device token registered successfully"]
 
-    return {"Device token registered successfully"}
+    return await idempotency_store.run(
+        payload["sub"], "register-device", idempotency_key, body, register
+    )
 
 
-@router.post("/register-device/google")
+@router.post("/register-device/google", response_model=MessageResponse)
 async def register_device_google(
-    authorization: str = Header(...), body: dict = Body(...)
+    authorization: str = Header(...),
+    body: dict = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Register the device token to the user (google)
@@ -73,23 +85,29 @@ async def register_device_google(
     # Verify jwt
     payload = await verify_hs256_token(authorization)
 
-    register_device(payload, body)
+    def register():
+        register_device(payload, body)
+        return ["Device token registered successfully"]
 
-    return {"Device token registered successfully"}
+    return await idempotency_store.run(
+        payload["sub"], "register-device", idempotency_key, body, register
+    )
 
 
-def unregister_device(payload: dict):
+def unregister_device(payload: dict, body: Optional[dict] = None):
     """
     Deleted the device token from the user's fcm_tokens table
 
-    Args: Authorization header (contains jwt token)
+    Args: Authorization header (contains jwt token) and optional body dictionary
+        (contains the device token, all of the user's devices are removed without it)
     Returns: Success message
     """
     user_id = payload["sub"]
+    device_token = (body or {}).get("device_token")
 
     try:
         # Delete from fcm_tokens table
-        supabase_admin.table("fcm_tokens").delete().eq("id", user_id).execute()
+        unregister_token(user_id, device_token)
 
     except Exception as e:
         raise HTTPException(
@@ -97,13 +115,15 @@ def unregister_device(payload: dict):
         )
 
 
-@router.post("/unregister-device/email")
-async def unregister_device_email(authorization: str = Header(...)):
+@router.post("/unregister-device/email", response_model=MessageResponse)
+async def unregister_device_email(
+    authorization: str = Header(...), body: Optional[dict] = Body(None)
+):
     """
     Unregister the device token from the user (email)
 
     Args:
-        Authorization header (contains jwt token)
+        Authorization header (contains jwt token) and optional body dictionary (contains user's device token)
     Returns:
         Success message
     """
@@ -111,18 +131,20 @@ async def unregister_device_email(authorization: str = Header(...)):
     # Verify jwt
     payload = await verify_es256_token(authorization)
 
-    unregister_device(payload)
+    unregister_device(payload, body)
 
-    return {"Device token unregistered successfully"}
+    return ["Device token unregistered successfully"]
 
 
-@router.post("/unregister-device/google")
-async def unregister_device_google(authorization: str = Header(...)):
+@router.post("/unregister-device/google", response_model=MessageResponse)
+async def unregister_device_google(
+    authorization: str = Header(...), body: Optional[dict] = Body(None)
+):
     """
     Unregister the device token from the user (google)
 
     Args:
-        Authorization header (contains jwt token)
+        Authorization header (contains jwt token) and optional body dictionary (contains user's device token)
     Returns:
         Success message
     """
@@ -130,6 +152,22 @@ async def unregister_device_google(authorization: str = Header(...)):
     # Verify jwt
     payload = await verify_hs256_token(authorization)
 
-    unregister_device(payload)
+    unregister_device(payload, body)
+
+    return ["Device token unregistered successfully"]
+
+
+@router.get("/metrics", response_model=Dict[str, Optional[Union[int, float]]])
+async def get_notification_metrics(authorization: str = Header(...)):
+    """
+    Get notification outbox metrics
+
+    Args:
+        Authorization header (contains the operator's METRICS_TOKEN)
+    Returns:
+        Queue depth, delivery counters and send latency
+    """
+
+    await verify_metrics_token(authorization)
 
-    return {"Device token unregistered successfully"}
+    return notification_outbox.metrics()
@@ -23,7 +23,7 @@ firebase_admin.initialize_app(cred)
 load_dotenv()
 
 
-@router.post("")
+@router.post("", response_model=str)
 async def google_auth(token: str = Body(..., embed=True)):
     """
     Verifies the Google ID token and use it to look up for the uuid in firebase.
@@ -1,40 +1,79 @@
-from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from typing import Optional, List
-from utils import init_supabase, verify_es256_token, verify_hs256_token
-from models import LocalResource
+from utils import verify_es256_token, verify_hs256_token
+from utils.local_resource_index import MAX_RADIUS_KM, local_resource_index
+from utils.data_versions import etag_matches
+from models import LocalResource, NearbyLocalResource, LocalResourceSearchResponse
 
 router = APIRouter(prefix="/api/local-resources", tags=["local-resources"])
 
-# Init supabase admin
-supabase_admin = init_supabase()
-
 
 # ============================================================================
 # Functions
 # ============================================================================
 
 
-async def get_local_resources_list(postcode: str):
+async def get_local_resources_list(
+    postcode: str,
+    category: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+):
     """
-    Get all local resources
+    Get all local resources, served from the in-memory index
 
     Args:
         postcode (str): Postcode
+        category (str): Optional category filter
+        if_none_match (str): If-None-Match header
 
     Returns:
-        list: List of local resources
+        Response: Pre-serialized list of local resources, or 304 if unchanged
+    """
+    etag, body = local_resource_index.get(postcode, category)
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+async def get_nearby_local_resources(
+    postcode: str, radius_km: float, category: Optional[str] = None
+):
+    """
+    Get local resources within a radius of a postcode, nearest first
+
+    Args:
+        postcode (str): Postcode
+        radius_km (float): Search radius in km
+        category (str): Optional category filter
+
+    Returns:
+        list: List of local resources with their distance
+    """
+    results = local_resource_index.nearby(postcode, radius_km, category)
+
+    if results is None:
+        raise HTTPException(status_code=404, detail=f"Unknown postcode: {postcode}")
+
+    return results
+
+
+async def search_local_resources(
+    q: str, category: Optional[str] = None, limit: int = 20
+):
     """
-    try:
-        response = (
-            supabase_admin.table("local_resources")
-            .select("*")
-            .eq("postcode", postcode)
-            .execute()
-        )
+    Search local resources by keyword, served from the in-memory index
 
-        return response.data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    Args:
+        q (str): Search text
+        category (str): Optional category filter
+        limit (int): Maximum number of results
+
+    Returns:
+        dict: Ranked resources, category facet counts and total matches
+    """
+    return local_resource_index.search(q, category, limit)
 
 
 # ============================================================================
@@ -44,7 +83,10 @@ async def get_local_resources_list(postcode: str):
 
 @router.get("/email", response_model=List[LocalResource])
 async def get_local_resources_email(
-    authorization: str = Header(...), postcode: str = Query(...)
+    authorization: str = Header(...),
+    postcode: str = Query(...),
+    category: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get all local resources for email user
@@ -52,18 +94,23 @@ async def get_local_resources_email(
     Args:
         authorization (str): Authorization header
         postcode (str): Postcode
+        category (str): Optional category filter
+        if_none_match (str): If-None-Match header
 
     Returns:
         list: List of local resources
     """
     await verify_es256_token(authorization)
 
-    return await get_local_resources_list(postcode)
+    return await get_local_resources_list(postcode, category, if_none_match)
 
 
 @router.get("/google", response_model=List[LocalResource])
 async def get_local_resources_google(
-    authorization: str = Header(...), postcode: str = Query(...)
+    authorization: str = Header(...),
+    postcode: str = Query(...),
+    category: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get all local resources for google user
@@ -71,10 +118,108 @@ async def get_local_resources_google(
     Args:
         authorization (str): Authorization header
         postcode (str): Postcode
+        category (str): Optional category filter
+        if_none_match (str): If-None-Match header
 
     Returns:
         list: List of local resources
     """
     await verify_hs256_token(authorization)
 
-    return await get_local_resources_list(postcode)
+    return await get_local_resources_list(postcode, category, if_none_match)
+
+
+@router.get("/nearby/email", response_model=List[NearbyLocalResource])
+async def get_nearby_local_resources_email(
+    authorization: str = Header(...),
+    postcode: str = Query(...),
+    radius_km: float = Query(10, gt=0, le=MAX_RADIUS_KM),
+    category: Optional[str] = Query(None),
+):
+    """
+    Get local resources within a radius of a postcode for email user
+
+    Args:
+        authorization (str): Authorization header
+        postcode (str): Postcode
+        radius_km (float): Search radius in km
+        category (str): Optional category filter
+
+    Returns:
+        list: List of local resources, nearest first
+    """
+    await verify_es256_token(authorization)
+
+    return await get_nearby_local_resources(postcode, radius_km, category)
+
+
+@router.get("/nearby/google", response_model=List[NearbyLocalResource])
+async def get_nearby_local_resources_google(
+    authorization: str = Header(...),
+    postcode: str = Query(...),
+    radius_km: float = Query(10, gt=0, le=MAX_RADIUS_KM),
+    category: Optional[str] = Query(None),
+):
+    """
+    Get local resources within a radius of a postcode for google user
+
+    Args:
+        authorization (str): Authorization header
+        postcode (str): Postcode
+        radius_km (float): Search radius in km
+        category (str): Optional category filter
+
+    Returns:
+        list: List of local resources, nearest first
+    """
+    await verify_hs256_token(authorization)
+
+    return await get_nearby_local_resources(postcode, radius_km, category)
+
+
+@router.get("/search/email", response_model=LocalResourceSearchResponse)
+async def search_local_resources_email(
+    authorization: str = Header(...),
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Search local resources for email user
+
+    Args:
+        authorization (str): Authorization header
+        q (str): Search text
+        category (str): Optional category filter
+        limit (int): Maximum number of results
+
+    Returns:
+        dict: Ranked resources, category facet counts and total matches
+    """
+    await verify_es256_token(authorization)
+
+    return await search_local_resources(q, category, limit)
+
+
+@router.get("/search/google", response_model=LocalResourceSearchResponse)
+async def search_local_resources_google(
+    authorization: str = Header(...),
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Search local resources for google user
+
+    Args:
+        authorization (str): Authorization header
+        q (str): Search text
+        category (str): Optional category filter
+        limit (int): Maximum number of results
+
+    Returns:
+        dict: Ranked resources, category facet counts and total matches
+    """
+    await verify_hs256_token(authorization)
+
+    return await search_local_resources(q, category, limit)
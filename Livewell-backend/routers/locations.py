@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Header, Query
+from typing import List
+from utils import verify_es256_token, verify_hs256_token
+from utils.location_autocomplete import location_autocomplete
+from models import LocationSuggestion
+
+router = APIRouter(prefix="/api/locations", tags=["locations"])
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+async def autocomplete_locations(q: str, limit: int = 10):
+    """
+    Suggest suburbs and postcodes, served from the in-memory index
+
+    Args:
+        q (str): Partial suburb name or postcode
+        limit (int): Maximum number of suggestions
+
+    Returns:
+        list: List of suburb and postcode suggestions
+    """
+    return location_autocomplete.suggest(q, limit)
+
+
+# ============================================================================
+# APIs
+# ============================================================================
+
+
+@router.get("/autocomplete/email", response_model=List[LocationSuggestion])
+async def autocomplete_locations_email(
+    authorization: str = Header(...),
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Suggest suburbs and postcodes for email user
+
+    Args:
+        authorization (str): Authorization header
+        q (str): Partial suburb name or postcode
+        limit (int): Maximum number of suggestions
+
+    Returns:
+        list: List of suburb and postcode suggestions
+    """
+    await verify_es256_token(authorization)
+
+    return await autocomplete_locations(q, limit)
+
+
+@router.get("/autocomplete/google", response_model=List[LocationSuggestion])
+async def autocomplete_locations_google(
+    authorization: str = Header(...),
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Suggest suburbs and postcodes for google user
+
+    Args:
+        authorization (str): Authorization header
+        q (str): Partial suburb name or postcode
+        limit (int): Maximum number of suggestions
+
+    Returns:
+        list: List of suburb and postcode suggestions
+    """
+    await verify_hs256_token(authorization)
+
+    return await autocomplete_locations(q, limit)
@@ -1,7 +1,19 @@
-from fastapi import APIRouter, HTTPException, Header, Body
+from fastapi import APIRouter, HTTPException, Header, Body, Response
+from typing import List, Optional
 from utils import init_supabase, verify_es256_token, verify_hs256_token
 from datetime import datetime
-from models import MedicationRequest
+from models import (
+    MedicationRequest,
+    MedicationBatchUpdate,
+    Medication,
+    MedicationBatchResult,
+    MessageResponse,
+)
+from utils.medication_reminders import medication_reminders
+from utils.idempotency import idempotency_store
+from utils.single_flight import single_flight
+from utils.data_versions import data_versions
+from utils.sync import now_iso, record_tombstones
 
 router = APIRouter(prefix="/api/health/medications", tags=["health"])
 
@@ -9,6 +21,9 @@ router = APIRouter(prefix="/api/health/medications", tags=["health"])
 # Init supabase admin
 supabase_admin = init_supabase()
 
+# Most items in one batch request
+BATCH_MAX_ITEMS = 100
+
 
 # ============================================================================
 # Functions for Medications
@@ -28,12 +43,14 @@ async def get_all_medications(payload: dict):
     user_id = payload["sub"]
 
     try:
-        result = (
+        # Identical concurrent reads share one query
+        result = await single_flight.run(
+            ("medications", user_id),
             supabase_admin.table("medications")
             .select("*")
             .eq("id", user_id)
             .order("created_at", desc=True)
-            .execute()
+            .execute,
         )
 
         return result.data
@@ -105,9 +122,13 @@ async def create_medication(payload: dict, body: MedicationRequest):
             "id": user_id,
         }
 
-        supabase_admin.table("medications").insert(medication_data).execute()
+        result = supabase_admin.table("medications").insert(medication_data).execute()
+        data_versions.bump("medications", user_id)
 
-        return {"Medication added successfully"}
+        # Schedule reminders for the new medication only
+        await medication_reminders.upsert_many(result.data)
+
+        return ["Medication added successfully"]
 
     except Exception as e:
         raise HTTPException(
@@ -152,13 +173,22 @@ async def update_medication(payload: dict, med_id: str, body: MedicationRequest)
             "start_date": body.start_date,
             "durations": body.durations,
             "notes": body.notes,
+            "updated_at": now_iso(),
         }
 
-        supabase_admin.table("medications").update(update_data).eq("med_id", med_id).eq(
-            "id", user_id
-        ).execute()
+        result = (
+            supabase_admin.table("medications")
+            .update(update_data)
+            .eq("med_id", med_id)
+            .eq("id", user_id)
+            .execute()
+        )
+        data_versions.bump("medications", user_id)
+
+        # Reschedule reminders for this medication only
+        await medication_reminders.upsert_many(result.data)
 
-        return {"Medication updated successfully"}
+        return ["Medication updated successfully"]
 
     except HTTPException:
         raise
@@ -199,7 +229,11 @@ async def delete_medication(payload: dict, med_id: str):
             "id", user_id
         ).execute()
 
-        return {"Medication deleted successfully"}
+        data_versions.bump("medications", user_id)
+        medication_reminders.remove(med_id)
+        record_tombstones(user_id, "medications", [med_id])
+
+        return ["Medication deleted successfully"]
 
     except HTTPException:
         raise
@@ -209,30 +243,180 @@ async def delete_medication(payload: dict, med_id: str):
         )
 
 
+async def create_medications(payload: dict, bodies: List[MedicationRequest]):
+    """
+    Create many medications in one insert statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        bodies (list): Medication data
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+
+    try:
+        result = (
+            supabase_admin.table("medications")
+            .insert([{**body.model_dump(), "id": user_id} for body in bodies])
+            .execute()
+        )
+        data_versions.bump("medications", user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to add medications: {str(e)}"
+        )
+
+    await medication_reminders.upsert_many(result.data)
+
+    # Inserted rows come back in request order
+    return [
+        {"index": i, "med_id": med["med_id"], "status": "created"}
+        for i, med in enumerate(result.data)
+    ]
+
+
+async def update_medications(payload: dict, bodies: List[MedicationBatchUpdate]):
+    """
+    Update many medications: one select to check ownership, one upsert statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        bodies (list): Updated medication data, each with its med_id
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+    med_ids = list({body.med_id for body in bodies})
+
+    try:
+        # Only the user's own medications may be updated
+        owned = (
+            supabase_admin.table("medications")
+            .select("med_id")
+            .eq("id", user_id)
+            .in_("med_id", med_ids)
+            .execute()
+        )
+        owned_ids = {str(med["med_id"]) for med in owned.data}
+
+        # Last update wins if a medication is listed twice
+        rows = {
+            body.med_id: {**body.model_dump(), "id": user_id, "updated_at": now_iso()}
+            for body in bodies
+            if body.med_id in owned_ids
+        }
+
+        if rows:
+            result = (
+                supabase_admin.table("medications")
+                .upsert(list(rows.values()), on_conflict="med_id")
+                .execute()
+            )
+            data_versions.bump("medications", user_id)
+
+            # Reschedule reminders for these medications only
+            await medication_reminders.upsert_many(result.data)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update medications: {str(e)}"
+        )
+
+    return [
+        {
+            "index": i,
+            "med_id": body.med_id,
+            "status": "updated" if body.med_id in owned_ids else "not_found",
+        }
+        for i, body in enumerate(bodies)
+    ]
+
+
+async def delete_medications(payload: dict, med_ids: List[str]):
+    """
+    Delete many medications in one delete statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        med_ids (list): Medication IDs
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+
+    try:
+        result = (
+            supabase_admin.table("medications")
+            .delete()
+            .eq("id", user_id)
+            .in_("med_id", list(set(med_ids)))
+            .execute()
+        )
+        data_versions.bump("medications", user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to delete medications: {str(e)}"
+        )
+
+    deleted_ids = [str(med["med_id"]) for med in result.data]
+
+    for med_id in deleted_ids:
+        medication_reminders.remove(med_id)
+    record_tombstones(user_id, "medications", deleted_ids)
+
+    return [
+        {
+            "index": i,
+            "med_id": med_id,
+            "status": "deleted" if med_id in deleted_ids else "not_found",
+        }
+        for i, med_id in enumerate(med_ids)
+    ]
+
+
 # ============================================================================
 # Medication APIs - Email Authentication
 # ============================================================================
 
 
-@router.get("/email")
-async def get_medications_email(authorization: str = Header(...)):
+@router.get("/email", response_model=List[Medication])
+async def get_medications_email(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get all medications for user (email authentication)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         List of medication records
     """
     payload = await verify_es256_token(authorization)
 
-    return await get_all_medications(payload)
+    return await data_versions.respond(
+        "medications",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_all_medications(payload),
+    )
 
 
-@router.post("/email")
+@router.post("/email", response_model=MessageResponse)
 async def create_medication_email(
-    authorization: str = Header(...), body: MedicationRequest = Body(...)
+    authorization: str = Header(...),
+    body: MedicationRequest = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new medication (email authentication)
@@ -240,16 +424,24 @@ async def create_medication_email(
     Args:
         authorization (str): Authorization header (contains jwt token)
         body (MedicationRequest): Medication data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the medication again
 
     Returns:
         Success message
     """
     payload = await verify_es256_token(authorization)
 
-    return await create_medication(payload, body)
+    return await idempotency_store.run(
+        payload["sub"],
+        "medications.create",
+        idempotency_key,
+        body,
+        lambda: create_medication(payload, body),
+    )
 
 
-@router.get("/email/{med_id}")
+@router.get("/email/{med_id}", response_model=Medication)
 async def get_medication_email(med_id: str, authorization: str = Header(...)):
     """
     Get a specific medication by ID (email authentication)
@@ -266,7 +458,7 @@ async def get_medication_email(med_id: str, authorization: str = Header(...)):
     return await get_medication_by_id(payload, med_id)
 
 
-@router.put("/email/{med_id}")
+@router.put("/email/{med_id}", response_model=MessageResponse)
 async def update_medication_email(
     med_id: str, authorization: str = Header(...), body: MedicationRequest = Body(...)
 ):
@@ -286,7 +478,7 @@ async def update_medication_email(
     return await update_medication(payload, med_id, body)
 
 
-@router.delete("/email/{med_id}")
+@router.delete("/email/{med_id}", response_model=MessageResponse)
 async def delete_medication_email(med_id: str, authorization: str = Header(...)):
     """
     Delete a specific medication (email authentication)
@@ -308,25 +500,38 @@ async def delete_medication_email(med_id: str, authorization: str = Header(...))
 # ============================================================================
 
 
-@router.get("/google")
-async def get_medications_google(authorization: str = Header(...)):
+@router.get("/google", response_model=List[Medication])
+async def get_medications_google(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get all medications for user (google authentication)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         List of medication records
     """
     payload = await verify_hs256_token(authorization)
 
-    return await get_all_medications(payload)
+    return await data_versions.respond(
+        "medications",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_all_medications(payload),
+    )
 
 
-@router.post("/google")
+@router.post("/google", response_model=MessageResponse)
 async def create_medication_google(
-    authorization: str = Header(...), body: MedicationRequest = Body(...)
+    authorization: str = Header(...),
+    body: MedicationRequest = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new medication (google authentication)
@@ -334,16 +539,24 @@ async def create_medication_google(
     Args:
         authorization (str): Authorization header (contains jwt token)
         body (MedicationRequest): Medication data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the medication again
 
     Returns:
         Success message
     """
     payload = await verify_hs256_token(authorization)
 
-    return await create_medication(payload, body)
+    return await idempotency_store.run(
+        payload["sub"],
+        "medications.create",
+        idempotency_key,
+        body,
+        lambda: create_medication(payload, body),
+    )
 
 
-@router.get("/google/{med_id}")
+@router.get("/google/{med_id}", response_model=Medication)
 async def get_medication_google(med_id: str, authorization: str = Header(...)):
     """
     Get a specific medication by ID (google authentication)
@@ -360,7 +573,7 @@ async def get_medication_google(med_id: str, authorization: str = Header(...)):
     return await get_medication_by_id(payload, med_id)
 
 
-@router.put("/google/{med_id}")
+@router.put("/google/{med_id}", response_model=MessageResponse)
 async def update_medication_google(
     med_id: str, authorization: str = Header(...), body: MedicationRequest = Body(...)
 ):
@@ -380,7 +593,7 @@ async def update_medication_google(
     return await update_medication(payload, med_id, body)
 
 
-@router.delete("/google/{med_id}")
+@router.delete("/google/{med_id}", response_model=MessageResponse)
 async def delete_medication_google(med_id: str, authorization: str = Header(...)):
     """
     Delete a specific medication (google authentication)
@@ -395,3 +608,150 @@ async def delete_medication_google(med_id: str, authorization: str = Header(...)
     payload = await verify_hs256_token(authorization)
 
     return await delete_medication(payload, med_id)
+
+
+# ============================================================================
+# Medication APIs - Batch
+# ============================================================================
+
+
+@router.post("/batch/email", response_model=List[MedicationBatchResult])
+async def create_medications_email(
+    authorization: str = Header(...),
+    idempotency_key: Optional[str] = Header(None),
+    body: List[MedicationRequest] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Create many medications at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Medication data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the medications again
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await idempotency_store.run(
+        payload["sub"],
+        "medications.create_batch",
+        idempotency_key,
+        body,
+        lambda: create_medications(payload, body),
+    )
+
+
+@router.put("/batch/email", response_model=List[MedicationBatchResult])
+async def update_medications_email(
+    authorization: str = Header(...),
+    body: List[MedicationBatchUpdate] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Update many medications at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Updated medication data, each with its med_id
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await update_medications(payload, body)
+
+
+@router.delete("/batch/email", response_model=List[MedicationBatchResult])
+async def delete_medications_email(
+    authorization: str = Header(...),
+    body: List[str] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Delete many medications at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Medication IDs
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await delete_medications(payload, body)
+
+
+@router.post("/batch/google", response_model=List[MedicationBatchResult])
+async def create_medications_google(
+    authorization: str = Header(...),
+    idempotency_key: Optional[str] = Header(None),
+    body: List[MedicationRequest] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Create many medications at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Medication data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the medications again
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await idempotency_store.run(
+        payload["sub"],
+        "medications.create_batch",
+        idempotency_key,
+        body,
+        lambda: create_medications(payload, body),
+    )
+
+
+@router.put("/batch/google", response_model=List[MedicationBatchResult])
+async def update_medications_google(
+    authorization: str = Header(...),
+    body: List[MedicationBatchUpdate] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Update many medications at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Updated medication data, each with its med_id
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await update_medications(payload, body)
+
+
+@router.delete("/batch/google", response_model=List[MedicationBatchResult])
+async def delete_medications_google(
+    authorization: str = Header(...),
+    body: List[str] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Delete many medications at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Medication IDs
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await delete_medications(payload, body)
@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException, Header, Body
+import os
+import asyncio
+from fastapi import APIRouter, HTTPException, Header, Body, Response
+from typing import Optional
 from utils import init_supabase, verify_es256_token, verify_hs256_token
+from utils.ttl_cache import TTLCache
+from utils.single_flight import single_flight
+from utils.data_versions import data_versions
+from models import Profile, MessageResponse
 from dotenv import load_dotenv
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
@@ -8,6 +15,19 @@ router = APIRouter(prefix="/api/profile", tags=["profile"])
 # Init supabase admin
 supabase_admin = init_supabase()
 
+# Merged profile per user, dropped whenever the profile is written
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "300"))
+profile_cache = TTLCache(
+    maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "10000")), ttl=PROFILE_CACHE_TTL
+)
+
+# Updatable fields, request body key -> users_info column
+PROFILE_UPDATE_FIELDS = {
+    "suburb": "suburb",
+    "postcode": "postcode",
+    "frailtyScore": "frailty_score",
+}
+
 
 # ============================================================================
 # Functions
@@ -45,6 +65,8 @@ async def create_profile(payload: dict, body: dict):
 
             # Insert into user's profile
             supabase_admin.table("users_info").insert(attributes).execute()
+            data_versions.bump("users_info", user_id)
+            profile_cache.invalidate(user_id)
 
         except Exception as e:
             raise HTTPException(
@@ -56,41 +78,76 @@ async def create_profile(payload: dict, body: dict):
 
 async def update_profile(payload: dict, body: dict = Body(...)):
     """
-    Update user's profile
+    Update user's profile with PATCH semantics: only fields sent with a value
+    that differs from the stored row are written, in one statement. The row is
+    read fresh, the cache may be stale or hold another worker's old copy.
 
     Args:
         payload (dict): Payload dictionary (contains user's information)
         body (dict): Body dictionary (contains user's information)
+
+    Returns:
+        dict: Columns that were changed, empty if nothing was written
     """
     user_id = payload["sub"]
-    suburb = body.get("suburb")
-    postcode = body.get("postcode")
-    frailty_score = body.get("frailtyScore")
 
     try:
-        # Check if the user exists in your database
-        result = (
-            supabase_admin.table("users_info").select("*").eq("id", user_id).execute()
+        # Only the updatable columns of the stored row
+        current_result = await asyncio.to_thread(
+            supabase_admin.table("users_info")
+            .select(", ".join(PROFILE_UPDATE_FIELDS.values()))
+            .eq("id", user_id)
+            .execute
         )
 
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"User not found: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get user info: {str(e)}"
+        )
+
+    # No users_info row yet (profile not created), nothing to update
+    if not current_result.data:
+        profile_cache.invalidate(user_id)
+        return {}
+
+    current = current_result.data[0]
+
+    changes = {
+        column: body[field]
+        for field, column in PROFILE_UPDATE_FIELDS.items()
+        if body.get(field) is not None and body[field] != current.get(column)
+    }
+
+    # Nothing changed, skip the write
+    if not changes:
+        return changes
 
     try:
         # Update user's info
-        supabase_admin.table("users_info").update(
-            {
-                "suburb": suburb,
-                "postcode": postcode,
-                "frailty_score": frailty_score,
-            }
-        ).eq("id", user_id).execute()
+        result = (
+            supabase_admin.table("users_info")
+            .update(changes)
+            .eq("id", user_id)
+            .execute()
+        )
 
     except Exception as e:
+        profile_cache.invalidate(user_id)
         raise HTTPException(
             status_code=500, detail=f"Failed to update user info: {str(e)}"
         )
 
+    # No users_info row yet (profile not created), nothing was written
+    if not result.data:
+        profile_cache.invalidate(user_id)
+        return {}
+
+    # Reads still running get no shared query and do not cache what they got
+    data_versions.bump("users_info", user_id)
+    profile_cache.invalidate(user_id)
+
+    return changes
+
 
 async def get_profile(payload: dict):
     """
@@ -104,30 +161,48 @@ async def get_profile(payload: dict):
     """
     user_id = payload["sub"]
 
-    try:
-        # Get user's name and email from profiles table
-        profile_result = (
-            supabase_admin.table("profiles")
-            .select("user_name, email")
-            .eq("id", user_id)
-            .execute()
-        )
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
 
-        # Get user's info
-        info_result = (
-            supabase_admin.table("users_info").select("*").eq("id", user_id).execute()
+    # Taken before the reads, so a write that lands during them is not undone
+    token = profile_cache.token()
+
+    try:
+        # Get user's name and email from profiles table and user's info, concurrently
+        # Identical concurrent reads share one query each
+        profile_result, info_result = await asyncio.gather(
+            single_flight.run(
+                ("profiles", user_id),
+                supabase_admin.table("profiles")
+                .select("user_name, email")
+                .eq("id", user_id)
+                .execute,
+            ),
+            single_flight.run(
+                ("users_info", user_id),
+                supabase_admin.table("users_info")
+                .select("*")
+                .eq("id", user_id)
+                .execute,
+            ),
         )
 
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"User's info not found: {str(e)}")
 
+    if not profile_result.data:
+        raise HTTPException(status_code=404, detail="User's info not found")
+
     # Combine profile and info
     result = {
         **profile_result.data[0],
         **(info_result.data[0] if info_result.data else {}),
     }
 
-    return result
+    profile_cache.set(user_id, result, token=token)
+
+    return dict(result)
 
 
 # ============================================================================
@@ -135,7 +210,7 @@ async def get_profile(payload: dict):
 # ============================================================================
 
 
-@router.post("/email")
+@router.post("/email", response_model=MessageResponse)
 async def create_profile_email(
     authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -153,10 +228,10 @@ async def create_profile_email(
 
     await create_profile(payload, body)
 
-    return {"User's info created successfully"}
+    return ["User's info created successfully"]
 
 
-@router.post("/google")
+@router.post("/google", response_model=MessageResponse)
 async def create_profile_google(
     authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -174,16 +249,21 @@ async def create_profile_google(
 
     await create_profile(payload, body)
 
-    return {"User's info created successfully"}
+    return ["User's info created successfully"]
 
 
-@router.get("/email")
-async def get_profile_email(authorization: str = Header(...)):
+@router.get("/email", response_model=Profile)
+async def get_profile_email(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get user's profile (email)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the profile is unchanged
 
     Returns:
         User's info from Supabase
@@ -191,16 +271,27 @@ async def get_profile_email(authorization: str = Header(...)):
 
     payload = await verify_es256_token(authorization)
 
-    return await get_profile(payload)
+    return await data_versions.respond(
+        "users_info",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_profile(payload),
+    )
 
 
-@router.get("/google")
-async def get_profile_google(authorization: str = Header(...)):
+@router.get("/google", response_model=Profile)
+async def get_profile_google(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get user's profile (google)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the profile is unchanged
 
     Returns:
         User's info from Supabase
@@ -208,10 +299,16 @@ async def get_profile_google(authorization: str = Header(...)):
 
     payload = await verify_hs256_token(authorization)
 
-    return await get_profile(payload)
+    return await data_versions.respond(
+        "users_info",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_profile(payload),
+    )
 
 
-@router.put("/email")
+@router.put("/email", response_model=MessageResponse)
 async def update_profile_email(
     authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -228,10 +325,10 @@ async def update_profile_email(
     payload = await verify_es256_token(authorization)
 
     await update_profile(payload, body)
-    return {"User's info updated successfully"}
+    return ["User's info updated successfully"]
 
 
-@router.put("/google")
+@router.put("/google", response_model=MessageResponse)
 async def update_profile_google(
     authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -248,4 +345,42 @@ async def update_profile_google(
     payload = await verify_hs256_token(authorization)
 
     await update_profile(payload, body)
-    return {"User's info updated successfully"}
+    return ["User's info updated successfully"]
+
+
+@router.patch("/email", response_model=MessageResponse)
+async def patch_profile_email(authorization: str = Header(...), body: dict = Body(...)):
+    """
+    Update only the given fields of user's profile for email login
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (dict): Body dictionary (fields to change)
+
+    Returns:
+        Successful message
+    """
+    payload = await verify_es256_token(authorization)
+
+    await update_profile(payload, body)
+    return ["User's info updated successfully"]
+
+
+@router.patch("/google", response_model=MessageResponse)
+async def patch_profile_google(
+    authorization: str = Header(...), body: dict = Body(...)
+):
+    """
+    Update only the given fields of user's profile for google login
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (dict): Body dictionary (fields to change)
+
+    Returns:
+        Successful message
+    """
+    payload = await verify_hs256_token(authorization)
+
+    await update_profile(payload, body)
+    return ["User's info updated successfully"]
@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Header, HTTPException, Body
+from fastapi import APIRouter, Header, HTTPException, Body, Response
+from typing import List, Optional
 from utils import init_supabase, verify_es256_token, verify_hs256_token
+from utils.sync import now_iso
+from utils.single_flight import single_flight
+from utils.data_versions import data_versions
+from models import GoalRecommendation, MessageResponse
 
 router = APIRouter(prefix="/api/goal/recommendation", tags=["goal-recommendation"])
 
@@ -23,11 +28,13 @@ async def get_goal_recommendation(user_id: str):
         list: List of goal recommendations
     """
     try:
-        response = (
+        # Identical concurrent reads (e.g. the same user on two devices) share one query
+        response = await single_flight.run(
+            ("goal_recommendations", user_id),
             supabase_admin.table("goal_recommendations")
             .select("*")
             .eq("id", user_id)
-            .execute()
+            .execute,
         )
 
         return response.data
@@ -35,20 +42,22 @@ async def get_goal_recommendation(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def update_goal_recommendation(recommend_id: str, body: dict):
+async def update_goal_recommendation(user_id: str, recommend_id: str, body: dict):
     """
     Update goal recommendation
 
     Args:
+        user_id (str): User ID
         recommend_id (str): Goal Recommendation ID
         body (dict): {"already_set: TRUE"}
     """
     try:
-        supabase_admin.table("goal_recommendations").update(body).eq(
-            "recommend_id", recommend_id
-        ).execute()
+        supabase_admin.table("goal_recommendations").update(
+            {**body, "updated_at": now_iso()}
+        ).eq("recommend_id", recommend_id).execute()
+        data_versions.bump("goal_recommendations", user_id)
 
-        return {"Goal recommendation updated successfully"}
+        return ["Goal recommendation updated successfully"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -59,13 +68,18 @@ async def update_goal_recommendation(recommend_id: str, body: dict):
 # ============================================================================
 
 
-@router.get("/email")
-async def get_goal_recommendation_email(authorization: str = Header(...)):
+@router.get("/email", response_model=List[GoalRecommendation])
+async def get_goal_recommendation_email(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get user's goal recommendation for email user
 
     Args:
         authorization (str): Authorization header
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         list: List of goal recommendations
@@ -74,16 +88,27 @@ async def get_goal_recommendation_email(authorization: str = Header(...)):
 
     user_id = payload["sub"]
 
-    return await get_goal_recommendation(user_id)
+    return await data_versions.respond(
+        "goal_recommendations",
+        user_id,
+        if_none_match,
+        response,
+        lambda: get_goal_recommendation(user_id),
+    )
 
 
-@router.get("/google")
-async def get_goal_recommendation_google(authorization: str = Header(...)):
+@router.get("/google", response_model=List[GoalRecommendation])
+async def get_goal_recommendation_google(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get user's goal recommendation for google user
 
     Args:
         authorization (str): Authorization header
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         list: List of goal recommendations
@@ -92,10 +117,16 @@ async def get_goal_recommendation_google(authorization: str = Header(...)):
 
     user_id = payload["sub"]
 
-    return await get_goal_recommendation(user_id)
+    return await data_versions.respond(
+        "goal_recommendations",
+        user_id,
+        if_none_match,
+        response,
+        lambda: get_goal_recommendation(user_id),
+    )
 
 
-@router.put("/email/{recommend_id}")
+@router.put("/email/{recommend_id}", response_model=MessageResponse)
 async def update_goal_recommendation_email(
     recommend_id: str, authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -107,12 +138,12 @@ async def update_goal_recommendation_email(
         authorization (str): Authorization header
         body (dict): {"already_set: TRUE"}
     """
-    await verify_es256_token(authorization)
+    payload = await verify_es256_token(authorization)
 
-    return await update_goal_recommendation(recommend_id, body)
+    return await update_goal_recommendation(payload["sub"], recommend_id, body)
 
 
-@router.put("/google/{recommend_id}")
+@router.put("/google/{recommend_id}", response_model=MessageResponse)
 async def update_goal_recommendation_google(
     recommend_id: str, authorization: str = Header(...), body: dict = Body(...)
 ):
@@ -124,6 +155,6 @@ async def update_goal_recommendation_google(
         authorization (str): Authorization header
         body (dict): {"already_set: TRUE"}
     """
-    await verify_hs256_token(authorization)
+    payload = await verify_hs256_token(authorization)
 
-    return await update_goal_recommendation(recommend_id, body)
+    return await update_goal_recommendation(payload["sub"], recommend_id, body)
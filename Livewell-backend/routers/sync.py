@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from typing import Dict, Optional
+from utils import verify_es256_token, verify_hs256_token
+from utils.sync import get_changes
+from models import SyncChanges
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+async def sync_changes(payload: dict, cursors: dict):
+    """
+    Get the user's rows created, updated or deleted since each collection's cursor
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        cursors (dict): {collection: cursor from the previous sync or None}
+
+    Returns:
+        dict: {collection: {"changes", "deleted", "cursor", "has_more"}}
+    """
+    try:
+        return await get_changes(payload["sub"], cursors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sync: {str(e)}")
+
+
+# ============================================================================
+# APIs
+# ============================================================================
+
+
+@router.get("/email", response_model=Dict[str, SyncChanges])
+async def sync_email(
+    authorization: str = Header(...),
+    medications: Optional[str] = Query(None),
+    vaccinations: Optional[str] = Query(None),
+    tracking_data: Optional[str] = Query(None),
+    goal_recommendations: Optional[str] = Query(None),
+):
+    """
+    Delta sync for email user. Each query parameter is the cursor returned for
+    that collection by the previous sync, leave it out for a full sync.
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        medications (str): Medications cursor
+        vaccinations (str): Vaccinations cursor
+        tracking_data (str): Tracking data cursor
+        goal_recommendations (str): Goal recommendations cursor
+
+    Returns:
+        dict: Changes per collection
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await sync_changes(
+        payload,
+        {
+            "medications": medications,
+            "vaccinations": vaccinations,
+            "tracking_data": tracking_data,
+            "goal_recommendations": goal_recommendations,
+        },
+    )
+
+
+@router.get("/google", response_model=Dict[str, SyncChanges])
+async def sync_google(
+    authorization: str = Header(...),
+    medications: Optional[str] = Query(None),
+    vaccinations: Optional[str] = Query(None),
+    tracking_data: Optional[str] = Query(None),
+    goal_recommendations: Optional[str] = Query(None),
+):
+    """
+    Delta sync for google user. Each query parameter is the cursor returned for
+    that collection by the previous sync, leave it out for a full sync.
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        medications (str): Medications cursor
+        vaccinations (str): Vaccinations cursor
+        tracking_data (str): Tracking data cursor
+        goal_recommendations (str): Goal recommendations cursor
+
+    Returns:
+        dict: Changes per collection
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await sync_changes(
+        payload,
+        {
+            "medications": medications,
+            "vaccinations": vaccinations,
+            "tracking_data": tracking_data,
+            "goal_recommendations": goal_recommendations,
+        },
+    )
@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException, Header, Body, Query
 from utils import init_supabase, verify_es256_token, verify_hs256_token
 from datetime import datetime, timedelta
-from models import UpdateCurrentTrackingRequest, UpdateTargetTrackingRequest
-from typing import Optional
+from models import (
+    UpdateCurrentTrackingRequest,
+    UpdateTargetTrackingRequest,
+    TrackingRecord,
+    MessageResponse,
+)
+from typing import List, Optional
+from utils.sync import now_iso
+from utils.single_flight import single_flight
+from utils.data_versions import data_versions, content_response
 
 router = APIRouter(prefix="/api/tracking", tags=["tracking"])
 
@@ -50,15 +58,16 @@ async def get_tracking_data(
         start_date, end_date = get_current_week_dates()
 
     try:
-        # Get tracking data for date range
-        result = (
+        # Get tracking data for date range, identical concurrent reads share one query
+        result = await single_flight.run(
+            ("tracking_data", user_id, start_date, end_date),
             supabase_admin.table("tracking_data")
             .select("*")
             .eq("id", user_id)
             .gte("today_date", start_date)
             .lte("today_date", end_date)
             .order("today_date")
-            .execute()
+            .execute,
         )
 
         if not result.data:
@@ -92,13 +101,14 @@ async def get_today_tracking(payload: dict):
     today = datetime.now().strftime("%Y-%m-%d")
 
     try:
-        # Get today's tracking data
-        result = (
+        # Get today's tracking data, identical concurrent reads share one query
+        result = await single_flight.run(
+            ("tracking_data", user_id, today),
             supabase_admin.table("tracking_data")
             .select("*")
             .eq("id", user_id)
             .eq("today_date", today)
-            .execute()
+            .execute,
         )
 
         if not result.data:
@@ -161,8 +171,10 @@ async def update_current_tracking(payload: dict, body: UpdateCurrentTrackingRequ
             {
                 "current_steps": current_steps,
                 "current_water_intake_ml": current_water_intake_ml,
+                "updated_at": now_iso(),
             }
         ).eq("id", user_id).eq("today_date", today).execute()
+        data_versions.bump("tracking_data", user_id)
 
     except Exception as e:
         raise HTTPException(
@@ -214,8 +226,10 @@ async def update_target_tracking(payload: dict, body: UpdateTargetTrackingReques
             {
                 "target_steps": target_steps,
                 "target_water_intake_ml": target_water_intake_ml,
+                "updated_at": now_iso(),
             }
         ).eq("id", user_id).eq("today_date", today).execute()
+        data_versions.bump("tracking_data", user_id)
 
     except Exception as e:
         raise HTTPException(
@@ -229,11 +243,12 @@ async def update_target_tracking(payload: dict, body: UpdateTargetTrackingReques
 # ============================================================================
 
 
-@router.get("/email")
+@router.get("/email", response_model=List[TrackingRecord])
 async def get_tracking_email(
     authorization: str = Header(...),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get user's tracking data for a week (email authentication)
@@ -242,20 +257,25 @@ async def get_tracking_email(
         authorization (str): Authorization header (contains jwt token)
         start_date (str): Optional start date in YYYY-MM-DD format
         end_date (str): Optional end date in YYYY-MM-DD format
+        if_none_match (str): If-None-Match header, 304 if the records are unchanged
 
     Returns:
         List of tracking data records
     """
     payload = await verify_es256_token(authorization)
 
-    return await get_tracking_data(payload, start_date, end_date)
+    # Rows are also created outside the app, so the ETag is a hash of the records
+    return content_response(
+        await get_tracking_data(payload, start_date, end_date), if_none_match
+    )
 
 
-@router.get("/google")
+@router.get("/google", response_model=List[TrackingRecord])
 async def get_tracking_google(
     authorization: str = Header(...),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get user's tracking data for a week (google authentication)
@@ -264,16 +284,20 @@ async def get_tracking_google(
         authorization (str): Authorization header (contains jwt token)
         start_date (str): Optional start date in YYYY-MM-DD format
         end_date (str): Optional end date in YYYY-MM-DD format
+        if_none_match (str): If-None-Match header, 304 if the records are unchanged
 
     Returns:
         List of tracking data records
     """
     payload = await verify_hs256_token(authorization)
 
-    return await get_tracking_data(payload, start_date, end_date)
+    # Rows are also created outside the app, so the ETag is a hash of the records
+    return content_response(
+        await get_tracking_data(payload, start_date, end_date), if_none_match
+    )
 
 
-@router.get("/today/email")
+@router.get("/today/email", response_model=List[TrackingRecord])
 async def get_today_tracking_email(authorization: str = Header(...)):
     """
     Get user's tracking data for today (email authentication)
@@ -289,7 +313,7 @@ async def get_today_tracking_email(authorization: str = Header(...)):
     return await get_today_tracking(payload)
 
 
-@router.get("/today/google")
+@router.get("/today/google", response_model=List[TrackingRecord])
 async def get_today_tracking_google(authorization: str = Header(...)):
     """
     Get user's tracking data for today (google authentication)
@@ -305,7 +329,7 @@ async def get_today_tracking_google(authorization: str = Header(...)):
     return await get_today_tracking(payload)
 
 
-@router.put("/today/email")
+@router.put("/today/email", response_model=MessageResponse)
 async def update_current_tracking_email(
     authorization: str = Header(...), body: UpdateCurrentTrackingRequest = Body(...)
 ):
@@ -322,10 +346,10 @@ async def update_current_tracking_email(
     payload = await verify_es256_token(authorization)
     await update_current_tracking(payload, body)
 
-    return {"Current tracking data updated successfully"}
+    return ["Current tracking data updated successfully"]
 
 
-@router.put("/today/google")
+@router.put("/today/google", response_model=MessageResponse)
 async def update_current_tracking_google(
     authorization: str = Header(...), body: UpdateCurrentTrackingRequest = Body(...)
 ):
@@ -342,10 +366,10 @@ async def update_current_tracking_google(
     payload = await verify_hs256_token(authorization)
     await update_current_tracking(payload, body)
 
-    return {"Current tracking data updated successfully"}
+    return ["Current tracking data updated successfully"]
 
 
-@router.put("/today/targets/email")
+@router.put("/today/targets/email", response_model=MessageResponse)
 async def update_target_tracking_email(
     authorization: str = Header(...), body: UpdateTargetTrackingRequest = Body(...)
 ):
@@ -362,10 +386,10 @@ async def update_target_tracking_email(
     payload = await verify_es256_token(authorization)
     await update_target_tracking(payload, body)
 
-    return {"Target tracking data updated successfully"}
+    return ["Target tracking data updated successfully"]
 
 
-@router.put("/today/targets/google")
+@router.put("/today/targets/google", response_model=MessageResponse)
 async def update_target_tracking_google(
     authorization: str = Header(...), body: UpdateTargetTrackingRequest = Body(...)
 ):
@@ -382,4 +406,4 @@ async def update_target_tracking_google(
     payload = await verify_hs256_token(authorization)
     await update_target_tracking(payload, body)
 
-    return {"Target tracking data updated successfully"}
+    return ["Target tracking data updated successfully"]
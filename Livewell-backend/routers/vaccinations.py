@@ -1,13 +1,26 @@
-from fastapi import APIRouter, HTTPException, Header, Body
+from fastapi import APIRouter, HTTPException, Header, Body, Response
+from typing import List, Optional
 from utils import init_supabase, verify_es256_token, verify_hs256_token
-from datetime import datetime
-from models import VaccinationRequest
+from models import (
+    VaccinationRequest,
+    VaccinationBatchUpdate,
+    Vaccination,
+    VaccinationBatchResult,
+    MessageResponse,
+)
+from utils.idempotency import idempotency_store
+from utils.single_flight import single_flight
+from utils.data_versions import data_versions
+from utils.sync import now_iso, record_tombstones
 
 router = APIRouter(prefix="/api/health/vaccinations", tags=["health"])
 
 # Init supabase admin
 supabase_admin = init_supabase()
 
+# Most items in one batch request
+BATCH_MAX_ITEMS = 100
+
 # ============================================================================
 # Functions for Vaccinations
 # ============================================================================
@@ -26,12 +39,14 @@ async def get_all_vaccinations(payload: dict):
     user_id = payload["sub"]
 
     try:
-        result = (
+        # Identical concurrent reads share one query
+        result = await single_flight.run(
+            ("vaccinations", user_id),
             supabase_admin.table("vaccinations")
             .select("*")
             .eq("id", user_id)
             .order("created_at", desc=True)
-            .execute()
+            .execute,
         )
 
         return result.data
@@ -101,8 +116,9 @@ async def create_vaccination(payload: dict, body: VaccinationRequest):
         }
 
         supabase_admin.table("vaccinations").insert(vaccination_data).execute()
+        data_versions.bump("vaccinations", user_id)
 
-        return {"Vaccination added successfully"}
+        return ["Vaccination added successfully"]
 
     except Exception as e:
         raise HTTPException(
@@ -144,14 +160,19 @@ async def update_vaccination(payload: dict, vac_id: str, body: VaccinationReques
             "next_dose_date": body.next_dose_date,
             "location": body.location,
             "notes": body.notes,
-            "updated_at": datetime.now().isoformat(),
+            "updated_at": now_iso(),
         }
 
+        # A new due date needs a new reminder
+        if check_result.data[0].get("next_dose_date") != body.next_dose_date:
+            update_data["reminded_at"] = None
+
         supabase_admin.table("vaccinations").update(update_data).eq(
             "vac_id", vac_id
         ).eq("id", user_id).execute()
+        data_versions.bump("vaccinations", user_id)
 
-        return {"Vaccination updated successfully"}
+        return ["Vaccination updated successfully"]
 
     except HTTPException:
         raise
@@ -192,7 +213,10 @@ async def delete_vaccination(payload: dict, vac_id: str):
             "id", user_id
         ).execute()
 
-        return {"Vaccination deleted successfully"}
+        data_versions.bump("vaccinations", user_id)
+        record_tombstones(user_id, "vaccinations", [vac_id])
+
+        return ["Vaccination deleted successfully"]
 
     except HTTPException:
         raise
@@ -202,30 +226,180 @@ async def delete_vaccination(payload: dict, vac_id: str):
         )
 
 
+async def create_vaccinations(payload: dict, bodies: List[VaccinationRequest]):
+    """
+    Create many vaccinations in one insert statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        bodies (list): Vaccination data
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+
+    try:
+        result = (
+            supabase_admin.table("vaccinations")
+            .insert([{**body.model_dump(), "id": user_id} for body in bodies])
+            .execute()
+        )
+        data_versions.bump("vaccinations", user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to add vaccinations: {str(e)}"
+        )
+
+    # Inserted rows come back in request order
+    return [
+        {"index": i, "vac_id": vac["vac_id"], "status": "created"}
+        for i, vac in enumerate(result.data)
+    ]
+
+
+async def update_vaccinations(payload: dict, bodies: List[VaccinationBatchUpdate]):
+    """
+    Update many vaccinations: one select to check ownership, one upsert statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        bodies (list): Updated vaccination data, each with its vac_id
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+    vac_ids = list({body.vac_id for body in bodies})
+
+    try:
+        # Only the user's own vaccinations may be updated
+        owned = (
+            supabase_admin.table("vaccinations")
+            .select("vac_id, next_dose_date, reminded_at")
+            .eq("id", user_id)
+            .in_("vac_id", vac_ids)
+            .execute()
+        )
+        current = {str(vac["vac_id"]): vac for vac in owned.data}
+        owned_ids = set(current)
+
+        # Last update wins if a vaccination is listed twice
+        rows = {
+            body.vac_id: {**body.model_dump(), "id": user_id, "updated_at": now_iso()}
+            for body in bodies
+            if body.vac_id in owned_ids
+        }
+
+        # Every row carries reminded_at (the upsert writes the same columns for
+        # all rows), cleared when the due date changes so it is reminded again
+        for vac_id, row in rows.items():
+            vac = current[vac_id]
+            if row["next_dose_date"] != vac.get("next_dose_date"):
+                row["reminded_at"] = None
+            else:
+                row["reminded_at"] = vac.get("reminded_at")
+
+        if rows:
+            supabase_admin.table("vaccinations").upsert(
+                list(rows.values()), on_conflict="vac_id"
+            ).execute()
+            data_versions.bump("vaccinations", user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update vaccinations: {str(e)}"
+        )
+
+    return [
+        {
+            "index": i,
+            "vac_id": body.vac_id,
+            "status": "updated" if body.vac_id in owned_ids else "not_found",
+        }
+        for i, body in enumerate(bodies)
+    ]
+
+
+async def delete_vaccinations(payload: dict, vac_ids: List[str]):
+    """
+    Delete many vaccinations in one delete statement
+
+    Args:
+        payload (dict): JWT payload (contains user's information)
+        vac_ids (list): Vaccination IDs
+
+    Returns:
+        list: Per-item results, in request order
+    """
+    user_id = payload["sub"]
+
+    try:
+        result = (
+            supabase_admin.table("vaccinations")
+            .delete()
+            .eq("id", user_id)
+            .in_("vac_id", list(set(vac_ids)))
+            .execute()
+        )
+        data_versions.bump("vaccinations", user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to delete vaccinations: {str(e)}"
+        )
+
+    deleted_ids = [str(vac["vac_id"]) for vac in result.data]
+    record_tombstones(user_id, "vaccinations", deleted_ids)
+
+    return [
+        {
+            "index": i,
+            "vac_id": vac_id,
+            "status": "deleted" if vac_id in deleted_ids else "not_found",
+        }
+        for i, vac_id in enumerate(vac_ids)
+    ]
+
+
 # ============================================================================
 # Vaccination APIs - Email Authentication
 # ============================================================================
 
 
-@router.get("/email")
-async def get_vaccinations_email(authorization: str = Header(...)):
+@router.get("/email", response_model=List[Vaccination])
+async def get_vaccinations_email(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get all vaccinations for user (email authentication)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         List of vaccination records
     """
     payload = await verify_es256_token(authorization)
 
-    return await get_all_vaccinations(payload)
+    return await data_versions.respond(
+        "vaccinations",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_all_vaccinations(payload),
+    )
 
 
-@router.post("/email")
+@router.post("/email", response_model=MessageResponse)
 async def create_vaccination_email(
-    authorization: str = Header(...), body: VaccinationRequest = Body(...)
+    authorization: str = Header(...),
+    body: VaccinationRequest = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new vaccination (email authentication)
@@ -233,16 +407,24 @@ async def create_vaccination_email(
     Args:
         authorization (str): Authorization header (contains jwt token)
         body (VaccinationRequest): Vaccination data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the vaccination again
 
     Returns:
         Success message
     """
     payload = await verify_es256_token(authorization)
 
-    return await create_vaccination(payload, body)
+    return await idempotency_store.run(
+        payload["sub"],
+        "vaccinations.create",
+        idempotency_key,
+        body,
+        lambda: create_vaccination(payload, body),
+    )
 
 
-@router.get("/email/{vac_id}")
+@router.get("/email/{vac_id}", response_model=Vaccination)
 async def get_vaccination_email(vac_id: str, authorization: str = Header(...)):
     """
     Get a specific vaccination by ID (email authentication)
@@ -259,7 +441,7 @@ async def get_vaccination_email(vac_id: str, authorization: str = Header(...)):
     return await get_vaccination_by_id(payload, vac_id)
 
 
-@router.put("/email/{vac_id}")
+@router.put("/email/{vac_id}", response_model=MessageResponse)
 async def update_vaccination_email(
     vac_id: str, authorization: str = Header(...), body: VaccinationRequest = Body(...)
 ):
@@ -279,7 +461,7 @@ async def update_vaccination_email(
     return await update_vaccination(payload, vac_id, body)
 
 
-@router.delete("/email/{vac_id}")
+@router.delete("/email/{vac_id}", response_model=MessageResponse)
 async def delete_vaccination_email(vac_id: str, authorization: str = Header(...)):
     """
     Delete a specific vaccination (email authentication)
@@ -301,25 +483,38 @@ async def delete_vaccination_email(vac_id: str, authorization: str = Header(...)
 # ============================================================================
 
 
-@router.get("/google")
-async def get_vaccinations_google(authorization: str = Header(...)):
+@router.get("/google", response_model=List[Vaccination])
+async def get_vaccinations_google(
+    response: Response,
+    authorization: str = Header(...),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get all vaccinations for user (google authentication)
 
     Args:
         authorization (str): Authorization header (contains jwt token)
+        if_none_match (str): If-None-Match header, 304 if the list is unchanged
 
     Returns:
         List of vaccination records
     """
     payload = await verify_hs256_token(authorization)
 
-    return await get_all_vaccinations(payload)
+    return await data_versions.respond(
+        "vaccinations",
+        payload["sub"],
+        if_none_match,
+        response,
+        lambda: get_all_vaccinations(payload),
+    )
 
 
-@router.post("/google")
+@router.post("/google", response_model=MessageResponse)
 async def create_vaccination_google(
-    authorization: str = Header(...), body: VaccinationRequest = Body(...)
+    authorization: str = Header(...),
+    body: VaccinationRequest = Body(...),
+    idempotency_key: Optional[str] = Header(None),
 ):
     """
     Create a new vaccination (google authentication)
@@ -327,16 +522,24 @@ async def create_vaccination_google(
     Args:
         authorization (str): Authorization header (contains jwt token)
         body (VaccinationRequest): Vaccination data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the vaccination again
 
     Returns:
         Success message
     """
     payload = await verify_hs256_token(authorization)
 
-    return await create_vaccination(payload, body)
+    return await idempotency_store.run(
+        payload["sub"],
+        "vaccinations.create",
+        idempotency_key,
+        body,
+        lambda: create_vaccination(payload, body),
+    )
 
 
-@router.get("/google/{vac_id}")
+@router.get("/google/{vac_id}", response_model=Vaccination)
 async def get_vaccination_google(vac_id: str, authorization: str = Header(...)):
     """
     Get a specific vaccination by ID (google authentication)
@@ -353,7 +556,7 @@ async def get_vaccination_google(vac_id: str, authorization: str = Header(...)):
     return await get_vaccination_by_id(payload, vac_id)
 
 
-@router.put("/google/{vac_id}")
+@router.put("/google/{vac_id}", response_model=MessageResponse)
 async def update_vaccination_google(
     vac_id: str, authorization: str = Header(...), body: VaccinationRequest = Body(...)
 ):
@@ -373,7 +576,7 @@ async def update_vaccination_google(
     return await update_vaccination(payload, vac_id, body)
 
 
-@router.delete("/google/{vac_id}")
+@router.delete("/google/{vac_id}", response_model=MessageResponse)
 async def delete_vaccination_google(vac_id: str, authorization: str = Header(...)):
     """
     Delete a specific vaccination (google authentication)
@@ -388,3 +591,154 @@ async def delete_vaccination_google(vac_id: str, authorization: str = Header(...
     payload = await verify_hs256_token(authorization)
 
     return await delete_vaccination(payload, vac_id)
+
+
+# ============================================================================
+# Vaccination APIs - Batch
+# ============================================================================
+
+
+@router.post("/batch/email", response_model=List[VaccinationBatchResult])
+async def create_vaccinations_email(
+    authorization: str = Header(...),
+    idempotency_key: Optional[str] = Header(None),
+    body: List[VaccinationRequest] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Create many vaccinations at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Vaccination data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the vaccinations again
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await idempotency_store.run(
+        payload["sub"],
+        "vaccinations.create_batch",
+        idempotency_key,
+        body,
+        lambda: create_vaccinations(payload, body),
+    )
+
+
+@router.put("/batch/email", response_model=List[VaccinationBatchResult])
+async def update_vaccinations_email(
+    authorization: str = Header(...),
+    body: List[VaccinationBatchUpdate] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Update many vaccinations at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Updated vaccination data, each with its vac_id
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await update_vaccinations(payload, body)
+
+
+@router.delete("/batch/email", response_model=List[VaccinationBatchResult])
+async def delete_vaccinations_email(
+    authorization: str = Header(...),
+    body: List[str] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Delete many vaccinations at once (email authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Vaccination IDs
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_es256_token(authorization)
+
+    return await delete_vaccinations(payload, body)
+
+
+@router.post("/batch/google", response_model=List[VaccinationBatchResult])
+async def create_vaccinations_google(
+    authorization: str = Header(...),
+    idempotency_key: Optional[str] = Header(None),
+    body: List[VaccinationRequest] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Create many vaccinations at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Vaccination data
+        idempotency_key (str): Idempotency-Key header, a retry with the same key
+            returns the first response without adding the vaccinations again
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await idempotency_store.run(
+        payload["sub"],
+        "vaccinations.create_batch",
+        idempotency_key,
+        body,
+        lambda: create_vaccinations(payload, body),
+    )
+
+
+@router.put("/batch/google", response_model=List[VaccinationBatchResult])
+async def update_vaccinations_google(
+    authorization: str = Header(...),
+    body: List[VaccinationBatchUpdate] = Body(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS
+    ),
+):
+    """
+    Update many vaccinations at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Updated vaccination data, each with its vac_id
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await update_vaccinations(payload, body)
+
+
+@router.delete("/batch/google", response_model=List[VaccinationBatchResult])
+async def delete_vaccinations_google(
+    authorization: str = Header(...),
+    body: List[str] = Body(..., min_length=1, max_length=BATCH_MAX_ITEMS),
+):
+    """
+    Delete many vaccinations at once (google authentication)
+
+    Args:
+        authorization (str): Authorization header (contains jwt token)
+        body (list): Vaccination IDs
+
+    Returns:
+        Per-item results
+    """
+    payload = await verify_hs256_token(authorization)
+
+    return await delete_vaccinations(payload, body)
@@ -0,0 +1,33 @@
+import os
+import sys
+import pytest
+from types import SimpleNamespace
+from postgrest._sync.request_builder import SyncQueryRequestBuilder
+
+# Modules create their Supabase client at import time, no request is sent
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.test")
+os.environ.setdefault("AUTH_BEARER_TOKEN", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Proxies in front of PostgREST (nginx, Kong) reject longer request lines
+MAX_QUERY_LENGTH = 8000
+
+
+@pytest.fixture
+def supabase_requests(monkeypatch):
+    """
+    Built Supabase queries are recorded instead of sent, as
+    (path, method, encoded query string), and return no rows
+    """
+    requests = []
+
+    def execute(self):
+        request = self.request
+        requests.append((request.path, request.http_method, str(request.params)))
+        return SimpleNamespace(data=[], count=0)
+
+    monkeypatch.setattr(SyncQueryRequestBuilder, "execute", execute)
+    return requests
@@ -0,0 +1,76 @@
+import asyncio
+from fastapi import FastAPI, Header, Response
+from starlette.requests import Request
+from routers import batch
+
+app = FastAPI()
+
+
+@app.get("/api/echo")
+async def echo(
+    if_none_match: str = Header(None),
+    idempotency_key: str = Header(None),
+    accept: str = Header(None),
+    cookie: str = Header(None),
+):
+    return {
+        "if_none_match": if_none_match,
+        "idempotency_key": idempotency_key,
+        "accept": accept,
+        "cookie": cookie,
+    }
+
+
+@app.get("/api/broken")
+async def broken():
+    return Response(b"{not json", media_type="application/json")
+
+
+def dispatch(item: dict) -> dict:
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "scheme": "http",
+            "server": ("test", 80),
+            "path": "/api/batch/email",
+            "headers": [],
+            "app": app,
+        }
+    )
+    return asyncio.run(batch.dispatch(request, "Bearer token", item))
+
+
+def test_per_request_headers_are_forwarded():
+    result = dispatch(
+        {
+            "method": "GET",
+            "path": "/api/echo",
+            "headers": {
+                "If-None-Match": '"v1"',
+                "Idempotency-Key": "key-1",
+                "Accept": "application/json",
+                "Cookie": "session=1",
+            },
+        }
+    )
+
+    assert result["status"] == 200
+    assert result["body"] == {
+        "if_none_match": '"v1"',
+        "idempotency_key": "key-1",
+        "accept": "application/json",
+        "cookie": None,
+    }
+
+
+def test_unreadable_json_is_returned_as_text():
+    result = dispatch({"method": "GET", "path": "/api/broken"})
+
+    assert result == {"id": None, "status": 200, "body": "{not json"}
+
+
+def test_read_body():
+    assert batch.read_body(b'{"a": 1}', "application/json; charset=utf-8") == {"a": 1}
+    assert batch.read_body(b"", "application/json") is None
+    assert batch.read_body(b"done", "text/plain") == "done"
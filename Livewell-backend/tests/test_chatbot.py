@@ -0,0 +1,81 @@
+import asyncio
+from models import MedicationBatchUpdate
+from routers import chatbot
+
+CURRENT = {
+    "1": {
+        "med_id": 1,
+        "name": "Metformin",
+        "dose_value": 500,
+        "dose_unit": "mg",
+        "frequency_type": "daily",
+        "frequency_time": "08:00",
+        "start_date": "2026-10-01",
+    },
+    "2": {
+        "med_id": 2,
+        "name": "Aspirin",
+        "dose_value": 100,
+        "dose_unit": "mg",
+        "frequency_type": "daily",
+        "frequency_time": "20:00",
+        "start_date": "2026-10-01",
+    },
+}
+
+
+def update(items: list) -> tuple:
+    sent = []
+
+    async def update_medications(payload, bodies):
+        sent.extend(bodies)
+        return [
+            {"index": i, "med_id": body.med_id, "status": "updated"}
+            for i, body in enumerate(bodies)
+        ]
+
+    results = asyncio.run(
+        chatbot.update_lists(
+            {"sub": "user"},
+            items,
+            CURRENT,
+            "med_id",
+            MedicationBatchUpdate,
+            update_medications,
+        )
+    )
+    return results, sent
+
+
+def test_changes_are_merged_into_the_current_rows():
+    results, sent = update([{"med_id": 2, "dose_value": 75, "notes": None}])
+
+    assert results == [{"index": 0, "med_id": "2", "status": "updated"}]
+    assert sent[0].dose_value == 75
+    assert sent[0].name == "Aspirin"
+
+
+def test_unknown_and_invalid_rows_get_their_own_result():
+    # Another user's (or a made up) med_id has no current row to merge into,
+    # it must not reach model validation and fail the whole call
+    results, sent = update(
+        [
+            {"med_id": 99, "name": "Ibuprofen"},
+            {"med_id": 1, "dose_value": "a lot"},
+            {"med_id": 2, "dose_value": 75},
+        ]
+    )
+
+    assert [(r["index"], r["med_id"], r["status"]) for r in results] == [
+        (0, "99", "not_found"),
+        (1, "1", "invalid"),
+        (2, "2", "updated"),
+    ]
+    assert [body.med_id for body in sent] == ["2"]
+
+
+def test_nothing_to_update_skips_the_batch_call():
+    results, sent = update([{"med_id": 99, "name": "Ibuprofen"}])
+
+    assert results == [{"index": 0, "med_id": "99", "status": "not_found"}]
+    assert sent == []
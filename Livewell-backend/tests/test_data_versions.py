@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+from fastapi import Response
+from utils import data_versions as module
+from utils.data_versions import DataVersions, etag_matches
+
+
+class FakeVersionQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        latest = max(self.rows, key=lambda row: row["updated_at"], default=None)
+        return SimpleNamespace(data=[latest] if latest else [], count=len(self.rows))
+
+
+def use_rows(monkeypatch, rows: list):
+    monkeypatch.setattr(
+        module,
+        "supabase_admin",
+        SimpleNamespace(table=lambda name: FakeVersionQuery(rows)),
+    )
+
+
+def respond(versions: DataVersions, if_none_match=None):
+    fetched = []
+
+    async def fetch():
+        fetched.append(True)
+        return ["row"]
+
+    response = Response()
+    result = asyncio.run(
+        versions.respond("medications", "user", if_none_match, response, fetch)
+    )
+    return result, response.headers.get("etag"), bool(fetched)
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_workers_agree_on_the_etag(monkeypatch):
+    use_rows(monkeypatch, [{"updated_at": "2026-10-01T00:00:00+00:00"}])
+
+    _, etag, _ = respond(DataVersions())
+    result, _, fetched = respond(DataVersions(), etag)
+
+    # Another worker (or a restart) still answers 304, without reading the list
+    assert result.status_code == 304
+    assert not fetched
+
+
+def test_writes_change_the_etag(monkeypatch):
+    rows = [{"updated_at": "2026-10-01T00:00:00+00:00"}]
+    use_rows(monkeypatch, rows)
+    versions = DataVersions()
+
+    _, etag, _ = respond(versions)
+
+    # Updated from another worker, no bump in this one
+    rows[0] = {"updated_at": "2026-10-02T00:00:00+00:00"}
+    result, updated_etag, fetched = respond(versions, etag)
+    assert result == ["row"] and fetched
+    assert updated_etag != etag
+
+    # Deleted
+    rows.append({"updated_at": "2026-09-01T00:00:00+00:00"})
+    _, etag, _ = respond(versions)
+    rows.pop()
+    assert respond(versions, etag)[1] != etag
@@ -0,0 +1,126 @@
+import uuid
+import pytest
+from types import SimpleNamespace
+from conftest import MAX_QUERY_LENGTH
+from utils import device_tokens, medication_reminders, supabase_config
+from utils.recommendation_fingerprint import load_fingerprints
+
+
+class RecordingQuery:
+    """
+    Records the calls made on a Supabase query
+    """
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return method
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+class RecordingSupabase:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(("table", (name,), {}))
+        return RecordingQuery(self.calls)
+
+
+def record(monkeypatch) -> list:
+    supabase = RecordingSupabase()
+    monkeypatch.setattr(device_tokens, "supabase_admin", supabase)
+    return supabase.calls
+
+
+def test_register_upserts_on_the_device_token(monkeypatch):
+    calls = record(monkeypatch)
+
+    device_tokens.register_token("user", "token-a", "android")
+
+    name, args, kwargs = calls[1]
+    assert name == "upsert"
+    assert args[0]["id"] == "user"
+    assert args[0]["device_token"] == "token-a"
+    assert "last_seen" in args[0]
+    assert kwargs == {"on_conflict": "device_token"}
+
+
+def test_unregister_without_a_token_removes_every_device(monkeypatch):
+    calls = record(monkeypatch)
+
+    device_tokens.unregister_token("user")
+
+    assert [call[:2] for call in calls[1:]] == [("delete", ()), ("eq", ("id", "user"))]
+
+
+def test_unregister_with_a_token_removes_that_device(monkeypatch):
+    calls = record(monkeypatch)
+
+    device_tokens.unregister_token("user", "token-a")
+
+    assert [call[:2] for call in calls[1:]] == [
+        ("delete", ()),
+        ("eq", ("id", "user")),
+        ("eq", ("device_token", "token-a")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "lookup",
+    [
+        device_tokens.get_tokens_for_users,
+        load_fingerprints,
+        medication_reminders.get_user_timezones,
+    ],
+)
+def test_bulk_lookups_fit_in_the_query_string(supabase_requests, lookup):
+    user_ids = [str(uuid.uuid4()) for _ in range(1000)]
+
+    lookup(user_ids)
+
+    assert len(supabase_requests) > 1
+    assert max(len(query) for _, _, query in supabase_requests) < MAX_QUERY_LENGTH
+
+
+class FlakyQuery:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("connection reset")
+        return SimpleNamespace(data=[{"id": "user", "device_token": "token-a"}])
+
+
+def test_lookups_are_retried(monkeypatch):
+    monkeypatch.setattr(supabase_config, "LOOKUP_RETRY_BASE_DELAY", 0)
+    query = FlakyQuery(failures=supabase_config.LOOKUP_MAX_ATTEMPTS - 1)
+
+    assert supabase_config.execute_with_retry(query).data[0]["id"] == "user"
+    assert query.attempts == supabase_config.LOOKUP_MAX_ATTEMPTS
+
+
+def test_failed_lookup_is_not_read_as_no_devices(monkeypatch):
+    monkeypatch.setattr(supabase_config, "LOOKUP_RETRY_BASE_DELAY", 0)
+    query = FlakyQuery(failures=supabase_config.LOOKUP_MAX_ATTEMPTS)
+
+    class FlakySupabase:
+        def table(self, name):
+            return RecordingQuery([])
+
+    monkeypatch.setattr(device_tokens, "supabase_admin", FlakySupabase())
+    monkeypatch.setattr(RecordingQuery, "execute", lambda self: query.execute())
+
+    with pytest.raises(ConnectionError):
+        device_tokens.get_tokens_for_users(["user"])
+    assert query.attempts == supabase_config.LOOKUP_MAX_ATTEMPTS
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from utils.dispatch_queue import (
+    NOTI_LOCAL_HOUR,
+    NOTI_WINDOW_MINUTES,
+    DispatchQueue,
+    bucket_messages,
+    dispatch_time,
+)
+
+# When the weekly send job runs: Sunday 20:00 UTC, Monday 07:00 in Melbourne
+SEND_JOB_TIME = datetime(2026, 10, 18, 20, 0, tzinfo=timezone.utc).timestamp()
+
+TIMEZONES = [
+    "Australia/Perth",
+    "Australia/Darwin",
+    "Australia/Adelaide",
+    "Australia/Brisbane",
+    "Australia/Melbourne",
+]
+
+
+def test_dispatch_time_is_local_morning_after_the_job():
+    for tz in TIMEZONES:
+        send_at = dispatch_time("user-1", tz, SEND_JOB_TIME)
+        local = datetime.fromtimestamp(send_at, ZoneInfo(tz))
+
+        assert send_at > SEND_JOB_TIME
+        assert local.strftime("%A") == "Monday"
+        assert NOTI_LOCAL_HOUR * 60 <= local.hour * 60 + local.minute
+        assert (
+            local.hour * 60 + local.minute < NOTI_LOCAL_HOUR * 60 + NOTI_WINDOW_MINUTES
+        )
+
+
+def test_dispatch_time_rolls_to_tomorrow_when_window_is_over():
+    # Monday 12:00 UTC, the morning window has passed everywhere in Australia
+    now = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc).timestamp()
+
+    send_at = dispatch_time("user-1", "Australia/Melbourne", now)
+    local = datetime.fromtimestamp(send_at, ZoneInfo("Australia/Melbourne"))
+
+    assert send_at > now
+    assert local.date().isoformat() == "2026-10-20"
+    assert local.hour >= NOTI_LOCAL_HOUR
+
+
+def test_dispatch_time_is_stable_per_user():
+    assert dispatch_time("user-1", "Australia/Perth", SEND_JOB_TIME) == dispatch_time(
+        "user-1", "Australia/Perth", SEND_JOB_TIME
+    )
+
+
+def test_buckets_are_per_timezone_and_in_the_future():
+    items = [(f"user-{tz}", tz, f"message-{tz}") for tz in TIMEZONES]
+
+    buckets = bucket_messages(items, SEND_JOB_TIME)
+
+    assert len(buckets) == len(TIMEZONES)
+    assert all(send_at > SEND_JOB_TIME for send_at in buckets)
+    assert sorted(sum(buckets.values(), [])) == sorted(item[2] for item in items)
+
+
+def test_queue_orders_buckets_by_time():
+    async def scenario():
+        queue = DispatchQueue()
+        queue.schedule(300.0, ["late"])
+        queue.schedule(100.0, ["early"])
+        return [queue.heap[0][2], len(queue)]
+
+    assert asyncio.run(scenario()) == [["early"], 2]
@@ -0,0 +1,12 @@
+from conftest import MAX_QUERY_LENGTH
+from utils import fcm_delivery
+
+
+def test_prune_keeps_the_query_string_short(supabase_requests):
+    tokens = [f"{i:04d}:" + "x" * 158 for i in range(500)]
+
+    fcm_delivery.prune_device_tokens(tokens)
+
+    assert len(supabase_requests) == -(-500 // fcm_delivery.PRUNE_BATCH_SIZE)
+    assert all(method == "DELETE" for _, method, _ in supabase_requests)
+    assert max(len(query) for *_, query in supabase_requests) < MAX_QUERY_LENGTH
@@ -0,0 +1,179 @@
+import json
+import uuid
+import asyncio
+from conftest import MAX_QUERY_LENGTH
+from utils import goal_recommendation
+from utils.recommendation_provider import LocalRecommendationProvider
+
+GOAL = {"target_steps": 7000, "target_water_intake_ml": 1500, "confidence": 0.0}
+
+REPLY = {
+    "Weekly Goal": {
+        "target_water_intake_ml": "2000",
+        "target_steps": "9000",
+        "description": "Walk to the shops.",
+    }
+}
+
+
+def prepare(monkeypatch, replies: dict, stored: dict) -> tuple:
+    saved = []
+
+    async def get_users():
+        return [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+
+    def get_user_context(user, device_tokens):
+        return {
+            "id": user["id"],
+            "user_info": {"user": user["id"]},
+            "device_tokens": device_tokens,
+            "timezone": "Australia/Melbourne",
+        }
+
+    monkeypatch.setattr(goal_recommendation, "get_users", get_users)
+    monkeypatch.setattr(
+        goal_recommendation,
+        "get_tokens_for_users",
+        lambda user_ids: {user_id: [f"token-{user_id}"] for user_id in user_ids},
+    )
+    monkeypatch.setattr(goal_recommendation, "get_user_context", get_user_context)
+    monkeypatch.setattr(goal_recommendation, "load_fingerprints", lambda ids: stored)
+    monkeypatch.setattr(goal_recommendation, "save_fingerprints", saved.extend)
+    monkeypatch.setattr(
+        goal_recommendation, "compute_goals", lambda infos: [GOAL for _ in infos]
+    )
+
+    provider = LocalRecommendationProvider(
+        {user_id: json.dumps(reply) for user_id, reply in replies.items()}
+    )
+    recommendations = asyncio.run(goal_recommendation.prepare_recommendation(provider))
+
+    return saved, recommendations
+
+
+def by_user(recommendations: list) -> dict:
+    return {rec.user_id: rec.recommendation.weekly_goal for rec in recommendations}
+
+
+def test_only_model_replies_are_fingerprinted(monkeypatch):
+    # a: model reply, b: no reply (rate limited), c: unreadable reply
+    saved, recommendations = prepare(monkeypatch, {"a": REPLY, "c": "not json"}, {})
+
+    assert [row["id"] for row in saved] == ["a"]
+    assert saved[0]["recommendation"] == REPLY
+
+    goals = by_user(recommendations)
+    assert goals["a"].target_steps == "9000"
+    assert goals["b"].target_steps == goals["c"].target_steps == "7000"
+
+
+def test_unchanged_users_reuse_the_model_reply(monkeypatch):
+    fingerprint = goal_recommendation.build_fingerprint({"user": "a"})
+    stored = {"a": {"fingerprint": fingerprint, "recommendation": REPLY}}
+
+    saved, recommendations = prepare(monkeypatch, {}, stored)
+
+    # a reused, b and c fell back to local goals and are not stored
+    assert saved == []
+    assert by_user(recommendations)["a"].target_steps == "9000"
+
+
+class FakeDispatchQueue:
+    def __init__(self):
+        self.buckets = []
+
+    def schedule(self, send_at, messages, on_sent=None):
+        self.buckets.append((send_at, messages, on_sent))
+
+
+def row(recommend_id: str, user_id: str) -> dict:
+    return {
+        "recommend_id": recommend_id,
+        "id": user_id,
+        "steps_target": "9000",
+        "water_intake_ml_target": "2000",
+    }
+
+
+def test_pushes_are_queued_after_the_rows_are_stored(monkeypatch):
+    _, recommendations = prepare(monkeypatch, {"a": REPLY}, {})
+    queue = FakeDispatchQueue()
+    stored = []
+
+    def insert_recommendations(rows):
+        stored.extend(rows)
+        # A failed batch: b's row was not stored
+        return [
+            {**rec, "recommend_id": f"r-{rec['id']}"}
+            for rec in rows
+            if rec["id"] != "b"
+        ]
+
+    monkeypatch.setattr(
+        goal_recommendation, "insert_recommendations", insert_recommendations
+    )
+    monkeypatch.setattr(goal_recommendation, "dispatch_queue", queue)
+
+    asyncio.run(goal_recommendation.send_fcm_noti(recommendations))
+
+    assert sorted(rec["id"] for rec in stored) == ["a", "b", "c"]
+
+    # Only the stored rows are pushed
+    messages = [message for _, bucket, _ in queue.buckets for message in bucket]
+    assert sorted(message.token for message in messages) == ["token-a", "token-c"]
+    assert {message.data["target_steps"] for message in messages} == {"9000", "7000"}
+
+
+def test_sent_buckets_mark_their_rows(monkeypatch):
+    queue = FakeDispatchQueue()
+    marked = []
+
+    monkeypatch.setattr(goal_recommendation, "dispatch_queue", queue)
+    monkeypatch.setattr(goal_recommendation, "mark_notified", marked.extend)
+
+    count = goal_recommendation.schedule_pushes(
+        [row("r-a", "a"), row("r-b", "b"), row("r-c", "c")],
+        {"a": ["token-a"], "c": ["token-c"]},
+        {"a": "Australia/Perth", "c": "Australia/Melbourne"},
+    )
+
+    # b has no device
+    assert count == 2
+    assert len(queue.buckets) == 2
+    assert marked == []
+
+    for _, _, on_sent in queue.buckets:
+        on_sent()
+
+    assert sorted(marked) == ["r-a", "r-c"]
+
+
+def test_unsent_pushes_are_queued_again_at_startup(monkeypatch):
+    queue = FakeDispatchQueue()
+
+    monkeypatch.setattr(goal_recommendation, "dispatch_queue", queue)
+    monkeypatch.setattr(
+        goal_recommendation, "get_pending_pushes", lambda: [row("r-a", "a")]
+    )
+    monkeypatch.setattr(
+        goal_recommendation, "get_tokens_for_users", lambda user_ids: {"a": ["token-a"]}
+    )
+    monkeypatch.setattr(
+        goal_recommendation,
+        "get_user_timezones",
+        lambda user_ids: {"a": "Australia/Perth"},
+    )
+
+    asyncio.run(goal_recommendation.restore_pushes())
+
+    [(_, messages, _)] = queue.buckets
+    assert [message.token for message in messages] == ["token-a"]
+
+
+def test_notified_updates_fit_in_the_query_string(supabase_requests):
+    recommend_ids = [str(uuid.uuid4()) for _ in range(1000)]
+
+    goal_recommendation.mark_notified(recommend_ids)
+
+    assert all(method == "PATCH" for _, method, _ in supabase_requests)
+    assert max(len(query) for _, _, query in supabase_requests) < MAX_QUERY_LENGTH
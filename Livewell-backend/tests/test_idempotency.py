@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utils.idempotency import IdempotencyStore
+
+
+def counter():
+    calls = []
+
+    def fn():
+        calls.append(True)
+        return {"med_id": len(calls)}
+
+    return fn, calls
+
+
+def test_retry_with_the_same_key_is_replayed():
+    store = IdempotencyStore()
+    fn, calls = counter()
+
+    async def scenario():
+        first = await store.run("user", "create", "key-1", {"name": "A"}, fn)
+        retry = await store.run("user", "create", "key-1", {"name": "A"}, fn)
+        return first, retry
+
+    first, retry = asyncio.run(scenario())
+
+    assert first == retry == {"med_id": 1}
+    assert len(calls) == 1
+    assert store.replayed == 1
+
+
+def test_key_reused_for_a_different_body_is_rejected():
+    store = IdempotencyStore()
+    fn, calls = counter()
+
+    async def scenario():
+        await store.run("user", "create", "key-1", {"name": "A"}, fn)
+        await store.run("user", "create", "key-1", {"name": "B"}, fn)
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(scenario())
+
+    assert e.value.status_code == 422
+    assert len(calls) == 1
+
+
+def test_keys_are_scoped_per_user_and_operation():
+    store = IdempotencyStore()
+    fn, calls = counter()
+
+    async def scenario():
+        await store.run("user", "create", "key-1", {}, fn)
+        await store.run("other", "create", "key-1", {}, fn)
+        await store.run("user", "register-device", "key-1", {}, fn)
+        await store.run("user", "create", None, {}, fn)
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 4
+
+
+def test_concurrent_duplicate_waits_for_the_first_request():
+    store = IdempotencyStore()
+    calls = []
+
+    async def fn():
+        calls.append(True)
+        await asyncio.sleep(0.01)
+        return {"med_id": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(
+            store.run("user", "create", "key-1", {}, fn),
+            store.run("user", "create", "key-1", {}, fn),
+        )
+
+    assert asyncio.run(scenario()) == [{"med_id": 1}, {"med_id": 1}]
+    assert len(calls) == 1
+
+
+def test_failed_requests_can_be_retried():
+    store = IdempotencyStore()
+    attempts = []
+
+    def fn():
+        attempts.append(True)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return {"med_id": 1}
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("user", "create", "key-1", {}, fn)
+        return await store.run("user", "create", "key-1", {}, fn)
+
+    assert asyncio.run(scenario()) == {"med_id": 1}
+    assert len(attempts) == 2
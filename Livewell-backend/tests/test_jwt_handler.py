@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utils import jwt_handler
+
+
+def check(authorization: str):
+    asyncio.run(jwt_handler.verify_metrics_token(authorization))
+
+
+def test_metrics_are_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(jwt_handler, "METRICS_TOKEN", None)
+
+    with pytest.raises(HTTPException) as e:
+        check("Bearer anything")
+    assert e.value.status_code == 403
+
+
+def test_metrics_token_must_match(monkeypatch):
+    monkeypatch.setattr(jwt_handler, "METRICS_TOKEN", "ops-secret")
+
+    with pytest.raises(HTTPException) as e:
+        check("Bearer user-jwt")
+    assert e.value.status_code == 401
+
+    check("Bearer ops-secret")
+    check("ops-secret")
@@ -0,0 +1,125 @@
+import json
+from utils import local_resource_import
+
+HEADER = "id,name,category,description,address,postcode,contact_info\n"
+
+ROW = "r{n},Clinic {n},health,Walk-in clinic,1 Main St,3000,03 9000 0000\n"
+
+
+def run_import(
+    monkeypatch, tmp_path, name: str, content: str, table: str = "local_resources"
+):
+    batches = []
+
+    def upsert_batch(into, batch):
+        assert into == table
+        batches.append(dict(batch))
+
+    monkeypatch.setattr(local_resource_import, "upsert_batch", upsert_batch)
+
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+
+    report = local_resource_import.import_local_resources(
+        str(path), batch_size=2, table=table
+    )
+    with open(report["errors_path"], encoding="utf-8") as f:
+        rejected = [json.loads(line) for line in f]
+
+    return report, [row for batch in batches for row in batch.values()], rejected
+
+
+def test_bad_csv_rows_are_rejected_and_the_rest_imported(monkeypatch, tmp_path):
+    content = (
+        HEADER
+        + ROW.format(n=1)
+        # Unquoted comma in the description
+        + "r2,Clinic 2,health,Walk-in, no booking,1 Main St,3000,03 9000 0000\n"
+        # Missing contact_info
+        + "r3,Clinic 3,health,Walk-in clinic,1 Main St,3000\n"
+        + ROW.format(n=4)
+        + ROW.format(n=5)
+    )
+
+    report, imported, rejected = run_import(
+        monkeypatch, tmp_path, "resources.csv", content
+    )
+
+    assert [row["id"] for row in imported] == ["r1", "r4", "r5"]
+    assert report["read"] == 5
+    assert report["imported"] == 3
+    assert report["rejected"] == 2
+    assert [error["line"] for error in rejected] == [3, 4]
+    assert rejected[0]["error"] == "1 more fields than the header"
+    assert rejected[1]["error"].startswith("contact_info")
+
+
+def test_bad_ndjson_lines_are_rejected(monkeypatch, tmp_path):
+    good = {
+        "id": "r1",
+        "name": "Clinic 1",
+        "category": "health",
+        "description": "Walk-in clinic",
+        "address": "1 Main St",
+        "postcode": "3000",
+        "contact_info": "03 9000 0000",
+    }
+    content = "\n".join(
+        [json.dumps(good), "{not json", json.dumps(["r2"]), json.dumps({"id": "r3"})]
+    )
+
+    report, imported, rejected = run_import(
+        monkeypatch, tmp_path, "resources.ndjson", content
+    )
+
+    assert [row["id"] for row in imported] == ["r1"]
+    assert report["rejected"] == 3
+    assert [error["line"] for error in rejected] == [2, 3, 4]
+
+
+def test_failed_batches_are_rejected_row_by_row(monkeypatch, tmp_path):
+    def upsert_batch(table, batch):
+        raise ConnectionError("connection reset")
+
+    path = tmp_path / "resources.csv"
+    path.write_text(HEADER + ROW.format(n=1) + ROW.format(n=2), encoding="utf-8")
+    monkeypatch.setattr(local_resource_import, "upsert_batch", upsert_batch)
+
+    report = local_resource_import.import_local_resources(str(path))
+
+    assert report["imported"] == 0
+    assert report["rejected"] == 2
+
+
+def test_postcode_centroids_are_imported_by_postcode(monkeypatch, tmp_path):
+    content = (
+        "postcode,latitude,longitude\n"
+        "3000,-37.8141,144.9633\n"
+        "3053,-37.8,144.967\n"
+        "3000,-37.8136,144.9631\n"
+        "9999,-137.0,144.0\n"
+    )
+
+    report, imported, rejected = run_import(
+        monkeypatch, tmp_path, "centroids.csv", content, table="postcode_centroids"
+    )
+
+    # Upserts apply in file order, so the repeated postcode ends up as its last row
+    latest = {row["postcode"]: row["latitude"] for row in imported}
+    assert latest == {"3000": -37.8136, "3053": -37.8}
+    assert report["rejected"] == 1
+    assert rejected[0]["error"].startswith("latitude")
+
+
+def test_suburbs_are_imported_by_suburb_and_postcode(monkeypatch, tmp_path):
+    content = "suburb,postcode\nCarlton,3053\nCarlton,2218\nNowhere,30530\n,3000\n"
+
+    report, imported, rejected = run_import(
+        monkeypatch, tmp_path, "suburbs.csv", content, table="suburbs"
+    )
+
+    assert [(row["suburb"], row["postcode"]) for row in imported] == [
+        ("Carlton", "3053"),
+        ("Carlton", "2218"),
+    ]
+    assert [error["line"] for error in rejected] == [4, 5]
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from routers import local_resources
+from utils.local_resource_index import LocalResourceIndex
+
+
+def resource(resource_id: str, postcode: str, category: str = "health") -> dict:
+    return {
+        "id": resource_id,
+        "name": f"Resource {resource_id}",
+        "category": category,
+        "description": "Walk-in clinic",
+        "address": "1 Main St",
+        "postcode": postcode,
+        "contact_info": "03 9000 0000",
+    }
+
+
+CENTROIDS = [
+    {"postcode": "3000", "latitude": -37.8141, "longitude": 144.9633},
+    {"postcode": "3053", "latitude": -37.8, "longitude": 144.967},
+    {"postcode": "3220", "latitude": -38.1499, "longitude": 144.3617},
+    # No resources of its own
+    {"postcode": "3052", "latitude": -37.7844, "longitude": 144.9553},
+]
+
+
+@pytest.fixture
+def index(monkeypatch) -> LocalResourceIndex:
+    index = LocalResourceIndex()
+    index.build(
+        [
+            resource("melbourne", "3000"),
+            resource("carlton", "3053"),
+            resource("carlton-gym", "3053", "fitness"),
+            resource("geelong", "3220"),
+        ],
+        CENTROIDS,
+    )
+    monkeypatch.setattr(local_resources, "local_resource_index", index)
+    return index
+
+
+def nearby(postcode: str, radius_km: float, category: str = None) -> list:
+    return asyncio.run(
+        local_resources.get_nearby_local_resources(postcode, radius_km, category)
+    )
+
+
+def test_nearby_is_sorted_by_distance(index):
+    results = nearby("3053", 10)
+
+    assert [row["id"] for row in results] == ["carlton", "carlton-gym", "melbourne"]
+    assert results[0]["distance_km"] == 0
+    assert [row["distance_km"] for row in results] == sorted(
+        row["distance_km"] for row in results
+    )
+
+
+def test_nearby_filters_by_category(index):
+    assert [row["id"] for row in nearby("3000", 10, "fitness")] == ["carlton-gym"]
+
+
+def test_postcode_without_resources_searches_around_its_centroid(index):
+    assert {row["id"] for row in nearby("3052", 5)} == {
+        "carlton",
+        "carlton-gym",
+        "melbourne",
+    }
+
+
+def test_radius_reaches_other_cities(index):
+    assert "geelong" not in {row["id"] for row in nearby("3000", 50)}
+    assert "geelong" in {row["id"] for row in nearby("3000", 100)}
+
+
+def test_unknown_postcode_is_404(index):
+    with pytest.raises(HTTPException) as error:
+        nearby("0800", 10)
+
+    assert error.value.status_code == 404
@@ -0,0 +1,67 @@
+from utils import location_autocomplete
+from utils.location_autocomplete import LocationAutocomplete
+
+ROWS = [
+    {"suburb": "CARLTON", "postcode": "3053"},
+    {"suburb": "Carlton North", "postcode": "3054"},
+    {"suburb": "Carlton", "postcode": "2218"},
+    {"suburb": "St  Kilda", "postcode": "3182"},
+    {"suburb": "St Kilda", "postcode": "3182"},
+    {"suburb": "", "postcode": "3000"},
+]
+
+
+def build() -> LocationAutocomplete:
+    autocomplete = LocationAutocomplete()
+    autocomplete.build(ROWS)
+    return autocomplete
+
+
+def test_suburb_prefix_matches_in_name_order():
+    assert build().suggest("carl") == [
+        {"suburb": "Carlton", "postcode": "2218"},
+        {"suburb": "Carlton", "postcode": "3053"},
+        {"suburb": "Carlton North", "postcode": "3054"},
+    ]
+
+
+def test_names_are_matched_case_and_whitespace_insensitively():
+    # Two spellings of one suburb collapse into one suggestion
+    assert build().suggest("  ST   kil") == [{"suburb": "St Kilda", "postcode": "3182"}]
+
+
+def test_postcode_prefix():
+    assert build().suggest("305") == [
+        {"suburb": "Carlton", "postcode": "3053"},
+        {"suburb": "Carlton North", "postcode": "3054"},
+    ]
+
+
+def test_limit_and_no_match():
+    autocomplete = build()
+
+    assert len(autocomplete.suggest("c", limit=2)) == 2
+    assert autocomplete.suggest("zz") == []
+    assert autocomplete.suggest("   ") == []
+
+
+def test_refresh_reloads_only_when_the_table_changed(monkeypatch):
+    versions = iter(["1:a", "1:a", "2:b"])
+    loads = []
+
+    monkeypatch.setattr(
+        location_autocomplete, "table_version", lambda table: next(versions)
+    )
+    monkeypatch.setattr(
+        location_autocomplete,
+        "load_table",
+        lambda table, columns, order: loads.append(table) or ROWS,
+    )
+
+    autocomplete = LocationAutocomplete()
+    autocomplete.load()
+    autocomplete.refresh()
+    autocomplete.refresh()
+
+    assert loads == ["suburbs", "suburbs"]
+    assert autocomplete.version == "2:b"
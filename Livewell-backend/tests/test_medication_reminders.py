@@ -0,0 +1,130 @@
+import time
+import asyncio
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from utils import medication_reminders
+from utils.medication_reminders import MedicationReminders, next_dose_time
+
+TZ = "Australia/Melbourne"
+
+
+def local(*args) -> float:
+    return datetime(*args, tzinfo=ZoneInfo(TZ)).timestamp()
+
+
+def medication(**fields) -> dict:
+    med = {
+        "med_id": 1,
+        "id": "user",
+        "name": "Metformin",
+        "frequency_type": "Daily",
+        "frequency_time": "08:00",
+        "start_date": "2026-10-01",
+        "durations": None,
+    }
+    med.update(fields)
+    return med
+
+
+def test_daily_dose_later_today():
+    after = local(2026, 10, 19, 7, 0)
+
+    assert next_dose_time(medication(), TZ, after) == local(2026, 10, 19, 8, 0)
+
+
+def test_dose_at_the_moment_moves_to_the_next_day():
+    after = local(2026, 10, 19, 8, 0)
+
+    assert next_dose_time(medication(), TZ, after) == local(2026, 10, 20, 8, 0)
+
+
+def test_twice_a_day_with_one_time_adds_the_evening_dose():
+    med = medication(frequency_type="Twice a day")
+
+    assert next_dose_time(med, TZ, local(2026, 10, 19, 9, 0)) == local(
+        2026, 10, 19, 20, 0
+    )
+
+
+def test_weekly_doses_fall_on_the_start_weekday():
+    # 2026-10-01 is a Thursday, 2026-10-19 a Monday
+    med = medication(frequency_type="Weekly")
+
+    assert next_dose_time(med, TZ, local(2026, 10, 19, 9, 0)) == local(
+        2026, 10, 22, 8, 0
+    )
+
+
+def test_course_not_started_yet():
+    med = medication(start_date="2026-11-01")
+
+    assert next_dose_time(med, TZ, local(2026, 10, 19, 9, 0)) == local(
+        2026, 11, 1, 8, 0
+    )
+
+
+def test_finished_course_has_no_next_dose():
+    after = local(2026, 10, 19, 9, 0)
+
+    assert next_dose_time(medication(durations=10), TZ, after) is None
+    # Last day's dose already taken
+    assert (
+        next_dose_time(medication(start_date="2026-10-19", durations=1), TZ, after)
+        is None
+    )
+
+
+def test_local_time_is_kept_across_daylight_saving():
+    # Melbourne moves to AEDT at 02:00 on 2026-10-04
+    after = local(2026, 10, 3, 9, 0)
+
+    assert next_dose_time(medication(), TZ, after) == local(2026, 10, 4, 8, 0)
+    assert datetime.fromtimestamp(local(2026, 10, 4, 8, 0), ZoneInfo("UTC")).hour == 21
+
+
+def test_unreadable_start_date():
+    assert next_dose_time(medication(start_date="soon"), TZ, time.time()) is None
+
+
+def test_changed_and_removed_medications_are_skipped():
+    reminders = MedicationReminders()
+    later = time.time() + 2 * 86400
+
+    # Changed twice, only the latest entry counts
+    reminders.upsert(medication(med_id=1, name="Old name"), TZ)
+    reminders.upsert(medication(med_id=1, name="New name"), TZ)
+    reminders.upsert(medication(med_id=2), TZ)
+    reminders.remove(2)
+
+    due = reminders.pop_due(later)
+
+    assert [med["name"] for med in due] == ["New name"]
+    # Its next dose is scheduled after the one just sent
+    assert reminders.heap[0][0] > later
+
+
+def test_time_zones_are_looked_up_off_the_event_loop(monkeypatch):
+    lookups = []
+
+    def get_user_timezones(user_ids):
+        lookups.append((sorted(user_ids), threading.current_thread()))
+        return {user_id: "Australia/Perth" for user_id in user_ids}
+
+    monkeypatch.setattr(medication_reminders, "get_user_timezones", get_user_timezones)
+    reminders = MedicationReminders()
+
+    async def scenario():
+        await reminders.upsert_many(
+            [medication(med_id=1, id="a"), medication(med_id=2, id="b")]
+        )
+        # Known users are not looked up again
+        await reminders.upsert_many([medication(med_id=3, id="a")])
+
+    asyncio.run(scenario())
+
+    [(user_ids, thread)] = lookups
+    assert user_ids == ["a", "b"]
+    assert thread is not threading.main_thread()
+    assert reminders.timezones == {"a": "Australia/Perth", "b": "Australia/Perth"}
+    assert len(reminders) == 3
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+from routers import profile
+from utils.ttl_cache import TTLCache
+
+
+class FakeUsersInfo:
+    """
+    users_info with at most one row, for select and update by id
+    """
+
+    def __init__(self, row):
+        self.row = row
+        self.changes = None
+        self.writes = []
+
+    def select(self, columns):
+        self.changes = None
+        return self
+
+    def update(self, changes):
+        self.changes = changes
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        if self.row is None:
+            return SimpleNamespace(data=[])
+
+        if self.changes is not None:
+            self.row.update(self.changes)
+            self.writes.append(self.changes)
+
+        return SimpleNamespace(data=[dict(self.row)])
+
+
+def update(monkeypatch, row, body: dict) -> dict:
+    fake = FakeUsersInfo(row)
+    monkeypatch.setattr(
+        profile, "supabase_admin", SimpleNamespace(table=lambda name: fake)
+    )
+    return asyncio.run(profile.update_profile({"sub": "user"}, body))
+
+
+def test_update_drops_the_cached_profile(monkeypatch):
+    row = {"suburb": "Carlton", "postcode": "3053", "frailty_score": None}
+    profile.profile_cache.set("user", {"user_name": "Ann", "suburb": "Carlton"})
+
+    assert update(monkeypatch, row, {"suburb": "Parkville"}) == {"suburb": "Parkville"}
+    assert row["suburb"] == "Parkville"
+    assert profile.profile_cache.get("user") is None
+
+
+def test_update_without_an_info_row_drops_the_cached_profile(monkeypatch):
+    # Cached from profiles only, users_info has no row to update
+    profile.profile_cache.set("user", {"user_name": "Ann"})
+
+    assert update(monkeypatch, None, {"suburb": "Parkville"}) == {}
+    assert profile.profile_cache.get("user") is None
+
+
+def test_unchanged_fields_are_not_written(monkeypatch):
+    row = {"suburb": "Carlton", "postcode": "3053", "frailty_score": None}
+
+    assert update(monkeypatch, row, {"suburb": "Carlton", "postcode": None}) == {}
+
+
+def test_update_is_diffed_against_the_stored_row(monkeypatch):
+    # Another worker changed the suburb, this worker still caches the old one
+    row = {"suburb": "Parkville", "postcode": "3052", "frailty_score": None}
+    profile.profile_cache.set("user", {"suburb": "Carlton", "postcode": "3053"})
+
+    # Moving back is a change, the cached copy would have called it a no-op
+    assert update(monkeypatch, row, {"suburb": "Carlton"}) == {"suburb": "Carlton"}
+    assert row["suburb"] == "Carlton"
+
+
+def test_read_started_before_an_invalidation_is_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    token = cache.token()
+    cache.invalidate("user")
+
+    assert cache.set("user", {"suburb": "Carlton"}, token=token) is False
+    assert cache.get("user") is None
+
+    # Reads that start after the invalidation are cached again
+    assert cache.set("user", {"suburb": "Parkville"}, token=cache.token())
+    assert cache.get("user") == {"suburb": "Parkville"}
+
+
+def test_invalidation_of_another_key_does_not_block_caching():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    token = cache.token()
+    cache.invalidate("other")
+
+    assert cache.set("user", {"suburb": "Carlton"}, token=token)
+
+
+def test_forgotten_invalidations_still_block_older_reads():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    token = cache.token()
+    for key in ("user", "a", "b", "c"):
+        cache.invalidate(key)
+
+    # "user" fell out of the bounded invalidation log
+    assert "user" not in cache.invalidated
+    assert cache.set("user", {"suburb": "Carlton"}, token=token) is False
@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from google.genai import types
+import utils.recommendation_provider as provider_module
+from utils.recommendation_provider import (
+    GeminiBatchProvider,
+    LocalRecommendationProvider,
+    RecommendationProvider,
+)
+
+
+class PendingBatches:
+    """Batch client whose job never finishes"""
+
+    def __init__(self):
+        self.cancelled = []
+
+    def create(self, **kwargs):
+        return SimpleNamespace(name="batches/1", state=types.JobState.JOB_STATE_RUNNING)
+
+    def get(self, name):
+        return SimpleNamespace(name=name, state=types.JobState.JOB_STATE_RUNNING)
+
+    def cancel(self, name):
+        self.cancelled.append(name)
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RecommendationProvider()
+
+
+def test_local_provider_returns_only_canned_replies():
+    provider = LocalRecommendationProvider({"a": "{}"})
+
+    assert asyncio.run(provider.generate({"a": "p1", "b": "p2"})) == {"a": "{}"}
+    assert provider.prompts == {"a": "p1", "b": "p2"}
+
+
+def test_batch_timeout_cancels_job_and_returns_nothing(monkeypatch):
+    monkeypatch.setattr(provider_module, "BATCH_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(provider_module, "BATCH_POLL_SECONDS", 0)
+    batches = PendingBatches()
+    provider = GeminiBatchProvider(SimpleNamespace(batches=batches))
+
+    assert asyncio.run(provider.generate({"a": "prompt"})) == {}
+    assert batches.cancelled == ["batches/1"]
@@ -0,0 +1,106 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from utils import response_encoding
+from utils.response_encoding import (
+    CompressionMiddleware,
+    MsgpackMiddleware,
+    choose_encoding,
+)
+
+msgpack = pytest.importorskip("msgpack")
+
+ROWS = [{"med_id": i, "name": f"Medication {i}"} for i in range(100)]
+
+app = FastAPI()
+app.add_middleware(MsgpackMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/api/rows")
+async def rows():
+    return ROWS
+
+
+@app.get("/api/small")
+async def small():
+    return {"ok": True}
+
+
+@app.get("/api/text", response_class=PlainTextResponse)
+async def text():
+    return "x" * 4096
+
+
+client = TestClient(app)
+
+
+def get(path: str, **headers):
+    # TestClient sends its own Accept-Encoding unless told otherwise
+    headers.setdefault("accept-encoding", "identity")
+    return client.get(path, headers=headers)
+
+
+def vary(response) -> set:
+    return {value.strip() for value in response.headers.get("vary", "").split(",")}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("deflate, *;q=0.5", "gzip"),
+        ("*;q=0", None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_brotli(monkeypatch):
+    monkeypatch.setattr(response_encoding, "brotli", object())
+
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_uncompressed_responses_still_vary():
+    response = get("/api/rows")
+
+    assert "content-encoding" not in response.headers
+    assert {"Accept-Encoding", "Accept"} <= vary(response)
+    assert response.json() == ROWS
+
+
+def test_small_responses_still_vary():
+    response = get("/api/small", **{"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in vary(response)
+
+
+def test_gzip():
+    response = get("/api/rows", **{"accept-encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in vary(response)
+    assert response.json() == ROWS
+
+
+def test_msgpack():
+    response = get("/api/rows", accept="application/msgpack")
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in vary(response)
+    assert msgpack.unpackb(response.content) == ROWS
+
+
+def test_plain_text_is_left_alone():
+    response = get("/api/text", **{"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,37 @@
+import random
+from utils.spatial_index import GridIndex, haversine_km
+
+
+def test_haversine_melbourne_to_sydney():
+    assert 700 < haversine_km(-37.8136, 144.9631, -33.8688, 151.2093) < 720
+
+
+def test_within_matches_a_full_scan():
+    rng = random.Random(7)
+    points = {
+        str(i): (rng.uniform(-38.5, -37.0), rng.uniform(144.0, 146.0))
+        for i in range(2000)
+    }
+    grid = GridIndex(points)
+
+    for radius_km in (0.5, 5, 25, 100):
+        lat, lon = rng.uniform(-38.5, -37.0), rng.uniform(144.0, 146.0)
+
+        expected = sorted(
+            (haversine_km(lat, lon, *point), key)
+            for key, point in points.items()
+            if haversine_km(lat, lon, *point) <= radius_km
+        )
+
+        assert grid.within(lat, lon, radius_km) == expected
+
+
+def test_points_across_a_cell_edge_are_found():
+    # 0.1 degree cells, the two points are in neighbouring cells
+    grid = GridIndex({"a": (-37.8001, 144.9999), "b": (-37.7999, 145.0001)})
+
+    assert [key for _, key in grid.within(-37.8001, 144.9999, 1)] == ["a", "b"]
+
+
+def test_empty_grid():
+    assert GridIndex({}).within(-37.8, 144.9, 50) == []
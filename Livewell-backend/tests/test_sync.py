@@ -0,0 +1,145 @@
+import re
+import asyncio
+from types import SimpleNamespace
+from utils import sync
+
+# What after_position sends: col.gt."t",and(col.eq."t",key.gt."k")
+OR_FILTER = re.compile(
+    r'(\w+)\.gt\."([^"]*)",and\(\w+\.eq\."[^"]*",(\w+)\.gt\."([^"]*)"\)'
+)
+
+
+class FakeQuery:
+    """
+    The part of the Supabase query builder used by the sync
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.sort = []
+        self.count = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def or_(self, expression):
+        time_column, time, key_column, key = OR_FILTER.fullmatch(expression).groups()
+        self.filters.append(
+            lambda row: (row[time_column], str(row[key_column])) > (time, key)
+        )
+        return self
+
+    def order(self, column):
+        self.sort.append(column)
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(f(row) for f in self.filters)]
+        rows.sort(key=lambda row: tuple(str(row[column]) for column in self.sort))
+        return SimpleNamespace(data=[dict(row) for row in rows[: self.count]])
+
+
+def use_tables(monkeypatch, tables: dict):
+    monkeypatch.setattr(
+        sync,
+        "supabase_admin",
+        SimpleNamespace(table=lambda name: FakeQuery(tables.get(name, []))),
+    )
+    monkeypatch.setattr(sync, "SYNC_PAGE_SIZE", 2)
+
+
+def sync_all(cursor=None) -> tuple:
+    """
+    Page through medications like a client, until has_more is False
+    """
+    changes, deleted = [], []
+
+    while True:
+        page = asyncio.run(sync.get_collection_changes("user", "medications", cursor))
+        changes += [row["med_id"] for row in page["changes"]]
+        deleted += page["deleted"]
+        cursor = page["cursor"]
+
+        if not page["has_more"]:
+            return changes, deleted, cursor
+
+
+def medication(med_id: int, updated_at: str) -> dict:
+    return {"med_id": med_id, "id": "user", "updated_at": updated_at}
+
+
+def test_rows_sharing_a_timestamp_at_the_page_end_are_not_skipped(monkeypatch):
+    # Batch writes give many rows the same updated_at
+    use_tables(
+        monkeypatch,
+        {
+            "medications": [
+                medication(1, "2026-10-01T00:00:00+00:00"),
+                medication(2, "2026-10-02T00:00:00+00:00"),
+                medication(3, "2026-10-02T00:00:00+00:00"),
+                medication(4, "2026-10-02T00:00:00+00:00"),
+                medication(5, "2026-10-03T00:00:00+00:00"),
+            ]
+        },
+    )
+
+    changes, deleted, _ = sync_all()
+
+    assert changes == [1, 2, 3, 4, 5]
+    assert deleted == []
+
+
+def test_sync_resumes_after_the_cursor(monkeypatch):
+    rows = [medication(1, "2026-10-01T00:00:00+00:00")]
+    tombstones = []
+    use_tables(monkeypatch, {"medications": rows, "sync_tombstones": tombstones})
+
+    _, _, cursor = sync_all()
+
+    rows.append(medication(2, "2099-01-01T00:00:00+00:00"))
+    tombstones += [
+        {
+            "id": "user",
+            "collection": "medications",
+            "row_id": str(row_id),
+            "deleted_at": "2099-01-01T00:00:00+00:00",
+        }
+        for row_id in (7, 8, 9)
+    ]
+
+    changes, deleted, cursor = sync_all(cursor)
+    assert changes == [2]
+    assert deleted == ["7", "8", "9"]
+
+    # Nothing new
+    assert sync_all(cursor)[:2] == ([], [])
+
+
+def test_timestamp_cursors_are_still_accepted():
+    position = ("2026-10-01T00:00:00+00:00", None)
+
+    assert sync.decode_cursor("2026-10-01T00:00:00+00:00") == (position, position)
+    assert sync.decode_cursor(None) == (None, None)
+
+
+def test_cursor_round_trip():
+    changes = ("2026-10-02T00:00:00+00:00", "3")
+    deleted = ("2026-10-01T00:00:00+00:00", None)
+
+    assert sync.decode_cursor(sync.encode_cursor(changes, deleted)) == (
+        changes,
+        deleted,
+    )
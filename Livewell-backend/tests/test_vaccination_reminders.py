@@ -0,0 +1,171 @@
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from conftest import MAX_QUERY_LENGTH
+from utils import vaccination_reminders
+
+
+class FakeQuery:
+    """
+    The part of the Supabase query builder used by the reminder job
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.values = None
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row[column] <= value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def order(self, column):
+        self.rows = sorted(self.rows, key=lambda row: row[column])
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+    def update(self, values):
+        self.values = values
+        return self
+
+    def execute(self):
+        matched = [row for row in self.rows if all(f(row) for f in self.filters)]
+
+        if self.values is not None:
+            for row in matched:
+                row.update(self.values)
+        if self.bounds is not None:
+            matched = matched[slice(*self.bounds)]
+
+        return SimpleNamespace(data=[dict(row) for row in matched])
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        return FakeQuery(self.rows)
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.messages = []
+
+    def enqueue_multicast(self, message):
+        self.messages.append(message)
+
+
+def day(offset: int) -> str:
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def run_job(monkeypatch, rows, devices=("user",)) -> list:
+    outbox = FakeOutbox()
+    monkeypatch.setattr(vaccination_reminders, "supabase_admin", FakeSupabase(rows))
+    monkeypatch.setattr(vaccination_reminders, "notification_outbox", outbox)
+    monkeypatch.setattr(
+        vaccination_reminders,
+        "get_tokens_for_users",
+        lambda user_ids: {
+            user_id: ["token"] for user_id in user_ids if user_id in devices
+        },
+    )
+
+    asyncio.run(vaccination_reminders.send_vaccination_reminders())
+
+    return [message.data["body"] for message in outbox.messages]
+
+
+def vaccination(vac_id: str, name: str, next_dose_date: str, user="user") -> dict:
+    return {
+        "vac_id": vac_id,
+        "id": user,
+        "name": name,
+        "next_dose_date": next_dose_date,
+    }
+
+
+def test_each_dose_is_reminded_once(monkeypatch):
+    rows = [vaccination("1", "Flu", day(3))]
+
+    assert run_job(monkeypatch, rows) == [f"Your next dose of Flu is due on {day(3)}"]
+    assert rows[0]["reminded_at"] is not None
+    assert run_job(monkeypatch, rows) == []
+
+
+def test_dose_logged_after_the_run_is_reminded_next_run(monkeypatch):
+    rows = [vaccination("1", "Flu", day(3))]
+    run_job(monkeypatch, rows)
+
+    # A booster due today, logged after today's run
+    rows.append(vaccination("2", "Tetanus", day(0)))
+
+    assert run_job(monkeypatch, rows) == [
+        f"Your next dose of Tetanus is due on {day(0)}"
+    ]
+
+
+def test_changed_due_date_is_reminded_again(monkeypatch):
+    rows = [vaccination("1", "Flu", day(3))]
+    run_job(monkeypatch, rows)
+
+    # What the update routes do when next_dose_date changes
+    rows[0].update({"next_dose_date": day(1), "reminded_at": None})
+
+    assert run_job(monkeypatch, rows) == [f"Your next dose of Flu is due on {day(1)}"]
+
+
+def test_doses_outside_the_window_are_skipped(monkeypatch):
+    rows = [
+        vaccination("1", "Flu", day(-30)),
+        vaccination("2", "Tetanus", day(vaccination_reminders.REMINDER_DAYS_AHEAD + 1)),
+    ]
+
+    assert run_job(monkeypatch, rows) == []
+    assert all(row.get("reminded_at") is None for row in rows)
+
+
+def test_users_without_a_device_are_reminded_once_they_have_one(monkeypatch):
+    rows = [
+        vaccination("1", "Flu", day(3)),
+        vaccination("2", "Tetanus", day(2), user="new-user"),
+    ]
+
+    assert run_job(monkeypatch, rows) == [f"Your next dose of Flu is due on {day(3)}"]
+    assert rows[1].get("reminded_at") is None
+
+    # new-user signs in on a phone
+    assert run_job(monkeypatch, rows, devices=("user", "new-user")) == [
+        f"Your next dose of Tetanus is due on {day(2)}"
+    ]
+    assert rows[1]["reminded_at"] is not None
+
+
+def test_reminded_updates_fit_in_the_query_string(supabase_requests):
+    vac_ids = [str(uuid.uuid4()) for _ in range(1000)]
+
+    vaccination_reminders.mark_reminded(vac_ids)
+
+    assert all(method == "PATCH" for _, method, _ in supabase_requests)
+    assert max(len(query) for _, _, query in supabase_requests) < MAX_QUERY_LENGTH
@@ -6,11 +6,19 @@ __all__ = [
     "create_jwt",
     "verify_es256_token",
     "verify_hs256_token",
+    "verify_metrics_token",
     "init_supabase",
+    "execute_with_retry",
     "create_new_medication_list_declaration",
     "create_update_medication_list_declaration",
     "create_delete_medication_list_declaration",
     "create_new_vaccination_list_declaration",
     "create_update_vaccination_list_declaration",
     "create_delete_vaccination_list_declaration",
+    "create_new_medication_lists_declaration",
+    "create_update_medication_lists_declaration",
+    "create_delete_medication_lists_declaration",
+    "create_new_vaccination_lists_declaration",
+    "create_update_vaccination_lists_declaration",
+    "create_delete_vaccination_lists_declaration",
 ]
@@ -0,0 +1,180 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from fastapi import Response
+from pydantic_core import to_json
+from utils.supabase_config import init_supabase
+from utils.single_flight import single_flight
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Collections with an updated_at column, their version is read from the data
+VERSIONED_COLLECTIONS = {
+    "medications",
+    "vaccinations",
+    "tracking_data",
+    "goal_recommendations",
+}
+
+# Per-user data, clients may keep it but must revalidate before using it
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Args:
+        if_none_match (str): If-None-Match header
+        etag (str): Current ETag
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def content_etag(data: Any) -> Tuple[str, bytes]:
+    """
+    Serialize a response once and compute its ETag from the bytes
+
+    Args:
+        data (Any): JSON response data
+
+    Returns:
+        tuple: (ETag, JSON bytes)
+    """
+    # Same compact JSON as routes with a response model, serialized in Rust
+    body = to_json(data)
+
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"', body
+
+
+def content_response(data: Any, if_none_match: Optional[str]) -> Response:
+    """
+    Respond with data, or 304 if it hashes to the client's ETag
+
+    Args:
+        data (Any): JSON response data
+        if_none_match (str): If-None-Match header
+
+    Returns:
+        Response: JSON response with its ETag, or 304 if unchanged
+    """
+    etag, body = content_etag(data)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class DataVersions:
+    """
+    Version of each user's collection, used as the ETag of its GET route.
+
+    The version is read from the data itself: the row count and latest
+    updated_at of the user's rows, one indexed single-row query. Every worker
+    computes the same ETag and a restart changes nothing, so a 304 is never
+    stale, and writes made outside the app (scheduled jobs, the dashboard)
+    are seen too. Collections without updated_at (users_info) are hashed
+    from the data instead.
+    """
+
+    def version(self, collection: str, user_id: str) -> str:
+        """
+        Read the version of a user's collection
+
+        Args:
+            collection (str): Table name, e.g. "medications"
+            user_id (str): User ID
+
+        Returns:
+            str: "count:latest updated_at"
+        """
+        result = (
+            supabase_admin.table(collection)
+            .select("updated_at", count="exact")
+            .eq("id", user_id)
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+
+        latest = result.data[0]["updated_at"] if result.data else None
+        return f"{result.count}:{latest}"
+
+    async def etag(self, collection: str, user_id: str) -> str:
+        """
+        Current ETag of a user's collection, take it before reading the data
+
+        Args:
+            collection (str): Table name, e.g. "medications"
+            user_id (str): User ID
+
+        Returns:
+            str: Strong ETag
+        """
+        # Identical concurrent checks share one query
+        version = await single_flight.run(
+            (collection, user_id, "version"),
+            lambda: self.version(collection, user_id),
+        )
+        digest = hashlib.sha256(f"{collection}:{version}".encode()).hexdigest()
+
+        return '"' + digest[:32] + '"'
+
+    async def respond(
+        self,
+        collection: str,
+        user_id: str,
+        if_none_match: Optional[str],
+        response: Response,
+        fetch: Callable[[], Awaitable],
+    ):
+        """
+        Answer a conditional GET, 304 without reading if the client is current
+
+        Args:
+            collection (str): Table name, e.g. "medications"
+            user_id (str): User ID
+            if_none_match (str): If-None-Match header
+            response (Response): The route's response, gets the ETag header
+            fetch (Callable): Reads the data, only called if it changed
+
+        Returns:
+            Any: The data, or a 304 response
+        """
+        if collection not in VERSIONED_COLLECTIONS:
+            return content_response(await fetch(), if_none_match)
+
+        etag = await self.etag(collection, user_id)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        data = await fetch()
+        response.headers.update(headers)
+
+        return data
+
+    def bump(self, collection: str, user_id: str):
+        """
+        Mark a user's collection as changed, call after every write to it
+
+        Args:
+            collection (str): Table name, e.g. "medications"
+            user_id (str): User ID
+        """
+        # Reads and version checks from now on must not join a query started
+        # before the write
+        single_flight.forget(collection, user_id)
+
+
+data_versions = DataVersions()
@@ -0,0 +1,108 @@
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from utils.supabase_config import execute_with_retry, init_supabase
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Tokens not seen for this many days are deleted by the daily cleanup job
+TOKEN_MAX_AGE_DAYS = int(os.getenv("FCM_TOKEN_MAX_AGE_DAYS", "60"))
+
+# User IDs per .in_() lookup. The list goes in the URL's query string, 100
+# UUIDs keep it under ~4KB (proxies cap URLs at 8KB)
+LOOKUP_BATCH_SIZE = 100
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def register_token(user_id: str, device_token: str, platform: str):
+    """
+    Add or refresh one device of a user, keyed on the device token.
+    Other devices of the user are kept (see migrations/fcm_tokens_per_device.sql).
+
+    Args:
+        user_id (str): User ID
+        device_token (str): FCM device token
+        platform (str): Device platform
+    """
+    supabase_admin.table("fcm_tokens").upsert(
+        {
+            "id": user_id,
+            "device_token": device_token,
+            "platform": platform,
+            "last_seen": datetime.now(timezone.utc).isoformat(),
+        },
+        on_conflict="device_token",
+    ).execute()
+
+
+def unregister_token(user_id: str, device_token: Optional[str] = None):
+    """
+    Remove one device of a user, or every device if no token is given
+
+    Args:
+        user_id (str): User ID
+        device_token (str): FCM device token
+    """
+    query = supabase_admin.table("fcm_tokens").delete().eq("id", user_id)
+
+    if device_token:
+        query = query.eq("device_token", device_token)
+
+    query.execute()
+
+
+def get_tokens_for_users(user_ids: List[str]) -> Dict[str, List[str]]:
+    """
+    Get device tokens for many users in bulk
+
+    Args:
+        user_ids (list): User IDs
+
+    Returns:
+        dict: {user_id: [device tokens]}, users without devices are left out
+
+    Raises:
+        Exception: If a lookup still fails after retrying, so callers do not
+            take a failed read for users without devices
+    """
+    tokens = {}
+
+    for i in range(0, len(user_ids), LOOKUP_BATCH_SIZE):
+        chunk = user_ids[i : i + LOOKUP_BATCH_SIZE]
+
+        result = execute_with_retry(
+            supabase_admin.table("fcm_tokens")
+            .select("id, device_token")
+            .in_("id", chunk)
+        )
+
+        for row in result.data:
+            tokens.setdefault(row["id"], []).append(row["device_token"])
+
+    return tokens
+
+
+def prune_stale_tokens():
+    """
+    Delete tokens not seen for TOKEN_MAX_AGE_DAYS, run daily
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=TOKEN_MAX_AGE_DAYS)
+
+    try:
+        result = (
+            supabase_admin.table("fcm_tokens")
+            .delete()
+            .lt("last_seen", cutoff.isoformat())
+            .execute()
+        )
+        logger.info(f"Pruned {len(result.data)} stale device tokens")
+    except Exception as e:
+        logger.error(f"Failed to prune stale device tokens: {e}")
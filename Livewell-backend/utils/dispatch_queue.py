@@ -0,0 +1,217 @@
+import os
+import time
+import heapq
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from firebase_admin import messaging
+from utils.notification_outbox import notification_outbox
+
+logger = logging.getLogger(__name__)
+
+# Local time the weekly push should arrive, spread over the window after it
+NOTI_LOCAL_HOUR = int(os.getenv("NOTI_LOCAL_HOUR", "8"))
+NOTI_WINDOW_MINUTES = int(os.getenv("NOTI_WINDOW_MINUTES", "120"))
+
+# Messages due within the same slot are sent together as one bucket
+NOTI_BUCKET_MINUTES = int(os.getenv("NOTI_BUCKET_MINUTES", "5"))
+
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Australia/Melbourne")
+
+# Australian postcode ranges and their time zones
+POSTCODE_TIMEZONES = [
+    (800, 999, "Australia/Darwin"),
+    (2880, 2880, "Australia/Broken_Hill"),
+    (2000, 2999, "Australia/Sydney"),
+    (3000, 3999, "Australia/Melbourne"),
+    (4000, 4999, "Australia/Brisbane"),
+    (5000, 5999, "Australia/Adelaide"),
+    (6000, 6999, "Australia/Perth"),
+    (7000, 7999, "Australia/Hobart"),
+    (8000, 8999, "Australia/Melbourne"),
+    (9000, 9999, "Australia/Brisbane"),
+]
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def postcode_timezone(postcode: Optional[str]) -> str:
+    """
+    Get the time zone of an Australian postcode
+
+    Args:
+        postcode (str): Postcode
+
+    Returns:
+        str: IANA time zone name, DEFAULT_TIMEZONE if unknown
+    """
+    try:
+        number = int(str(postcode).strip())
+    except (TypeError, ValueError):
+        return DEFAULT_TIMEZONE
+
+    for start, end, tz in POSTCODE_TIMEZONES:
+        if start <= number <= end:
+            return tz
+
+    return DEFAULT_TIMEZONE
+
+
+def dispatch_time(user_id: str, tz: str, now: Optional[float] = None) -> float:
+    """
+    Get when a user's push should be sent: the next NOTI_LOCAL_HOUR in their
+    time zone plus a per-user jitter within NOTI_WINDOW_MINUTES. Pushes are
+    queued ahead of time and held by the dispatch queue until then.
+
+    Args:
+        user_id (str): User ID (keeps the jitter stable between runs)
+        tz (str): User's time zone
+        now (float): Current unix time
+
+    Returns:
+        float: Unix time to send at
+    """
+    now = now or time.time()
+    local_now = datetime.fromtimestamp(now, ZoneInfo(tz))
+    window = NOTI_WINDOW_MINUTES * 60
+
+    local_start = local_now.replace(
+        hour=NOTI_LOCAL_HOUR, minute=0, second=0, microsecond=0
+    )
+
+    if local_start.timestamp() + window < now:
+        # Today's window is already over here, use tomorrow's
+        local_start += timedelta(days=1)
+
+    start = local_start.timestamp()
+    jitter = int(hashlib.sha256(user_id.encode()).hexdigest(), 16) % max(window, 1)
+
+    return max(start + jitter, now)
+
+
+def bucket_messages(
+    items: List[Tuple[str, str, Any]], now: Optional[float] = None
+) -> Dict[float, List[Any]]:
+    """
+    Group messages (or the rows they are built from) into time buckets by the
+    user's local dispatch time
+
+    Args:
+        items (list): (user_id, time zone, message or row)
+        now (float): Current unix time
+
+    Returns:
+        dict: {bucket start unix time: messages or rows}
+    """
+    now = now or time.time()
+    slot = NOTI_BUCKET_MINUTES * 60
+    buckets = {}
+
+    for user_id, tz, message in items:
+        send_at = dispatch_time(user_id, tz, now)
+        buckets.setdefault(send_at - send_at % slot, []).append(message)
+
+    return buckets
+
+
+# ============================================================================
+# Queue
+# ============================================================================
+
+
+class DispatchQueue:
+    """
+    Time-ordered queue of message buckets, each bucket is handed to the
+    notification outbox when it is due.
+
+    The queue lives in memory, callers persist what they schedule and record
+    it as sent in on_sent, so a restart can schedule the rest again.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = count()
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def schedule(
+        self,
+        send_at: float,
+        messages: List[messaging.Message],
+        on_sent: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Queue a bucket of messages to be sent at send_at
+
+        Args:
+            send_at (float): Unix time
+            messages (list): FCM messages
+            on_sent (Callable): Blocking callback run on a worker thread once the
+                bucket is handed to the outbox, e.g. to mark its rows as sent
+        """
+        heapq.heappush(self.heap, (send_at, next(self.sequence), messages, on_sent))
+        self.wakeup.set()
+
+    def __len__(self):
+        return len(self.heap)
+
+    async def run(self):
+        """
+        Worker loop, releases each bucket when it is due
+        """
+        while True:
+            self.wakeup.clear()
+
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    # Wake early if an earlier bucket is scheduled
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, messages, on_sent = heapq.heappop(self.heap)
+
+            # Hand the bucket to the outbox worker for delivery
+            notification_outbox.enqueue_many(messages)
+
+            if on_sent:
+                try:
+                    await asyncio.to_thread(on_sent)
+                except Exception as e:
+                    logger.error(f"Failed to record a sent bucket: {e}")
+
+    def start(self):
+        """
+        Start the worker on the running event loop
+        """
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stop the worker, buckets still queued are dropped (and scheduled
+        again on the next start by whoever persisted them)
+        """
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+dispatch_queue = DispatchQueue()
@@ -0,0 +1,209 @@
+import os
+import time
+import asyncio
+import logging
+from collections import Counter
+from typing import List
+from firebase_admin import messaging, exceptions
+from utils.supabase_config import init_supabase
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# FCM accepts at most 500 messages per send_each call
+FCM_BATCH_SIZE = 500
+FCM_MAX_CONCURRENCY = int(os.getenv("FCM_MAX_CONCURRENCY", "4"))
+FCM_MAX_RETRIES = int(os.getenv("FCM_MAX_RETRIES", "3"))
+FCM_RETRY_BASE_DELAY = float(os.getenv("FCM_RETRY_BASE_DELAY", "1.0"))
+
+# Tokens per prune delete. The list goes in the URL's query string and FCM
+# tokens are up to ~160 chars, 40 keeps it under ~7KB (proxies cap URLs at 8KB)
+PRUNE_BATCH_SIZE = 40
+
+# Errors that mean the token will never work again
+DEAD_TOKEN_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+
+# Errors that are worth retrying
+TRANSIENT_ERRORS = (
+    messaging.QuotaExceededError,
+    exceptions.UnavailableError,
+    exceptions.InternalError,
+    exceptions.DeadlineExceededError,
+)
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def is_dead_token_error(error: Exception) -> bool:
+    """
+    Check if a send error means the device token should be removed
+
+    Args:
+        error (Exception): Exception from a FCM send response
+
+    Returns:
+        bool: True if the token is unregistered or invalid
+    """
+    if isinstance(error, DEAD_TOKEN_ERRORS):
+        return True
+
+    # FCM reports malformed tokens as INVALID_ARGUMENT, but so are bad payloads
+    return isinstance(error, exceptions.InvalidArgumentError) and (
+        "registration token" in str(error).lower()
+    )
+
+
+def expand_multicast(message: messaging.MulticastMessage) -> List[messaging.Message]:
+    """
+    Split a user's multicast message into one message per device token, so
+    several users' devices can share one send_each call
+
+    Args:
+        message (MulticastMessage): Message for all of a user's devices
+
+    Returns:
+        list: One message per device token
+    """
+    return [
+        messaging.Message(
+            data=message.data,
+            notification=message.notification,
+            android=message.android,
+            webpush=message.webpush,
+            apns=message.apns,
+            fcm_options=message.fcm_options,
+            token=token,
+        )
+        for token in message.tokens
+    ]
+
+
+def prune_device_tokens(tokens: List[str]):
+    """
+    Delete dead device tokens from the fcm_tokens table
+
+    Args:
+        tokens (list): Device tokens to delete
+    """
+    for i in range(0, len(tokens), PRUNE_BATCH_SIZE):
+        chunk = tokens[i : i + PRUNE_BATCH_SIZE]
+
+        try:
+            supabase_admin.table("fcm_tokens").delete().in_(
+                "device_token", chunk
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to prune {len(chunk)} device tokens: {e}")
+
+
+async def send_batch(
+    messages: List[messaging.Message], semaphore: asyncio.Semaphore, report: dict
+):
+    """
+    Send one batch of messages, retrying transient failures with backoff
+
+    Args:
+        messages (list): Up to FCM_BATCH_SIZE messages
+        semaphore (Semaphore): Limits how many batches are in flight
+        report (dict): Delivery report updated in place
+    """
+    pending = messages
+    last_error = None
+
+    for attempt in range(FCM_MAX_RETRIES + 1):
+        if attempt:
+            report["retried"] += len(pending)
+            await asyncio.sleep(FCM_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+        try:
+            async with semaphore:
+                batch_response = await asyncio.to_thread(messaging.send_each, pending)
+        except TRANSIENT_ERRORS as e:
+            # Whole batch failed before reaching FCM, retry all of it
+            last_error = e
+            continue
+        except Exception as e:
+            report["failed"] += len(pending)
+            report["failures"][type(e).__name__] += len(pending)
+            logger.error(f"FCM batch of {len(pending)} failed: {e}")
+            return
+
+        retry = []
+        for message, response in zip(pending, batch_response.responses):
+            if response.success:
+                report["sent"] += 1
+            elif is_dead_token_error(response.exception):
+                report["failed"] += 1
+                report["failures"][type(response.exception).__name__] += 1
+                report["dead_tokens"].append(message.token)
+            elif (
+                isinstance(response.exception, TRANSIENT_ERRORS)
+                and attempt < FCM_MAX_RETRIES
+            ):
+                retry.append(message)
+            else:
+                report["failed"] += 1
+                report["failures"][type(response.exception).__name__] += 1
+
+        if not retry:
+            return
+
+        pending = retry
+        last_error = None
+
+    # Out of retries
+    report["failed"] += len(pending)
+    report["failures"][
+        type(last_error).__name__ if last_error else "RetriesExhausted"
+    ] += len(pending)
+
+
+async def send_messages(messages: List[messaging.Message]) -> dict:
+    """
+    Send FCM messages in batches of up to 500 with bounded concurrency.
+    Dead tokens are pruned from fcm_tokens after the run.
+
+    Args:
+        messages (list): FCM messages, one per device token
+
+    Returns:
+        dict: Delivery report (sent, failed, retried, pruned, failure breakdown, throughput)
+    """
+    report = {
+        "total": len(messages),
+        "sent": 0,
+        "failed": 0,
+        "retried": 0,
+        "pruned": 0,
+        "failures": Counter(),
+        "dead_tokens": [],
+    }
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(FCM_MAX_CONCURRENCY)
+
+    await asyncio.gather(
+        *(
+            send_batch(messages[i : i + FCM_BATCH_SIZE], semaphore, report)
+            for i in range(0, len(messages), FCM_BATCH_SIZE)
+        )
+    )
+
+    dead_tokens = list(set(report.pop("dead_tokens")))
+    if dead_tokens:
+        await asyncio.to_thread(prune_device_tokens, dead_tokens)
+        report["pruned"] = len(dead_tokens)
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_s"] = round(elapsed, 3)
+    report["per_second"] = round(report["sent"] / elapsed, 1) if elapsed else 0.0
+    report["failures"] = dict(report["failures"])
+
+    logger.info(f"FCM delivery report: {report}")
+
+    return report
@@ -200,3 +200,100 @@ create_delete_vaccination_list_declaration = {
         "required": ["vac_id"],
     },
 }
+
+# Batches, several records in one call
+create_new_medication_lists_declaration = {
+    "name": "create_new_medication_lists",
+    "description": "Create several new medication lists for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "medications": {
+                "type": "array",
+                "description": "The medications to create",
+                "items": create_new_medication_list_declaration["parameters"],
+            },
+        },
+        "required": ["medications"],
+    },
+}
+
+create_update_medication_lists_declaration = {
+    "name": "update_medication_lists",
+    "description": "Update several existing medication lists for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "medications": {
+                "type": "array",
+                "description": "The medications to update, each with its med_id",
+                "items": create_update_medication_list_declaration["parameters"],
+            },
+        },
+        "required": ["medications"],
+    },
+}
+
+create_delete_medication_lists_declaration = {
+    "name": "delete_medication_lists",
+    "description": "Delete several existing medication lists for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "med_ids": {
+                "type": "array",
+                "description": "The unique IDs of the medications to delete",
+                "items": {"type": "string"},
+            },
+        },
+        "required": ["med_ids"],
+    },
+}
+
+create_new_vaccination_lists_declaration = {
+    "name": "create_new_vaccination_lists",
+    "description": "Create several new vaccination records for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "vaccinations": {
+                "type": "array",
+                "description": "The vaccinations to create",
+                "items": create_new_vaccination_list_declaration["parameters"],
+            },
+        },
+        "required": ["vaccinations"],
+    },
+}
+
+create_update_vaccination_lists_declaration = {
+    "name": "update_vaccination_lists",
+    "description": "Update several existing vaccination records for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "vaccinations": {
+                "type": "array",
+                "description": "The vaccinations to update, each with its vac_id",
+                "items": create_update_vaccination_list_declaration["parameters"],
+            },
+        },
+        "required": ["vaccinations"],
+    },
+}
+
+create_delete_vaccination_lists_declaration = {
+    "name": "delete_vaccination_lists",
+    "description": "Delete several existing vaccination records for the user in database at once.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "vac_ids": {
+                "type": "array",
+                "description": "The unique IDs of the vaccinations to delete",
+                "items": {"type": "string"},
+            },
+        },
+        "required": ["vac_ids"],
+    },
+}
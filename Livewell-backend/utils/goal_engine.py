@@ -0,0 +1,192 @@
+import os
+import numpy as np
+from datetime import datetime, timedelta
+from typing import List
+
+# Days of tracking history the engine looks at
+HISTORY_DAYS = int(os.getenv("GOAL_ENGINE_HISTORY_DAYS", "14"))
+
+# Below this confidence Gemini is asked for the numbers as well
+CONFIDENCE_THRESHOLD = float(os.getenv("GOAL_ENGINE_CONFIDENCE_THRESHOLD", "0.5"))
+
+# Daily step baseline per age range (options from the onboarding survey)
+AGE_RANGE_STEPS = {
+    "41 - 50": 8000,
+    "51 - 60": 7500,
+    "61 - 70": 7000,
+    "71 - 80": 6000,
+    "81 - 90": 5000,
+}
+DEFAULT_STEPS = 6500
+
+# Step multiplier per exercise frequency
+EXERCISE_FREQUENCY_FACTOR = {
+    "Once a week": 0.9,
+    "2-3 times a week": 1.0,
+    "4-5 times a week": 1.1,
+    "6-7 times a week": 1.2,
+}
+
+# Daily water baseline (ml) per gender
+GENDER_WATER_ML = {"Male": 2100, "Female": 1800}
+DEFAULT_WATER_ML = 1900
+
+# How much to raise the target above the recent average each week
+PROGRESSION = 1.1
+
+STEPS_ROUNDING = 500
+WATER_ROUNDING_ML = 100
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def get_table_rows(user_info, table: str) -> List[dict]:
+    """
+    Get one table's rows out of the get_user_data_tables result
+
+    Args:
+        user_info: User's info from get_user_data_tables
+        table (str): Table name
+
+    Returns:
+        list: Rows of the table, empty if missing
+    """
+    if isinstance(user_info, list):
+        user_info = user_info[0] if user_info else {}
+
+    if not isinstance(user_info, dict):
+        return []
+
+    rows = user_info.get(table) or []
+
+    return rows if isinstance(rows, list) else [rows]
+
+
+def build_history(user_infos: list):
+    """
+    Build (users x days) matrices of recent steps and water intake
+
+    Args:
+        user_infos (list): User's info per user
+
+    Returns:
+        tuple: (steps, water) float arrays, NaN where a day was not tracked
+    """
+    today = datetime.now().date()
+    first_day = today - timedelta(days=HISTORY_DAYS - 1)
+
+    steps = np.full((len(user_infos), HISTORY_DAYS), np.nan)
+    water = np.full((len(user_infos), HISTORY_DAYS), np.nan)
+
+    for i, user_info in enumerate(user_infos):
+        for row in get_table_rows(user_info, "tracking_data"):
+            try:
+                day = datetime.strptime(str(row["today_date"])[:10], "%Y-%m-%d").date()
+            except (KeyError, ValueError):
+                continue
+
+            offset = (day - first_day).days
+            if 0 <= offset < HISTORY_DAYS:
+                steps[i, offset] = row.get("current_steps") or 0
+                water[i, offset] = row.get("current_water_intake_ml") or 0
+
+    return steps, water
+
+
+def compute_goals(user_infos: list) -> List[dict]:
+    """
+    Compute weekly targets for all users at once from their profile and recent tracking data
+
+    Args:
+        user_infos (list): User's info per user (from get_user_data_tables)
+
+    Returns:
+        list: {"target_steps", "target_water_intake_ml", "confidence"} per user, same order
+    """
+    if not user_infos:
+        return []
+
+    profiles = [
+        (get_table_rows(user_info, "users_info") or [{}])[0] for user_info in user_infos
+    ]
+
+    # Profile baselines
+    base_steps = np.array(
+        [
+            AGE_RANGE_STEPS.get(profile.get("age_range"), DEFAULT_STEPS)
+            * EXERCISE_FREQUENCY_FACTOR.get(profile.get("exercise_frequency"), 1.0)
+            for profile in profiles
+        ]
+    )
+    base_water = np.array(
+        [
+            GENDER_WATER_ML.get(profile.get("gender"), DEFAULT_WATER_ML)
+            for profile in profiles
+        ],
+        dtype=float,
+    )
+    has_profile = np.array([bool(profile) for profile in profiles])
+
+    # Recent history
+    steps, water = build_history(user_infos)
+    days_tracked = np.count_nonzero(~np.isnan(steps), axis=1)
+    tracked = days_tracked > 0
+
+    mean_steps = np.divide(
+        np.nansum(steps, axis=1),
+        days_tracked,
+        out=np.zeros(len(user_infos)),
+        where=tracked,
+    )
+    mean_water = np.divide(
+        np.nansum(water, axis=1),
+        days_tracked,
+        out=np.zeros(len(user_infos)),
+        where=tracked,
+    )
+
+    # Step up from the recent average, kept within a sensible band of the baseline
+    target_steps = np.where(
+        tracked,
+        np.clip(mean_steps * PROGRESSION, base_steps * 0.6, base_steps * 1.3),
+        base_steps,
+    )
+    target_water = np.where(
+        tracked,
+        np.clip(mean_water * PROGRESSION, base_water * 0.8, base_water * 1.2),
+        base_water,
+    )
+
+    target_steps = np.round(target_steps / STEPS_ROUNDING) * STEPS_ROUNDING
+    target_water = np.round(target_water / WATER_ROUNDING_ML) * WATER_ROUNDING_ML
+
+    # A week of history and a completed profile give full confidence
+    confidence = np.minimum(days_tracked / 7, 1.0) * np.where(has_profile, 1.0, 0.5)
+
+    return [
+        {
+            "target_steps": int(s),
+            "target_water_intake_ml": int(w),
+            "confidence": round(float(c), 2),
+        }
+        for s, w, c in zip(target_steps, target_water, confidence)
+    ]
+
+
+def describe_goal(goal: dict) -> str:
+    """
+    Fallback description when Gemini is not used
+
+    Args:
+        goal (dict): Goal from compute_goals
+
+    Returns:
+        str: One sentence description
+    """
+    return (
+        f"Aim for {goal['target_steps']} steps and "
+        f"{goal['target_water_intake_ml']} ml of water each day this week."
+    )
@@ -4,10 +4,31 @@ from fastapi import FastAPI
 import os
 import json
 from utils import init_supabase
-from google import genai
-from google.genai import types
+from utils.recommendation_fingerprint import (
+    build_fingerprint,
+    load_fingerprints,
+    save_fingerprints,
+)
+from utils.goal_engine import (
+    CONFIDENCE_THRESHOLD,
+    compute_goals,
+    describe_goal,
+    get_table_rows,
+)
+from utils.dispatch_queue import (
+    DEFAULT_TIMEZONE,
+    bucket_messages,
+    dispatch_queue,
+    postcode_timezone,
+)
+from utils.device_tokens import get_tokens_for_users
+from utils.medication_reminders import get_user_timezones
+from utils.fcm_delivery import expand_multicast
+from utils.data_versions import data_versions
+from utils.recommendation_provider import RecommendationProvider, get_provider
 from fastapi import APIRouter
-from typing import List
+from typing import Dict, List
+from datetime import datetime, timedelta, timezone
 from models import (
     GoalDetails,
     RecommendationResponse,
@@ -18,17 +39,27 @@ from firebase_admin import credentials, messaging
 import logging
 import asyncio
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/goal-recommendation", tags=["goal-recommendation"])
 
 # Init supabase admin
 supabase_admin = init_supabase()
 
-# Init Gemini
-genai_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# Rows per multi-row insert into goal_recommendations
+INSERT_BATCH_SIZE = int(os.getenv("RECOMMENDATION_INSERT_BATCH_SIZE", "500"))
+
+# Recommendation IDs per notified_at update, the IDs go in the query string
+NOTIFIED_BATCH_SIZE = 100
+
+# Unsent pushes older than this are dropped at startup instead of sent late
+PUSH_RESTORE_MAX_AGE_HOURS = int(os.getenv("PUSH_RESTORE_MAX_AGE_HOURS", "36"))
 
+# Rows per page when reading unsent pushes at startup
+RESTORE_PAGE_SIZE = 1000
 
-recommendations = []
+PUSH_TITLE = "Your Weekly Health Goals"
+PUSH_TYPE = "goal_recommendation"
 
 
 async def get_users():
@@ -47,130 +78,437 @@ async def get_users():
         return None
 
 
-def generate_recommendation(user):
+def get_user_context(user, device_tokens: List[str]):
     """
-    Generate recommendation for a user
+    Get user's info for a recommendation
 
     Args:
         user (dict): User ID
+        device_tokens (list): User's device tokens
 
     Returns:
-        RecommendationResponse: Recommendation response
+        dict: User ID, user's info and device tokens, or None if it fails
     """
 
     user_id = user["id"]
 
-    # Call the function from Supabase SQL function
-    user_info = supabase_admin.rpc(
-        "get_user_data_tables", {"user_uuid": user_id}
-    ).execute()
-
-    # Find user's device token from Supabase
-    fcm_token_res = (
-        supabase_admin.table("fcm_tokens")
-        .select("device_token")
-        .eq("id", user_id)
-        .execute()
-    )
-
-    if not fcm_token_res.data:
+    try:
+        # Call the function from Supabase SQL function
+        user_info = supabase_admin.rpc(
+            "get_user_data_tables", {"user_uuid": user_id}
+        ).execute()
+    except Exception as e:
+        logger.error(f"Failed to get user's info for {user_id}: {e}")
         return None
 
-    # Configure the model
-    config = types.GenerateContentConfig(
-        system_instruction=(
-            f"You are a knowledgeable, empathetic, and supportive Health & Wellness Assistant. "
-            f"Your goal is to recommend weekly goals for users to improve their physical and mental well-being. "
-            f"You specialize in nutrition, fitness, sleep hygiene, mindfulness, and stress management. "
-            f"You need to read the user's info below and reply should be in the format of JSON with just only two number for target_water_intake_ml and target_steps with just a sentence of description, "
-            f"like {{'Weekly Goal': {{'target_water_intake_ml': '1000', 'target_steps': '7000', 'description': 'Drink more water you have taken flu shot.'}}}}.\n\n "
-            f"User's info: {user_info.data}"
-        ),
-        temperature=0.7,
-        top_p=0.95,
-        top_k=40,
-        max_output_tokens=2048,
-        response_mime_type="application/json",
-    )
+    profile = (get_table_rows(user_info.data, "users_info") or [{}])[0]
 
-    # Generate response
-    response = genai_client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents="Please generated weekly goals for user",
-        config=config,
-    )
+    return {
+        "id": user_id,
+        "user_info": user_info.data,
+        "device_tokens": device_tokens,
+        "timezone": postcode_timezone(profile.get("postcode")),
+    }
 
-    # Combine the response with user_id and user's device token
+
+def local_recommendation(context, goal: dict):
+    """
+    Build a recommendation from the local goal engine only
+
+    Args:
+        context (dict): User ID, user's info and device token
+        goal (dict): Goal from compute_goals
+
+    Returns:
+        RecommendationResponse: Recommendation response
+    """
     return RecommendationResponse(
-        user_id=user_id,
-        device_token=fcm_token_res.data[0]["device_token"],
-        recommendation=json.loads(response.text),
+        user_id=context["id"],
+        device_tokens=context["device_tokens"],
+        recommendation={
+            "Weekly Goal": {
+                "target_water_intake_ml": str(goal["target_water_intake_ml"]),
+                "target_steps": str(goal["target_steps"]),
+                "description": describe_goal(goal),
+            }
+        },
+    )
+
+
+def build_instruction(context, goal: dict) -> str:
+    """
+    Build the Gemini prompt for a user. The local goal engine's targets are kept
+    unless its confidence is low, then Gemini picks the numbers too.
+
+    Args:
+        context (dict): User ID, user's info and device token
+        goal (dict): Goal from compute_goals
+
+    Returns:
+        str: System instruction
+    """
+
+    if goal["confidence"] >= CONFIDENCE_THRESHOLD:
+        instruction = (
+            f"The weekly targets are already set to {goal['target_water_intake_ml']} for target_water_intake_ml and {goal['target_steps']} for target_steps, keep these numbers. "
+            f"You need to read the user's info below and reply should be in the format of JSON with these two numbers and just a sentence of description, "
+        )
+    else:
+        instruction = f"You need to read the user's info below and reply should be in the format of JSON with just only two number for target_water_intake_ml and target_steps with just a sentence of description, "
+
+    return (
+        f"You are a knowledgeable, empathetic, and supportive Health & Wellness Assistant. "
+        f"Your goal is to recommend weekly goals for users to improve their physical and mental well-being. "
+        f"You specialize in nutrition, fitness, sleep hygiene, mindfulness, and stress management. "
+        f"{instruction}"
+        f"like {{'Weekly Goal': {{'target_water_intake_ml': '1000', 'target_steps': '7000', 'description': 'Drink more water you have taken flu shot.'}}}}.\n\n "
+        f"User's info: {context['user_info']}"
     )
 
 
-async def prepare_recommendation():
+def parse_reply(context, goal: dict, text: str = None):
     """
-    AI generated recommendation for user, based on the user information on Supabase
+    Build a recommendation for a user from the model's reply
+
+    Args:
+        context (dict): User ID, user's info and device token
+        goal (dict): Goal from compute_goals
+        text (str): Model reply, None if the model was not used or failed
+
+    Returns:
+        RecommendationResponse: Recommendation response, None if the reply is
+            missing or unusable (the caller falls back to the local goal engine)
     """
 
-    recommendations.clear()
+    if not text:
+        return None
+
+    try:
+        # Combine the response with user_id and user's device token
+        result = RecommendationResponse(
+            user_id=context["id"],
+            device_tokens=context["device_tokens"],
+            recommendation=json.loads(text),
+        )
+    except Exception as e:
+        logger.warning(f"Invalid reply for {context['id']}, using local goals: {e}")
+        return None
+
+    if goal["confidence"] >= CONFIDENCE_THRESHOLD:
+        weekly_goal = result.recommendation.weekly_goal
+        weekly_goal.target_steps = str(goal["target_steps"])
+        weekly_goal.target_water_intake_ml = str(goal["target_water_intake_ml"])
+
+    return result
+
+
+async def prepare_recommendation(provider: RecommendationProvider = None):
+    """
+    AI generated recommendation for user, based on the user information on Supabase.
+    Users whose info has not changed since the last run reuse the recommendation the
+    model wrote for them, users who got local goals ask the model again.
+
+    Args:
+        provider (RecommendationProvider): Model provider, defaults to RECOMMENDATION_MODE
+
+    Returns:
+        list: RecommendationResponse for every user with a device
+
+    Raises:
+        Exception: If the device token or fingerprint lookup fails
+    """
+
+    recommendations = []
+    provider = provider or get_provider()
 
     # Get all users
     users = await get_users()
 
-    if users:
-        results = await asyncio.gather(
-            *(asyncio.to_thread(generate_recommendation, user) for user in users)
+    if not users:
+        return recommendations
+
+    # Device tokens for all users in bulk, users without a device are skipped
+    tokens = await asyncio.to_thread(
+        get_tokens_for_users, [user["id"] for user in users]
+    )
+
+    contexts = await asyncio.gather(
+        *(
+            asyncio.to_thread(get_user_context, user, tokens[user["id"]])
+            for user in users
+            if user["id"] in tokens
         )
+    )
+    contexts = [context for context in contexts if context]
+
+    previous = await asyncio.to_thread(
+        load_fingerprints, [context["id"] for context in contexts]
+    )
+
+    changed = []
+    for context in contexts:
+        context["fingerprint"] = build_fingerprint(context["user_info"])
+        stored = previous.get(context["id"])
+
+        if stored and stored["fingerprint"] == context["fingerprint"]:
+            # Same inputs as last week, reuse the stored recommendation
+            recommendations.append(
+                RecommendationResponse(
+                    user_id=context["id"],
+                    device_tokens=context["device_tokens"],
+                    recommendation=stored["recommendation"],
+                    timezone=context["timezone"],
+                )
+            )
+        else:
+            changed.append(context)
+
+    # Local targets for every changed user in one vectorized pass
+    goals = compute_goals([context["user_info"] for context in changed])
+
+    # One model reply per changed user, missing replies use the local goals
+    texts = await provider.generate(
+        {
+            context["id"]: build_instruction(context, goal)
+            for context, goal in zip(changed, goals)
+        }
+    )
+
+    fingerprint_rows = []
+    for context, goal in zip(changed, goals):
+        result = parse_reply(context, goal, texts.get(context["id"]))
+
+        if result is None:
+            # Not saved, so the model is asked again next week even if the
+            # user's info does not change
+            result = local_recommendation(context, goal)
+        else:
+            fingerprint_rows.append(
+                {
+                    "id": context["id"],
+                    "fingerprint": context["fingerprint"],
+                    "recommendation": result.recommendation.model_dump(by_alias=True),
+                }
+            )
+
+        result.timezone = context["timezone"]
+        recommendations.append(result)
+
+    await asyncio.to_thread(save_fingerprints, fingerprint_rows)
+
+    logger.info(
+        f"Prepared {len(recommendations)} recommendations, "
+        f"{len(changed)} generated ({len(fingerprint_rows)} by model), "
+        f"{len(contexts) - len(changed)} reused"
+    )
 
-        for result in results:
-            if result:
-                recommendations.append(result)
+    return recommendations
 
 
-async def send_fcm_noti():
+def insert_recommendations(rows: List[dict]) -> List[dict]:
     """
-    Send FCM notification to specific user, using their device token on Supabase
+    Insert goal recommendations in multi-row batches
+
+    Args:
+        rows (list): goal_recommendations rows (includes user's id)
+
+    Returns:
+        list: Inserted rows (with recommend_id), failed batches are left out
     """
+    inserted = []
 
-    for rec in recommendations:
-        user_id = rec.user_id
-        token = rec.device_token
-        title = "Your Weekly Health Goals"
-        recommend_type = "goal_recommendation"
-        target_steps = rec.recommendation.weekly_goal.target_steps
-        target_water_intake_ml = rec.recommendation.weekly_goal.target_water_intake_ml
-        description = rec.recommendation.weekly_goal.description
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        chunk = rows[i : i + INSERT_BATCH_SIZE]
 
         try:
-            message = messaging.Message(
-                data={
-                    "title": title,
-                    "type": recommend_type,
-                    "target_steps": str(target_steps),
-                    "target_water_intake_ml": str(target_water_intake_ml),
-                    "click_action": "FLUTTER_NOTIFICATION_CLICK",
-                },
-                token=token,
+            result = (
+                supabase_admin.table("goal_recommendations").insert(chunk).execute()
             )
+            inserted.extend(result.data)
+        except Exception as e:
+            logger.error(f"Failed to store {len(chunk)} recommendations: {e}")
 
-            response = messaging.send(message)
-            print(f"Successfully sent message: {response}")
+        # Clients polling their recommendations get the new ones, not a 304
+        for user_id in {row["id"] for row in chunk}:
+            data_versions.bump("goal_recommendations", user_id)
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    return inserted
 
-        try:
-            # Store ommendation in database
-            supabase_admin.table("goal_recommendations").insert(
-                {
-                    "title": title,
-                    "type": recommend_type,
-                    "steps_target": target_steps,
-                    "water_intake_ml_target": target_water_intake_ml,
-                    "description": description,
-                }
-            ).eq("id", user_id).execute()
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+def mark_notified(recommend_ids: List[str]):
+    """
+    Record that the pushes of these recommendations were handed to the outbox,
+    so they are not scheduled again after a restart
+
+    Args:
+        recommend_ids (list): Recommendation IDs
+    """
+    notified_at = datetime.now(timezone.utc).isoformat()
+
+    for i in range(0, len(recommend_ids), NOTIFIED_BATCH_SIZE):
+        supabase_admin.table("goal_recommendations").update(
+            {"notified_at": notified_at}
+        ).in_("recommend_id", recommend_ids[i : i + NOTIFIED_BATCH_SIZE]).execute()
+
+
+def build_push(row: dict, device_tokens: List[str]) -> List[messaging.Message]:
+    """
+    Build the weekly push of a stored recommendation
+
+    Args:
+        row (dict): goal_recommendations row
+        device_tokens (list): User's device tokens
+
+    Returns:
+        list: One message per device
+    """
+    # One multicast per user covers all of their devices
+    return expand_multicast(
+        messaging.MulticastMessage(
+            data={
+                "title": PUSH_TITLE,
+                "type": PUSH_TYPE,
+                "target_steps": str(row["steps_target"]),
+                "target_water_intake_ml": str(row["water_intake_ml_target"]),
+                "click_action": "FLUTTER_NOTIFICATION_CLICK",
+            },
+            tokens=device_tokens,
+        )
+    )
+
+
+def schedule_pushes(
+    rows: List[dict], tokens: Dict[str, List[str]], timezones: Dict[str, str]
+) -> int:
+    """
+    Queue the pushes of stored recommendations in buckets by the user's local
+    time, each bucket marks its rows as notified once it is sent
+
+    Args:
+        rows (list): goal_recommendations rows
+        tokens (dict): {user_id: device tokens}, users without devices are skipped
+        timezones (dict): {user_id: time zone}
+
+    Returns:
+        int: Number of pushes queued
+    """
+    # Spread delivery over each user's local morning instead of one burst,
+    # the dispatch queue worker sends each bucket when it is due
+    buckets = bucket_messages(
+        [
+            (row["id"], timezones.get(row["id"]) or DEFAULT_TIMEZONE, row)
+            for row in rows
+            if tokens.get(row["id"])
+        ]
+    )
+
+    for send_at, bucket in buckets.items():
+        messages = [
+            message for row in bucket for message in build_push(row, tokens[row["id"]])
+        ]
+        recommend_ids = [row["recommend_id"] for row in bucket]
+
+        dispatch_queue.schedule(
+            send_at, messages, on_sent=lambda ids=recommend_ids: mark_notified(ids)
+        )
+
+    count = sum(len(bucket) for bucket in buckets.values())
+    logger.info(f"Scheduled {count} pushes in {len(buckets)} buckets")
+
+    return count
+
+
+async def send_fcm_noti(recommendations: List[RecommendationResponse]):
+    """
+    Store the week's recommendations, then queue their pushes by the user's
+    local time (see utils.dispatch_queue). Pushes are built from the stored rows,
+    and rows stay un-notified until their bucket is sent, so a restart can
+    queue them again (restore_pushes).
+
+    Args:
+        recommendations (list): From prepare_recommendation
+    """
+    rows = [
+        {
+            "id": rec.user_id,
+            "title": PUSH_TITLE,
+            "type": PUSH_TYPE,
+            "steps_target": rec.recommendation.weekly_goal.target_steps,
+            "water_intake_ml_target": rec.recommendation.weekly_goal.target_water_intake_ml,
+            "description": rec.recommendation.weekly_goal.description,
+        }
+        for rec in recommendations
+    ]
+
+    inserted = await asyncio.to_thread(insert_recommendations, rows)
+
+    schedule_pushes(
+        inserted,
+        {rec.user_id: rec.device_tokens for rec in recommendations},
+        {rec.user_id: rec.timezone for rec in recommendations},
+    )
+
+
+async def send_weekly_recommendations(provider: RecommendationProvider = None):
+    """
+    Weekly job: prepare every user's recommendation, then store and queue them.
+    One job, so sending never starts before preparing is finished.
+
+    Args:
+        provider (RecommendationProvider): Model provider, defaults to RECOMMENDATION_MODE
+    """
+    try:
+        recommendations = await prepare_recommendation(provider)
+    except Exception as e:
+        # A failed token or fingerprint lookup, nothing was stored or sent
+        logger.error(f"Failed to prepare weekly recommendations: {e}")
+        return
+
+    await send_fcm_noti(recommendations)
+
+
+def get_pending_pushes() -> List[dict]:
+    """
+    Get this week's recommendations whose push was not sent yet
+
+    Returns:
+        list: goal_recommendations rows
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=PUSH_RESTORE_MAX_AGE_HOURS)
+    rows = []
+    start = 0
+
+    while True:
+        result = (
+            supabase_admin.table("goal_recommendations")
+            .select("recommend_id, id, steps_target, water_intake_ml_target")
+            .eq("type", PUSH_TYPE)
+            .is_("notified_at", "null")
+            .gte("created_at", since.isoformat())
+            .order("recommend_id")
+            .range(start, start + RESTORE_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows.extend(result.data)
+
+        if len(result.data) < RESTORE_PAGE_SIZE:
+            return rows
+        start += RESTORE_PAGE_SIZE
+
+
+async def restore_pushes():
+    """
+    Queue the pushes that were stored but not sent before the last shutdown,
+    run at startup
+    """
+    try:
+        rows = await asyncio.to_thread(get_pending_pushes)
+        user_ids = list({row["id"] for row in rows})
+
+        tokens = await asyncio.to_thread(get_tokens_for_users, user_ids)
+        timezones = await asyncio.to_thread(get_user_timezones, user_ids)
+    except Exception as e:
+        logger.error(f"Failed to restore weekly pushes: {e}")
+        return
+
+    schedule_pushes(rows, tokens, timezones)
@@ -0,0 +1,124 @@
+import os
+import json
+import asyncio
+import hashlib
+import inspect
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from utils.ttl_cache import TTLCache
+
+# How long a result is replayed for the same Idempotency-Key
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+
+# Most stored results, the least recently used are dropped first
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "50000"))
+
+
+def fingerprint(body: Any) -> str:
+    """
+    Hash a request body, to catch a key reused for a different request
+
+    Args:
+        body (Any): Request body
+
+    Returns:
+        str: sha256 of the canonical JSON
+    """
+    return hashlib.sha256(
+        json.dumps(jsonable_encoder(body), sort_keys=True).encode()
+    ).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Replays the result of a create request retried with the same Idempotency-Key.
+
+    Completed results live in a bounded TTL cache. A duplicate that arrives while
+    the first request is still running waits for its result instead of writing
+    again. Failed requests are not stored, so they can be retried.
+    """
+
+    def __init__(self):
+        self.results = TTLCache(maxsize=IDEMPOTENCY_MAX_KEYS, ttl=IDEMPOTENCY_TTL)
+        self.in_flight = {}
+        self.replayed = 0
+
+    async def run(
+        self,
+        user_id: str,
+        operation: str,
+        idempotency_key: Optional[str],
+        body: Any,
+        fn: Callable,
+    ):
+        """
+        Run a create once per Idempotency-Key
+
+        Args:
+            user_id (str): User ID, keys are scoped per user
+            operation (str): Endpoint name, keys are scoped per endpoint
+            idempotency_key (str): Idempotency-Key header, None runs fn directly
+            body (Any): Request body
+            fn (Callable): Does the write and returns the response, sync or async
+
+        Returns:
+            Any: The response of the first request with this key
+        """
+        if not idempotency_key:
+            return await self.call(fn)
+
+        key = (user_id, operation, idempotency_key)
+        body_hash = fingerprint(body)
+
+        stored = self.results.get(key)
+        if stored is None and key in self.in_flight:
+            stored = await asyncio.shield(self.in_flight[key])
+
+        if stored is not None:
+            if stored[0] != body_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            self.replayed += 1
+            return stored[1]
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+
+        try:
+            response = await self.call(fn)
+        except asyncio.CancelledError:
+            # The first request went away, duplicates should retry
+            self.fail(
+                future,
+                HTTPException(status_code=409, detail="Request in progress, retry"),
+            )
+            raise
+        except Exception as e:
+            self.fail(future, e)
+            raise
+        else:
+            stored = (body_hash, response)
+            self.results.set(key, stored)
+            future.set_result(stored)
+            return response
+        finally:
+            self.in_flight.pop(key, None)
+
+    @staticmethod
+    def fail(future: asyncio.Future, error: Exception):
+        future.set_exception(error)
+        # Nobody may be waiting, don't log "exception never retrieved"
+        future.exception()
+
+    @staticmethod
+    async def call(fn: Callable):
+        result = fn()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+idempotency_store = IdempotencyStore()
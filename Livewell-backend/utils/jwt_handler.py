@@ -2,9 +2,11 @@ import time
 import datetime
 import os
 import jwt
+import secrets
 from fastapi import Header, Body, HTTPException
 from dotenv import load_dotenv
 from jwt.algorithms import ECAlgorithm
+from utils.ttl_cache import TTLCache
 
 # Use a secure secret in production (e.g. from env)
 load_dotenv()
@@ -22,6 +24,16 @@ SUPABASE_JWK = {
 public_key = ECAlgorithm.from_jwk(SUPABASE_JWK)
 JWT_ALGORITHM = "HS256"
 
+# Bearer token for operational endpoints (metrics), they are disabled when unset
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Verified tokens, so a token used by many requests (e.g. a batch) is checked once
+VERIFIED_TOKEN_CACHE_TTL = int(os.getenv("VERIFIED_TOKEN_CACHE_TTL", "300"))
+verified_tokens = TTLCache(
+    maxsize=int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "10000")),
+    ttl=VERIFIED_TOKEN_CACHE_TTL,
+)
+
 
 def create_jwt(user_id: str, email: str) -> str:
     """
@@ -54,11 +66,21 @@ def decode_jwt(token: str, algorithm: str) -> dict:
     """
     KEY = AUTH_BEARER_TOKEN if algorithm == "HS256" else public_key
 
+    cached = verified_tokens.get((algorithm, token))
+    if cached is not None:
+        return dict(cached)
+
     try:
         decoded_token = jwt.decode(
             token, KEY, algorithms=[algorithm], audience="authenticated"
         )
-        return decoded_token
+
+        # Never cache past the token's own expiry
+        ttl = min(VERIFIED_TOKEN_CACHE_TTL, decoded_token.get("exp", 0) - time.time())
+        if ttl > 0:
+            verified_tokens.set((algorithm, token), decoded_token, ttl=ttl)
+
+        return dict(decoded_token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=401, detail="Token is expired / Token is invalid"
@@ -112,3 +134,20 @@ async def verify_hs256_token(authorization: str = Header(...)):
     payload = decode_jwt(authorization, JWT_ALGORITHM)
 
     return payload
+
+
+async def verify_metrics_token(authorization: str = Header(...)):
+    """
+    Verify the operator token for metrics endpoints
+
+    Args:
+        authorization (str): Authorization header (contains METRICS_TOKEN)
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="Metrics are disabled")
+
+    if authorization.startswith("Bearer "):
+        authorization = authorization.split(" ")[1]
+
+    if not secrets.compare_digest(authorization.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
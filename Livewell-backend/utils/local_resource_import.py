@@ -0,0 +1,237 @@
+"""
+Bulk import of local resources, and the reference data they are searched by,
+from a CSV or NDJSON file.
+
+Usage:
+    python -m utils.local_resource_import resources.csv [--batch-size 500]
+        [--errors rejected.ndjson] [--format csv|ndjson]
+        [--table local_resources|postcode_centroids|suburbs]
+
+Rows are streamed, validated against the table's model (see TABLES) and
+upserted by the table's key in batches, so memory use does not grow with the
+file. Rejected rows are written to the errors file with the reason.
+
+postcode_centroids files have postcode, latitude and longitude columns, e.g.
+an export of the ABS postal area centroids. suburbs files have suburb and
+postcode columns, e.g. the Australia Post postcode list.
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Tuple
+from pydantic import ValidationError
+from models import LocalResource, PostcodeCentroid, Suburb
+from utils.supabase_config import init_supabase
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+IMPORT_BATCH_SIZE = int(os.getenv("LOCAL_RESOURCES_IMPORT_BATCH_SIZE", "500"))
+
+# Log progress every this many rows
+PROGRESS_EVERY = 10000
+
+# Key csv.DictReader puts the values of a row's extra fields under
+EXTRA_FIELDS = "__extra_fields__"
+
+# Importable tables: (row model, columns a row is upserted on)
+TABLES = {
+    "local_resources": (LocalResource, ("id",)),
+    "postcode_centroids": (PostcodeCentroid, ("postcode",)),
+    "suburbs": (Suburb, ("suburb", "postcode")),
+}
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def detect_format(path: str) -> str:
+    """
+    Guess the file format from its extension
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: "csv" or "ndjson"
+    """
+    return "ndjson" if path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def iter_rows(path: str, file_format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Stream rows from a file
+
+    Args:
+        path (str): File path
+        file_format (str): "csv" or "ndjson"
+
+    Returns:
+        iterator: (line number, row dict, or the raw line if it is not valid JSON).
+            CSV rows with more fields than the header keep the extra values
+            under EXTRA_FIELDS
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f, restkey=EXTRA_FIELDS)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_num, line.rstrip("\n")
+
+
+def upsert_batch(table: str, batch: dict):
+    """
+    Upsert one batch of validated rows in a single statement
+
+    Args:
+        table (str): Table name, one of TABLES
+        batch (dict): {key: row}, one row per key
+    """
+    _, key_columns = TABLES[table]
+
+    supabase_admin.table(table).upsert(
+        list(batch.values()), on_conflict=",".join(key_columns)
+    ).execute()
+
+
+def import_local_resources(
+    path: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    errors_path: Optional[str] = None,
+    file_format: Optional[str] = None,
+    table: str = "local_resources",
+) -> dict:
+    """
+    Import local resources, or one of the other TABLES, from a CSV or NDJSON file
+
+    Args:
+        path (str): File path
+        batch_size (int): Rows per upsert
+        errors_path (str): File for rejected rows, defaults to <path>.rejected.ndjson
+        file_format (str): "csv" or "ndjson", guessed from the extension if not given
+        table (str): Table to import into
+
+    Returns:
+        dict: Import report
+    """
+    model, key_columns = TABLES[table]
+    file_format = file_format or detect_format(path)
+    errors_path = errors_path or f"{path}.rejected.ndjson"
+
+    # Marks every imported row as changed so the in-memory index reloads
+    updated_at = datetime.now(timezone.utc).isoformat()
+
+    report = {"read": 0, "imported": 0, "rejected": 0, "batches": 0}
+    started = time.perf_counter()
+    batch = {}
+    lines = {}
+
+    with open(errors_path, "w", encoding="utf-8") as errors:
+
+        def reject(line_num, row, reason):
+            errors.write(
+                json.dumps({"line": line_num, "row": row, "error": reason}) + "\n"
+            )
+            report["rejected"] += 1
+
+        def flush():
+            try:
+                upsert_batch(table, batch)
+                report["imported"] += len(batch)
+            except Exception as e:
+                for line_num, row in lines.values():
+                    reject(line_num, row, f"Upsert failed: {e}")
+            report["batches"] += 1
+            batch.clear()
+            lines.clear()
+
+        for line_num, raw in iter_rows(path, file_format):
+            report["read"] += 1
+
+            if not isinstance(raw, dict):
+                reject(line_num, raw, "Invalid JSON")
+                continue
+
+            # Usually an unquoted comma, the fields after it are shifted
+            if EXTRA_FIELDS in raw:
+                reject(
+                    line_num,
+                    raw,
+                    f"{len(raw[EXTRA_FIELDS])} more fields than the header",
+                )
+                continue
+
+            try:
+                row = model(**raw).model_dump()
+            except ValidationError as e:
+                reject(
+                    line_num,
+                    raw,
+                    "; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                        for err in e.errors()
+                    ),
+                )
+                continue
+
+            # A row repeated in the file replaces the earlier one in the batch
+            key = tuple(row[column] for column in key_columns)
+            batch[key] = {**row, "updated_at": updated_at}
+            lines[key] = (line_num, raw)
+
+            if len(batch) >= batch_size:
+                flush()
+
+            if report["read"] % PROGRESS_EVERY == 0:
+                logger.info(
+                    f"Read {report['read']} rows, imported {report['imported']}, "
+                    f"rejected {report['rejected']}"
+                )
+
+        if batch:
+            flush()
+
+    report["elapsed_s"] = round(time.perf_counter() - started, 2)
+    report["errors_path"] = errors_path
+
+    logger.info(f"{table} import: {report}")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import local resources")
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--errors", help="File for rejected rows")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--table", choices=list(TABLES), default="local_resources")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    result = import_local_resources(
+        args.path, max(args.batch_size, 1), args.errors, args.format, args.table
+    )
+    print(json.dumps(result, indent=2))
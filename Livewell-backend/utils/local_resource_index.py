@@ -0,0 +1,314 @@
+import os
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from pydantic_core import to_json
+from models import LocalResource
+from utils.supabase_config import init_supabase
+from utils.spatial_index import GridIndex
+from utils.text_search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# How often the background job checks local_resources for changes
+REFRESH_SECONDS = int(os.getenv("LOCAL_RESOURCES_REFRESH_SECONDS", "300"))
+
+# Rows per page when loading the table
+LOAD_PAGE_SIZE = 1000
+
+# Upper bound for radius searches
+MAX_RADIUS_KM = 100
+
+EMPTY_BODY = b"[]"
+EMPTY_ETAG = '"' + hashlib.sha256(EMPTY_BODY).hexdigest()[:32] + '"'
+
+
+def load_table(table: str, columns: str, order: str) -> List[dict]:
+    """
+    Read a whole table page by page
+
+    Args:
+        table (str): Table name
+        columns (str): Columns to select
+        order (str): Column to page by
+
+    Returns:
+        list: Rows
+    """
+    rows = []
+    start = 0
+
+    while True:
+        result = (
+            supabase_admin.table(table)
+            .select(columns)
+            .order(order)
+            .range(start, start + LOAD_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows.extend(result.data)
+
+        if len(result.data) < LOAD_PAGE_SIZE:
+            return rows
+        start += LOAD_PAGE_SIZE
+
+
+def table_version(table: str) -> str:
+    """
+    Row count and latest updated_at of a table
+
+    Args:
+        table (str): Table name
+
+    Returns:
+        str: Table version
+    """
+    result = (
+        supabase_admin.table(table)
+        .select("updated_at", count="exact")
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+
+    latest = result.data[0]["updated_at"] if result.data else None
+    return f"{result.count}:{latest}"
+
+
+def serialize(rows: List[dict]) -> Tuple[str, bytes]:
+    """
+    Serialize rows once and compute their ETag
+
+    Args:
+        rows (list): Validated local resource rows
+
+    Returns:
+        tuple: (ETag, JSON bytes)
+    """
+    body = to_json(rows)
+
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"', body
+
+
+class LocalResourceIndex:
+    """
+    In-memory copy of local_resources keyed by postcode and category,
+    with each response serialized ahead of time
+    """
+
+    def __init__(self):
+        self.resources = {}
+        self.groups = {}
+        self.responses = {}
+        self.centroids = {}
+        self.grid = GridIndex({})
+        self.search_index = SearchIndex()
+        self.version = None
+
+    def __len__(self):
+        return len(self.resources)
+
+    def get_version(self) -> Optional[str]:
+        """
+        Cheap change check: row count and latest updated_at of local_resources
+        and postcode_centroids, so importing either one triggers a reload
+
+        Returns:
+            str: Dataset version, None if local_resources cannot be read
+        """
+        try:
+            resources = table_version("local_resources")
+        except Exception as e:
+            logger.warning(f"Failed to read local_resources version: {e}")
+            return None
+
+        # Radius search is optional, a missing centroid table is a version too
+        try:
+            centroids = table_version("postcode_centroids")
+        except Exception:
+            centroids = None
+
+        return f"{resources}|{centroids}"
+
+    def load(self, version: Optional[str] = None):
+        """
+        Load the whole table and swap in a freshly built index
+
+        Args:
+            version (str): Dataset version the load corresponds to
+        """
+        rows = load_table("local_resources", "*", "id")
+
+        # Radius search is optional, keep the previous centroids if they fail to load
+        try:
+            centroids = load_table(
+                "postcode_centroids", "postcode, latitude, longitude", "postcode"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load postcode centroids: {e}")
+            centroids = None
+
+        self.build(rows, centroids)
+        self.version = version or self.get_version()
+
+        logger.info(f"Loaded {len(self.resources)} local resources")
+
+    def build(self, rows: List[dict], centroids: Optional[List[dict]] = None):
+        """
+        Build the postcode / category index, pre-serialized responses and
+        the spatial index of postcodes with resources
+
+        Args:
+            rows (list): Local resource rows
+            centroids (list): Postcode centroid rows (postcode, latitude, longitude),
+                None keeps the current centroids
+        """
+        groups: Dict[tuple, List[dict]] = {}
+
+        for raw in rows:
+            try:
+                row = LocalResource(**raw).model_dump(mode="json")
+            except ValidationError as e:
+                logger.warning(f"Skipping local resource {raw.get('id')}: {e}")
+                continue
+
+            postcode = str(row.get("postcode") or "").strip()
+            groups.setdefault((postcode, None), []).append(row)
+            groups.setdefault((postcode, row.get("category")), []).append(row)
+
+        responses = {key: serialize(group) for key, group in groups.items()}
+
+        points = {} if centroids is not None else dict(self.centroids)
+        for centroid in centroids or []:
+            try:
+                points[str(centroid["postcode"]).strip()] = (
+                    float(centroid["latitude"]),
+                    float(centroid["longitude"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        grid = GridIndex(
+            {
+                postcode: point
+                for postcode, point in points.items()
+                if (postcode, None) in groups
+            }
+        )
+
+        resources = {row["id"]: row for group in groups.values() for row in group}
+
+        # Only resources that were added, changed or removed touch the search index
+        self.search_index.update(
+            {
+                resource_id: (
+                    {
+                        "name": row["name"],
+                        "category": row["category"],
+                        "description": row["description"],
+                    },
+                    row["category"],
+                )
+                for resource_id, row in resources.items()
+                if self.resources.get(resource_id) != row
+            },
+            [
+                resource_id
+                for resource_id in self.resources
+                if resource_id not in resources
+            ],
+        )
+
+        # Swap references so readers never see a half built index
+        self.groups = groups
+        self.centroids = points
+        self.grid = grid
+        self.resources = resources
+        self.responses = responses
+
+    def refresh(self):
+        """
+        Reload only if the dataset version changed, run in the background
+        """
+        version = self.get_version()
+
+        if version is not None and version == self.version:
+            return
+
+        try:
+            self.load(version)
+        except Exception as e:
+            logger.error(f"Failed to refresh local resources: {e}")
+
+    def get(self, postcode: str, category: Optional[str] = None) -> Tuple[str, bytes]:
+        """
+        Get the serialized resources of a postcode
+
+        Args:
+            postcode (str): Postcode
+            category (str): Optional category filter
+
+        Returns:
+            tuple: (ETag, JSON bytes)
+        """
+        return self.responses.get(
+            (postcode.strip(), category), (EMPTY_ETAG, EMPTY_BODY)
+        )
+
+    def nearby(
+        self, postcode: str, radius_km: float, category: Optional[str] = None
+    ) -> Optional[List[dict]]:
+        """
+        Get resources within a radius of a postcode's centroid
+
+        Args:
+            postcode (str): Postcode
+            radius_km (float): Radius in km
+            category (str): Optional category filter
+
+        Returns:
+            list: Resources with distance_km, nearest first. None if the
+                postcode has no known centroid
+        """
+        centre = self.centroids.get(postcode.strip())
+
+        if centre is None:
+            return None
+
+        groups = self.groups
+        results = []
+
+        for distance, match in self.grid.within(*centre, radius_km):
+            for row in groups.get((match, category), ()):
+                results.append({**row, "distance_km": round(distance, 2)})
+
+        return results
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 20):
+        """
+        Keyword search over name, description and category
+
+        Args:
+            query (str): Search text, each word matched by prefix
+            category (str): Optional category filter
+            limit (int): Maximum number of results
+
+        Returns:
+            dict: {"results": ranked resources, "facets": {category: count},
+                "total": number of matches}
+        """
+        found = self.search_index.search(query, category, limit)
+        resources = self.resources
+
+        return {
+            "results": [resources[i] for i in found["ids"] if i in resources],
+            "facets": found["facets"],
+            "total": found["total"],
+        }
+
+
+local_resource_index = LocalResourceIndex()
@@ -0,0 +1,149 @@
+import re
+import logging
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+from utils.local_resource_index import load_table, table_version
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a prefix can be followed by
+PREFIX_END = "\uffff"
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase and collapse whitespace so "st  kilda" matches "St Kilda"
+
+    Args:
+        text (str): Suburb name or postcode
+
+    Returns:
+        str: Lookup key
+    """
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+
+class PrefixIndex:
+    """
+    Sorted array of keys, a prefix lookup is two binary searches and a slice
+    """
+
+    def __init__(self, items: List[Tuple[str, dict]]):
+        """
+        Args:
+            items (list): (key, value) pairs
+        """
+        items = sorted(items, key=lambda item: item[0])
+        self.keys = [key for key, _ in items]
+        self.values = [value for _, value in items]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, prefix: str, limit: int) -> List[dict]:
+        """
+        Get the first values whose key starts with a prefix
+
+        Args:
+            prefix (str): Normalized prefix
+            limit (int): Maximum number of values
+
+        Returns:
+            list: Values in key order, so an exact match comes first
+        """
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, lo=start)
+
+        return self.values[start : min(end, start + limit)]
+
+
+class LocationAutocomplete:
+    """
+    Suburb and postcode suggestions from the suburbs table, built once at startup
+    """
+
+    def __init__(self):
+        self.suburbs = PrefixIndex([])
+        self.postcodes = PrefixIndex([])
+        self.version = None
+
+    def __len__(self):
+        return len(self.suburbs)
+
+    def build(self, rows: List[dict]):
+        """
+        Build the suburb and postcode prefix indexes
+
+        Args:
+            rows (list): Suburb rows (suburb, postcode)
+        """
+        locations = {}
+        for row in rows:
+            suburb = re.sub(r"\s+", " ", str(row.get("suburb") or "")).strip()
+            postcode = str(row.get("postcode") or "").strip()
+
+            if suburb and postcode:
+                locations[(normalize(suburb), postcode)] = {
+                    "suburb": suburb.title() if suburb.isupper() else suburb,
+                    "postcode": postcode,
+                }
+
+        self.suburbs = PrefixIndex(
+            [(f"{key[0]} {key[1]}", value) for key, value in locations.items()]
+        )
+        self.postcodes = PrefixIndex(
+            [(f"{key[1]} {key[0]}", value) for key, value in locations.items()]
+        )
+
+    def load(self, version: Optional[str] = None):
+        """
+        Load the suburbs table
+
+        Args:
+            version (str): Table version the load corresponds to
+        """
+        self.build(load_table("suburbs", "suburb, postcode", "id"))
+        self.version = version or table_version("suburbs")
+
+        logger.info(f"Loaded {len(self.suburbs)} suburbs for autocomplete")
+
+    def refresh(self):
+        """
+        Reload only if the suburbs table changed (e.g. after an import), run in
+        the background
+        """
+        try:
+            version = table_version("suburbs")
+        except Exception as e:
+            logger.warning(f"Failed to read suburbs version: {e}")
+            return
+
+        if version == self.version:
+            return
+
+        try:
+            self.load(version)
+        except Exception as e:
+            logger.error(f"Failed to refresh suburbs: {e}")
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Suggest locations, by postcode if the query starts with a digit
+
+        Args:
+            query (str): Partial suburb name or postcode
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: {"suburb", "postcode"} suggestions
+        """
+        prefix = normalize(query)
+
+        if not prefix:
+            return []
+
+        index = self.postcodes if prefix[0].isdigit() else self.suburbs
+        return index.lookup(prefix, limit)
+
+
+location_autocomplete = LocationAutocomplete()
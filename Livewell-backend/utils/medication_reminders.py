@@ -0,0 +1,327 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+from firebase_admin import messaging
+from utils.supabase_config import execute_with_retry, init_supabase
+from utils.notification_outbox import notification_outbox
+from utils.dispatch_queue import postcode_timezone
+from utils.device_tokens import get_tokens_for_users
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Rows per page when loading the medications table
+LOAD_PAGE_SIZE = int(os.getenv("REMINDER_LOAD_PAGE_SIZE", "1000"))
+
+# User IDs per .in_() lookup. The list goes in the URL's query string, 100
+# UUIDs keep it under ~4KB (proxies cap URLs at 8KB)
+LOOKUP_BATCH_SIZE = 100
+
+MEDICATION_COLUMNS = (
+    "med_id, id, name, dose_value, dose_unit, frequency_type, frequency_time, "
+    "start_date, durations"
+)
+
+# Days between doses per frequency_type (options from the app's medication form)
+FREQUENCY_INTERVAL_DAYS = {"Daily": 1, "Twice a day": 1, "Weekly": 7}
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def parse_dose_times(med: dict) -> List[tuple]:
+    """
+    Get the (hour, minute) dose times of a medication for one dosing day
+
+    Args:
+        med (dict): Medication row
+
+    Returns:
+        list: Sorted (hour, minute) tuples
+    """
+    times = []
+    for value in str(med.get("frequency_time") or "08:00").split(","):
+        try:
+            hour, minute = value.strip().split(":")[:2]
+            times.append((int(hour) % 24, int(minute) % 60))
+        except ValueError:
+            continue
+
+    if not times:
+        times = [(8, 0)]
+
+    # Twice a day with a single time: second dose 12 hours later
+    if med.get("frequency_type") == "Twice a day" and len(times) == 1:
+        hour, minute = times[0]
+        times.append(((hour + 12) % 24, minute))
+
+    return sorted(set(times))
+
+
+def next_dose_time(med: dict, tz: str, after: float) -> Optional[float]:
+    """
+    Get the next dose time of a medication after a moment
+
+    Args:
+        med (dict): Medication row
+        tz (str): User's time zone
+        after (float): Unix time
+
+    Returns:
+        float: Unix time of the next dose, None if the course is finished
+    """
+    try:
+        start = datetime.strptime(str(med["start_date"])[:10], "%Y-%m-%d").date()
+    except (KeyError, ValueError):
+        return None
+
+    interval = FREQUENCY_INTERVAL_DAYS.get(med.get("frequency_type"), 1)
+    durations = med.get("durations")
+    end = start + timedelta(days=int(durations)) if durations else None
+
+    zone = ZoneInfo(tz)
+    day = max(start, datetime.fromtimestamp(after, zone).date())
+
+    # Align to the dosing schedule (weekly doses fall on the start date's weekday)
+    offset = (day - start).days % interval
+    if offset:
+        day += timedelta(days=interval - offset)
+
+    times = parse_dose_times(med)
+
+    # Two dosing days are enough to find the next dose after any moment
+    for _ in range(2):
+        if end and day >= end:
+            return None
+
+        for hour, minute in times:
+            due = datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone)
+            if due.timestamp() > after:
+                return due.timestamp()
+
+        day += timedelta(days=interval)
+
+    return None
+
+
+def get_user_timezones(user_ids: List[str]) -> Dict[str, str]:
+    """
+    Get users' time zones from the postcode in users_info
+
+    Args:
+        user_ids (list): User IDs
+
+    Returns:
+        dict: {user_id: time zone}
+
+    Raises:
+        Exception: If a lookup still fails after retrying
+    """
+    timezones = {}
+
+    for i in range(0, len(user_ids), LOOKUP_BATCH_SIZE):
+        chunk = user_ids[i : i + LOOKUP_BATCH_SIZE]
+
+        result = execute_with_retry(
+            supabase_admin.table("users_info").select("id, postcode").in_("id", chunk)
+        )
+
+        for row in result.data:
+            timezones[row["id"]] = postcode_timezone(row.get("postcode"))
+
+    return timezones
+
+
+# ============================================================================
+# Reminder index
+# ============================================================================
+
+
+class MedicationReminders:
+    """
+    In-memory timing index of upcoming doses.
+
+    Only each medication's next dose is kept in the heap, so the heap holds one
+    entry per active medication. Changing or deleting a medication bumps its
+    version and stale heap entries are skipped when popped.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.meds = {}
+        self.versions = {}
+        self.timezones = {}
+
+    def __len__(self):
+        return len(self.meds)
+
+    def schedule(self, med_id: str, after: float):
+        """
+        Push the medication's next dose after a moment onto the heap
+
+        Args:
+            med_id (str): Medication ID
+            after (float): Unix time
+        """
+        med = self.meds[med_id]
+        tz = self.timezones.get(med["id"]) or postcode_timezone(None)
+        due = next_dose_time(med, tz, after)
+
+        if due is None:
+            # Course finished
+            self.remove(med_id)
+            return
+
+        heapq.heappush(self.heap, (due, self.versions[med_id], med_id))
+
+    def upsert(self, med: dict, tz: Optional[str] = None):
+        """
+        Add or replace one medication, only its own entry is rescheduled
+
+        Args:
+            med (dict): Medication row (must include med_id and user's id)
+            tz (str): User's time zone, the known one (or the default) if not given
+        """
+        med_id = str(med["med_id"])
+
+        if tz:
+            self.timezones[med["id"]] = tz
+
+        self.meds[med_id] = med
+        self.versions[med_id] = self.versions.get(med_id, 0) + 1
+        self.schedule(med_id, time.time())
+
+    async def upsert_many(self, meds: List[dict]):
+        """
+        Add or replace medications from the routes, time zones of new users are
+        looked up off the event loop first
+
+        Args:
+            meds (list): Medication rows (must include med_id and user's id)
+        """
+        unknown = list({med["id"] for med in meds} - self.timezones.keys())
+
+        if unknown:
+            try:
+                self.timezones.update(
+                    await asyncio.to_thread(get_user_timezones, unknown)
+                )
+            except Exception as e:
+                # The default time zone is used until the next lookup
+                logger.error(f"Failed to get time zones for reminders: {e}")
+
+        for med in meds:
+            self.upsert(med)
+
+    def remove(self, med_id: str):
+        """
+        Remove one medication, its heap entry becomes stale
+
+        Args:
+            med_id (str): Medication ID
+        """
+        med_id = str(med_id)
+        self.meds.pop(med_id, None)
+        self.versions[med_id] = self.versions.get(med_id, 0) + 1
+
+    def pop_due(self, now: float) -> List[dict]:
+        """
+        Pop every dose that is due and schedule each medication's next dose
+
+        Args:
+            now (float): Unix time
+
+        Returns:
+            list: Medication rows with a due dose
+        """
+        due = []
+
+        while self.heap and self.heap[0][0] <= now:
+            _, version, med_id = heapq.heappop(self.heap)
+
+            # Skip entries of changed or deleted medications
+            if self.versions.get(med_id) != version or med_id not in self.meds:
+                continue
+
+            due.append(self.meds[med_id])
+            self.schedule(med_id, now)
+
+        return due
+
+    def load(self):
+        """
+        Build the index from the medications table, page by page
+        """
+        meds = []
+        start = 0
+
+        while True:
+            result = (
+                supabase_admin.table("medications")
+                .select(MEDICATION_COLUMNS)
+                .order("med_id")
+                .range(start, start + LOAD_PAGE_SIZE - 1)
+                .execute()
+            )
+            meds.extend(result.data)
+
+            if len(result.data) < LOAD_PAGE_SIZE:
+                break
+            start += LOAD_PAGE_SIZE
+
+        self.timezones.update(get_user_timezones(list({med["id"] for med in meds})))
+
+        for med in meds:
+            self.upsert(med, self.timezones.get(med["id"]) or postcode_timezone(None))
+
+        logger.info(f"Loaded {len(self.meds)} medications into the reminder index")
+
+    async def dispatch_due(self):
+        """
+        Queue every reminder due now on the notification outbox, run every minute
+        """
+        due = self.pop_due(time.time())
+
+        if not due:
+            return
+
+        try:
+            tokens = await asyncio.to_thread(
+                get_tokens_for_users, list({med["id"] for med in due})
+            )
+        except Exception as e:
+            # Each medication's next dose is already scheduled
+            logger.error(
+                f"Failed to get device tokens, {len(due)} reminders missed: {e}"
+            )
+            return
+
+        for med in due:
+            if med["id"] not in tokens:
+                continue
+
+            # One multicast per dose covers all of the user's devices
+            notification_outbox.enqueue_multicast(
+                messaging.MulticastMessage(
+                    data={
+                        "title": "Medication Reminder",
+                        "body": f"Time to take {med['name']} ({med['dose_value']} {med['dose_unit']})",
+                        "type": "medication_reminder",
+                        "med_id": str(med["med_id"]),
+                        "click_action": "FLUTTER_NOTIFICATION_CLICK",
+                    },
+                    tokens=tokens[med["id"]],
+                )
+            )
+
+
+medication_reminders = MedicationReminders()
@@ -0,0 +1,276 @@
+import os
+import time
+import json
+import heapq
+import asyncio
+import logging
+from collections import deque
+from itertools import count
+from typing import List, Optional
+from firebase_admin import messaging
+from utils.fcm_delivery import (
+    FCM_BATCH_SIZE,
+    FCM_MAX_CONCURRENCY,
+    expand_multicast,
+    send_messages,
+)
+
+logger = logging.getLogger(__name__)
+
+# Wait this long for more messages before sending a partial batch
+OUTBOX_FLUSH_SECONDS = float(os.getenv("OUTBOX_FLUSH_SECONDS", "1.0"))
+
+# Same dedup key within this window is dropped
+OUTBOX_DEDUP_SECONDS = float(os.getenv("OUTBOX_DEDUP_SECONDS", "3600"))
+
+# At most this many pushes per device token per minute, the rest are deferred
+OUTBOX_TOKEN_RATE = int(os.getenv("OUTBOX_TOKEN_RATE", "5"))
+RATE_WINDOW_SECONDS = 60
+
+# Messages per drain, send_messages splits them into concurrent FCM batches
+DRAIN_SIZE = FCM_BATCH_SIZE * FCM_MAX_CONCURRENCY
+
+# Send latency samples kept for the metrics percentiles
+LATENCY_SAMPLES = 1000
+
+
+class NotificationOutbox:
+    """
+    In-process outbox for FCM messages.
+
+    enqueue() only appends to a deque, a background worker drains it in batches
+    through the batched FCM sender (which retries transient errors), with
+    deduplication and a per-token rate limit.
+    """
+
+    def __init__(self):
+        self.ready = deque()
+        self.deferred = []
+        self.sequence = count()
+        self.dedup = {}
+        self.token_sends = {}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.waits = deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {
+            "enqueued": 0,
+            "deduplicated": 0,
+            "rate_limited": 0,
+            "sent": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    # ------------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------------
+
+    def enqueue(self, message: messaging.Message, dedup_key: Optional[str] = None):
+        """
+        Queue one message for delivery
+
+        Args:
+            message (Message): FCM message
+            dedup_key (str): Identical keys within OUTBOX_DEDUP_SECONDS are dropped,
+                defaults to the token and data payload
+
+        Returns:
+            bool: False if the message was a duplicate
+        """
+        now = time.time()
+        key = dedup_key or f"{message.token}:{json.dumps(message.data, sort_keys=True)}"
+
+        if self.dedup.get(key, 0) > now:
+            self.counters["deduplicated"] += 1
+            return False
+
+        self.dedup[key] = now + OUTBOX_DEDUP_SECONDS
+        self.ready.append((now, message))
+        self.counters["enqueued"] += 1
+        self.wakeup.set()
+
+        return True
+
+    def enqueue_many(self, messages: List[messaging.Message]):
+        """
+        Queue many messages for delivery
+
+        Args:
+            messages (list): FCM messages
+        """
+        for message in messages:
+            self.enqueue(message)
+
+    def enqueue_multicast(self, message: messaging.MulticastMessage):
+        """
+        Queue one message for all of a user's devices. The devices are sent in the
+        same FCM batch call, never one send per device.
+
+        Args:
+            message (MulticastMessage): FCM multicast message
+        """
+        self.enqueue_many(expand_multicast(message))
+
+    # ------------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------------
+
+    def allow(self, token: str, now: float) -> bool:
+        """
+        Per-token sliding window rate limit
+
+        Args:
+            token (str): Device token
+            now (float): Unix time
+
+        Returns:
+            bool: True if the token can receive another push now
+        """
+        sends = self.token_sends.setdefault(token, deque())
+
+        while sends and sends[0] <= now - RATE_WINDOW_SECONDS:
+            sends.popleft()
+
+        if len(sends) >= OUTBOX_TOKEN_RATE:
+            return False
+
+        sends.append(now)
+        return True
+
+    def take_batch(self, now: float) -> list:
+        """
+        Take up to DRAIN_SIZE messages that may be sent now
+
+        Args:
+            now (float): Unix time
+
+        Returns:
+            list: (enqueued_at, message)
+        """
+        # Deferred messages whose time has come go back to the front
+        while self.deferred and self.deferred[0][0] <= now:
+            _, _, item = heapq.heappop(self.deferred)
+            self.ready.appendleft(item)
+
+        batch = []
+        while self.ready and len(batch) < DRAIN_SIZE:
+            item = self.ready.popleft()
+            token = item[1].token
+
+            if self.allow(token, now):
+                batch.append(item)
+            else:
+                # Over the token's limit, try again when the window moves on
+                self.counters["rate_limited"] += 1
+                retry_at = self.token_sends[token][0] + RATE_WINDOW_SECONDS
+                heapq.heappush(self.deferred, (retry_at, next(self.sequence), item))
+
+        return batch
+
+    def prune(self, now: float):
+        """
+        Drop expired dedup keys and idle rate limit windows
+
+        Args:
+            now (float): Unix time
+        """
+        self.dedup = {key: until for key, until in self.dedup.items() if until > now}
+        self.token_sends = {
+            token: sends
+            for token, sends in self.token_sends.items()
+            if sends and sends[-1] > now - RATE_WINDOW_SECONDS
+        }
+
+    async def run(self):
+        """
+        Worker loop, drains the outbox in batches
+        """
+        last_prune = time.time()
+
+        while True:
+            self.wakeup.clear()
+
+            if not self.ready:
+                timeout = (
+                    max(self.deferred[0][0] - time.time(), 0) if self.deferred else None
+                )
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Give producers a moment to fill the batch
+            if len(self.ready) < DRAIN_SIZE:
+                await asyncio.sleep(OUTBOX_FLUSH_SECONDS)
+
+            now = time.time()
+            batch = self.take_batch(now)
+
+            if now - last_prune > OUTBOX_DEDUP_SECONDS / 4:
+                self.prune(now)
+                last_prune = now
+
+            if not batch:
+                continue
+
+            # Time the oldest message in the batch spent in the outbox
+            self.waits.append(now - batch[0][0])
+
+            started = time.perf_counter()
+            try:
+                report = await send_messages([message for _, message in batch])
+                self.counters["sent"] += report["sent"]
+                self.counters["failed"] += report["failed"]
+            except Exception as e:
+                self.counters["failed"] += len(batch)
+                logger.error(f"Outbox batch of {len(batch)} failed: {e}")
+
+            self.counters["batches"] += 1
+            self.latencies.append(time.perf_counter() - started)
+
+    def metrics(self) -> dict:
+        """
+        Queue depth, counters and send latency
+
+        Returns:
+            dict: Outbox metrics
+        """
+
+        def percentile(samples, p):
+            samples = sorted(samples)
+            if not samples:
+                return None
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 3)
+
+        return {
+            "queue_depth": len(self.ready),
+            "deferred": len(self.deferred),
+            **self.counters,
+            "send_latency_p50_s": percentile(self.latencies, 0.5),
+            "send_latency_p95_s": percentile(self.latencies, 0.95),
+            "queue_wait_p50_s": percentile(self.waits, 0.5),
+            "queue_wait_p95_s": percentile(self.waits, 0.95),
+        }
+
+    def start(self):
+        """
+        Start the worker on the running event loop
+        """
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stop the worker, messages still queued are dropped
+        """
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+notification_outbox = NotificationOutbox()
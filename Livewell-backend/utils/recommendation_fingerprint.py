@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+from utils.supabase_config import execute_with_retry, init_supabase
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Only the last two weeks of tracking data feed the fingerprint
+TRACKING_WINDOW_DAYS = int(os.getenv("RECOMMENDATION_TRACKING_WINDOW_DAYS", "14"))
+
+# Round tracking averages so small day-to-day noise does not count as a change
+STEPS_BUCKET = 500
+WATER_BUCKET_ML = 100
+
+# Columns that change on every write but say nothing about the user
+VOLATILE_KEYS = {"created_at", "updated_at", "last_seen"}
+
+# Rows per upsert on recommendation_fingerprints
+FINGERPRINT_BATCH_SIZE = 500
+
+# User IDs per select, the list goes in the URL's query string
+FINGERPRINT_LOOKUP_BATCH_SIZE = 100
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def summarize_tracking(rows: List[dict]) -> dict:
+    """
+    Reduce raw tracking_data rows to recent aggregates
+
+    Args:
+        rows (list): tracking_data rows
+
+    Returns:
+        dict: Number of active days and bucketed averages for the window
+    """
+    since = (datetime.now() - timedelta(days=TRACKING_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    recent = [row for row in rows if str(row.get("today_date", "")) >= since]
+
+    if not recent:
+        return {"days": 0}
+
+    steps = sum(row.get("current_steps") or 0 for row in recent) / len(recent)
+    water = sum(row.get("current_water_intake_ml") or 0 for row in recent) / len(recent)
+
+    return {
+        "days": len(recent),
+        "avg_steps": round(steps / STEPS_BUCKET) * STEPS_BUCKET,
+        "avg_water_intake_ml": round(water / WATER_BUCKET_ML) * WATER_BUCKET_ML,
+    }
+
+
+def normalize_context(value):
+    """
+    Strip volatile columns and replace tracking rows with aggregates
+
+    Args:
+        value: User's info from get_user_data_tables (dict / list / scalar)
+
+    Returns:
+        Normalized copy of the value
+    """
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            if key in VOLATILE_KEYS:
+                continue
+            if key == "tracking_data" and isinstance(item, list):
+                normalized[key] = summarize_tracking(item)
+            else:
+                normalized[key] = normalize_context(item)
+        return normalized
+
+    if isinstance(value, list):
+        return [normalize_context(item) for item in value]
+
+    return value
+
+
+def build_fingerprint(user_info) -> str:
+    """
+    Compute a fingerprint of the inputs a recommendation depends on
+
+    Args:
+        user_info: User's info from get_user_data_tables (profile, tracking, medications, vaccinations)
+
+    Returns:
+        str: sha256 hex digest
+    """
+    canonical = json.dumps(
+        normalize_context(user_info), sort_keys=True, separators=(",", ":"), default=str
+    )
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def load_fingerprints(user_ids: List[str]) -> dict:
+    """
+    Get the previous run's fingerprints and recommendations
+
+    Args:
+        user_ids (list): User IDs
+
+    Returns:
+        dict: {user_id: {"fingerprint": str, "recommendation": dict}}
+
+    Raises:
+        Exception: If a lookup still fails after retrying
+    """
+    previous = {}
+
+    for i in range(0, len(user_ids), FINGERPRINT_LOOKUP_BATCH_SIZE):
+        chunk = user_ids[i : i + FINGERPRINT_LOOKUP_BATCH_SIZE]
+
+        result = execute_with_retry(
+            supabase_admin.table("recommendation_fingerprints")
+            .select("id, fingerprint, recommendation")
+            .in_("id", chunk)
+        )
+
+        for row in result.data:
+            previous[row["id"]] = row
+
+    return previous
+
+
+def save_fingerprints(rows: List[dict]):
+    """
+    Upsert fingerprints and the recommendation generated from them
+
+    Args:
+        rows (list): [{"id": user_id, "fingerprint": str, "recommendation": dict}]
+    """
+    now = datetime.now(timezone.utc).isoformat()
+
+    for i in range(0, len(rows), FINGERPRINT_BATCH_SIZE):
+        chunk = [
+            {**row, "updated_at": now} for row in rows[i : i + FINGERPRINT_BATCH_SIZE]
+        ]
+
+        try:
+            supabase_admin.table("recommendation_fingerprints").upsert(chunk).execute()
+        except Exception as e:
+            logger.error(
+                f"Failed to save {len(chunk)} recommendation fingerprints: {e}"
+            )
@@ -0,0 +1,241 @@
+import os
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from google import genai
+from google.genai import types, errors
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gemini-3-flash-preview"
+CONTENTS = "Please generated weekly goals for user"
+
+# Batch jobs are polled until done or until the timeout, whichever comes first.
+# The timeout stays below the gap between the prepare and send jobs in main.py,
+# a job that has not finished is cancelled and its users get local goals.
+BATCH_POLL_SECONDS = float(os.getenv("RECOMMENDATION_BATCH_POLL_SECONDS", "30"))
+BATCH_TIMEOUT_SECONDS = float(os.getenv("RECOMMENDATION_BATCH_TIMEOUT_SECONDS", "5400"))
+
+BATCH_DONE_STATES = {
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
+}
+
+
+def build_config(system_instruction: str) -> types.GenerateContentConfig:
+    """
+    Model config shared by the interactive and batch providers
+
+    Args:
+        system_instruction (str): Prompt with the user's info
+
+    Returns:
+        GenerateContentConfig: Model config
+    """
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=0.7,
+        top_p=0.95,
+        top_k=40,
+        max_output_tokens=2048,
+        response_mime_type="application/json",
+    )
+
+
+# ============================================================================
+# Providers
+# ============================================================================
+
+
+class RecommendationProvider(ABC):
+    """
+    Interface for the model that writes weekly goals.
+    Users missing from the result fall back to the local goal engine.
+    """
+
+    @abstractmethod
+    async def generate(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Generate a JSON reply per user
+
+        Args:
+            prompts (dict): {user_id: system instruction}
+
+        Returns:
+            dict: {user_id: model reply text}
+        """
+
+
+class LocalRecommendationProvider(RecommendationProvider):
+    """
+    Stand-in that never calls a model, optionally returns canned replies
+    """
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None):
+        self.responses = responses or {}
+        self.prompts = {}
+
+    async def generate(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        self.prompts = prompts
+
+        return {
+            user_id: self.responses[user_id]
+            for user_id in prompts
+            if user_id in self.responses
+        }
+
+
+class GeminiInteractiveProvider(RecommendationProvider):
+    """
+    One generate_content call per user, stops calling Gemini once rate limited
+    """
+
+    def __init__(self, client: genai.Client):
+        self.client = client
+        self.rate_limited = False
+
+    def generate_one(self, system_instruction: str) -> Optional[str]:
+        if self.rate_limited:
+            return None
+
+        try:
+            response = self.client.models.generate_content(
+                model=MODEL,
+                contents=CONTENTS,
+                config=build_config(system_instruction),
+            )
+            return response.text
+        except errors.APIError as e:
+            if e.code == 429:
+                # Stop calling Gemini for the rest of this run
+                self.rate_limited = True
+            logger.warning(f"Gemini request failed: {e}")
+        except Exception as e:
+            logger.warning(f"Gemini request failed: {e}")
+
+        return None
+
+    async def generate(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        self.rate_limited = False
+        user_ids = list(prompts)
+
+        texts = await asyncio.gather(
+            *(
+                asyncio.to_thread(self.generate_one, prompts[user_id])
+                for user_id in user_ids
+            )
+        )
+
+        return {user_id: text for user_id, text in zip(user_ids, texts) if text}
+
+
+class GeminiBatchProvider(RecommendationProvider):
+    """
+    All prompts in one Gemini batch job, off the interactive quota
+    """
+
+    def __init__(self, client: genai.Client):
+        self.client = client
+
+    async def generate(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        if not prompts:
+            return {}
+
+        user_ids = list(prompts)
+        requests = [
+            types.InlinedRequest(
+                contents=CONTENTS,
+                config=build_config(prompts[user_id]),
+                metadata={"user_id": user_id},
+            )
+            for user_id in user_ids
+        ]
+
+        try:
+            batch_job = await asyncio.to_thread(
+                self.client.batches.create,
+                model=MODEL,
+                src=requests,
+                config=types.CreateBatchJobConfig(
+                    display_name=f"weekly-goals-{int(time.time())}"
+                ),
+            )
+
+            deadline = time.monotonic() + BATCH_TIMEOUT_SECONDS
+            while batch_job.state not in BATCH_DONE_STATES:
+                if time.monotonic() > deadline:
+                    logger.error(f"Batch job {batch_job.name} timed out")
+                    await self.cancel(batch_job.name)
+                    return {}
+
+                await asyncio.sleep(BATCH_POLL_SECONDS)
+                batch_job = await asyncio.to_thread(
+                    self.client.batches.get, name=batch_job.name
+                )
+        except Exception as e:
+            logger.error(f"Gemini batch submission failed: {e}")
+            return {}
+
+        if not (batch_job.dest and batch_job.dest.inlined_responses):
+            logger.error(f"Batch job {batch_job.name} ended in {batch_job.state}")
+            return {}
+
+        results = {}
+        for index, inlined in enumerate(batch_job.dest.inlined_responses):
+            if inlined.error or not inlined.response:
+                continue
+
+            # Responses keep request order, metadata is used when returned
+            metadata = inlined.metadata or {}
+            user_id = metadata.get("user_id") or user_ids[index]
+
+            try:
+                results[user_id] = inlined.response.text
+            except Exception as e:
+                logger.warning(f"Unreadable batch response for {user_id}: {e}")
+
+        logger.info(
+            f"Batch job {batch_job.name} returned {len(results)}/{len(prompts)} replies"
+        )
+
+        return results
+
+    async def cancel(self, name: str):
+        """
+        Cancel a batch job whose replies are no longer needed
+
+        Args:
+            name (str): Batch job name
+        """
+        try:
+            await asyncio.to_thread(self.client.batches.cancel, name=name)
+        except Exception as e:
+            logger.warning(f"Failed to cancel batch job {name}: {e}")
+
+
+def get_provider(mode: str = None) -> RecommendationProvider:
+    """
+    Get the provider for RECOMMENDATION_MODE (interactive, batch or local)
+
+    Args:
+        mode (str): Overrides RECOMMENDATION_MODE
+
+    Returns:
+        RecommendationProvider: Provider for the weekly job
+    """
+    mode = (mode or os.getenv("RECOMMENDATION_MODE", "batch")).lower()
+
+    if mode == "local":
+        return LocalRecommendationProvider()
+
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    if mode == "interactive":
+        return GeminiInteractiveProvider(client)
+
+    return GeminiBatchProvider(client)
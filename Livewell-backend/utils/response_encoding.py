@@ -0,0 +1,284 @@
+import os
+import gzip
+import asyncio
+from typing import Dict, Optional
+from pydantic_core import from_json
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Smaller bodies fit in a packet or two, compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Bodies this large are compressed on a worker thread instead of the event loop
+COMPRESSION_THREAD_MIN_SIZE = 256 * 1024
+
+# Fast levels, responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Chat replies are text/plain, sent as the model writes them
+EXCLUDED_MEDIA_TYPES = ("text/plain", "text/event-stream")
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def parse_qvalues(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept or Accept-Encoding header
+
+    Args:
+        header (str): e.g. "br;q=1.0, gzip;q=0.8, *;q=0.1"
+
+    Returns:
+        dict: {lowercase value: q}
+    """
+    values = {}
+
+    for part in header.split(","):
+        value, *params = [item.strip() for item in part.split(";")]
+        if not value:
+            continue
+
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+
+        values[value.lower()] = q
+
+    return values
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding, brotli over gzip when both are accepted
+
+    Args:
+        accept_encoding (str): Accept-Encoding header
+
+    Returns:
+        str: "br", "gzip" or None for no compression
+    """
+    accepted = parse_qvalues(accept_encoding)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(supported)
+    ]
+    q, _, encoding = max(candidates)
+
+    return encoding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a response body
+
+    Args:
+        body (bytes): Response body
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """
+    Check if the client prefers MessagePack to JSON
+
+    Args:
+        accept (str): Accept header
+
+    Returns:
+        bool: True if a MessagePack type is accepted at least as much as JSON
+    """
+    if msgpack is None or "msgpack" not in accept:
+        return False
+
+    accepted = parse_qvalues(accept)
+    q = max(accepted.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+
+    return q > 0 and q >= accepted.get("application/json", 0.0)
+
+
+def media_type(headers: Headers) -> str:
+    return headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def weaken_etag(headers: MutableHeaders):
+    """
+    Mark the ETag weak once the body is re-encoded, the bytes differ but the
+    data does not, so If-None-Match still matches (etag_matches drops W/)
+
+    Args:
+        headers (MutableHeaders): Response headers
+    """
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = "W/" + etag
+
+
+async def send_whole_body(
+    send: Send, scope: Scope, receive: Receive, app: ASGIApp, rewrite
+):
+    """
+    Run the app and pass its response through rewrite, which gets the start
+    message and the whole body. Streamed responses (more than one body message)
+    are sent on unchanged as they arrive.
+
+    Args:
+        send (Send): ASGI send
+        scope (Scope): ASGI scope
+        receive (Receive): ASGI receive
+        app (ASGIApp): Wrapped app
+        rewrite (Callable): async (start, body) -> (start, body)
+    """
+    start = None
+
+    async def wrapped_send(message: Message):
+        nonlocal start
+
+        if message["type"] == "http.response.start":
+            start = message
+            return
+
+        if message["type"] != "http.response.body" or start is None:
+            await send(message)
+            return
+
+        head, start = start, None
+
+        if message.get("more_body", False):
+            await send(head)
+            await send(message)
+            return
+
+        head, body = await rewrite(head, message.get("body", b""))
+        await send(head)
+        await send({**message, "body": body})
+
+    await app(scope, receive, wrapped_send)
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, as negotiated by Accept-Encoding.
+
+    Small bodies, text/plain and streamed responses are sent as they are, so
+    chat replies still reach the client token by token.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        async def rewrite(start: Message, body: bytes):
+            headers = MutableHeaders(raw=list(start["headers"]))
+
+            if media_type(headers) in EXCLUDED_MEDIA_TYPES:
+                return start, body
+
+            # Compressed or not, the response depends on Accept-Encoding, so
+            # caches must not hand it to clients that negotiate differently
+            headers.add_vary_header("Accept-Encoding")
+
+            if (
+                encoding is None
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                return {**start, "headers": headers.raw}, body
+
+            if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            weaken_etag(headers)
+
+            return {**start, "headers": headers.raw}, body
+
+        await send_whole_body(send, scope, receive, self.app, rewrite)
+
+
+class MsgpackMiddleware:
+    """
+    Re-encodes JSON responses of the API as MessagePack for clients that ask
+    for it in Accept, every other client keeps getting JSON
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        # Nothing is negotiated without msgpack installed
+        if msgpack is None:
+            await self.app(scope, receive, send)
+            return
+
+        convert = accepts_msgpack(Headers(scope=scope).get("accept", ""))
+
+        async def rewrite(start: Message, body: bytes):
+            headers = MutableHeaders(raw=list(start["headers"]))
+
+            # A 304 stands in for the JSON response it revalidates
+            if media_type(headers) != "application/json" and start["status"] != 304:
+                return start, body
+
+            # JSON or MessagePack, the response depends on Accept
+            headers.add_vary_header("Accept")
+
+            if not convert or not body:
+                return {**start, "headers": headers.raw}, body
+
+            body = msgpack.packb(from_json(body))
+
+            headers["content-type"] = MSGPACK_MEDIA_TYPES[0]
+            headers["content-length"] = str(len(body))
+            weaken_etag(headers)
+
+            return {**start, "headers": headers.raw}, body
+
+        await send_whole_body(send, scope, receive, self.app, rewrite)
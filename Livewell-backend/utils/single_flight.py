@@ -0,0 +1,89 @@
+import asyncio
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent reads into one upstream call.
+
+    The first caller for a key runs the (blocking) query on a worker thread, every
+    caller arriving while it runs awaits the same result. Nothing is cached once
+    the call finishes, so later reads always see fresh data.
+    """
+
+    def __init__(self):
+        self.flights = {}
+        self.counters = {"calls": 0, "upstream": 0, "collapsed": 0, "errors": 0}
+
+    async def run(self, key: Hashable, fn: Callable):
+        """
+        Run a query once for all concurrent callers with the same key
+
+        Args:
+            key (Hashable): Identifies the query, e.g. ("medications", user_id)
+            fn (Callable): Blocking query, e.g. a Supabase builder's execute
+
+        Returns:
+            Any: The query result
+        """
+        self.counters["calls"] += 1
+
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.counters["collapsed"] += 1
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(asyncio.to_thread(fn))
+        self.flights[key] = flight
+        self.counters["upstream"] += 1
+
+        # Removed when the query finishes, even if this caller is cancelled first
+        flight.add_done_callback(lambda done: self.finish(key, done))
+
+        return await asyncio.shield(flight)
+
+    def forget(self, *prefix):
+        """
+        Let later reads start a new query instead of joining one already running,
+        called after a write so readers never get data from before it
+
+        Args:
+            prefix: Leading parts of the keys to forget, e.g. "medications", user_id
+        """
+        for key in list(self.flights):
+            if key[: len(prefix)] == prefix:
+                self.flights.pop(key, None)
+
+    def finish(self, key: Hashable, flight: asyncio.Future):
+        """
+        Forget a finished flight
+
+        Args:
+            key (Hashable): Query key
+            flight (Future): The finished query
+        """
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+        if not flight.cancelled() and flight.exception() is not None:
+            self.counters["errors"] += 1
+
+    def metrics(self) -> dict:
+        """
+        Call counters
+
+        Returns:
+            dict: Calls, upstream queries, collapsed calls and in-flight queries
+        """
+        calls = self.counters["calls"]
+
+        return {
+            **self.counters,
+            "in_flight": len(self.flights),
+            "collapsed_ratio": (
+                round(self.counters["collapsed"] / calls, 3) if calls else None
+            ),
+        }
+
+
+single_flight = SingleFlight()
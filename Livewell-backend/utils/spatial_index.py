@@ -0,0 +1,89 @@
+import math
+from typing import Dict, List, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometres per degree of latitude
+KM_PER_DEGREE = 111.32
+
+# Grid cell size in degrees (about 11 km of latitude)
+GRID_DEGREES = 0.1
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points
+
+    Args:
+        lat1 (float): Latitude of the first point
+        lon1 (float): Longitude of the first point
+        lat2 (float): Latitude of the second point
+        lon2 (float): Longitude of the second point
+
+    Returns:
+        float: Distance in km
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """
+    Fixed-size lat/lon grid of keyed points.
+
+    A radius query only looks at the cells overlapping the radius' bounding box,
+    then checks exact distances for the points in them.
+    """
+
+    def __init__(self, points: Dict[str, Tuple[float, float]]):
+        """
+        Args:
+            points (dict): {key: (latitude, longitude)}
+        """
+        self.points = points
+        self.cells: Dict[Tuple[int, int], List[str]] = {}
+
+        for key, (lat, lon) in points.items():
+            self.cells.setdefault(self.cell(lat, lon), []).append(key)
+
+    def __len__(self):
+        return len(self.points)
+
+    @staticmethod
+    def cell(lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+
+    def within(
+        self, lat: float, lon: float, radius_km: float
+    ) -> List[Tuple[float, str]]:
+        """
+        Find the points within a radius
+
+        Args:
+            lat (float): Latitude of the centre
+            lon (float): Longitude of the centre
+            radius_km (float): Radius in km
+
+        Returns:
+            list: (distance_km, key) sorted by distance
+        """
+        lat_delta = radius_km / KM_PER_DEGREE
+        lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+
+        min_row, min_col = self.cell(lat - lat_delta, lon - lon_delta)
+        max_row, max_col = self.cell(lat + lat_delta, lon + lon_delta)
+
+        found = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for key in self.cells.get((row, col), ()):
+                    distance = haversine_km(lat, lon, *self.points[key])
+                    if distance <= radius_km:
+                        found.append((distance, key))
+
+        found.sort()
+        return found
@@ -1,6 +1,11 @@
 import os
+import time
 from supabase import Client, create_client
 
+# Attempts of a bulk lookup before its error is raised to the caller
+LOOKUP_MAX_ATTEMPTS = int(os.getenv("SUPABASE_LOOKUP_MAX_ATTEMPTS", "3"))
+LOOKUP_RETRY_BASE_DELAY = float(os.getenv("SUPABASE_LOOKUP_RETRY_BASE_DELAY", "0.5"))
+
 
 def init_supabase():
     url: str = os.getenv("SUPABASE_URL")
@@ -8,3 +13,23 @@ def init_supabase():
     supabase_admin: Client = create_client(url, key)
 
     return supabase_admin
+
+
+def execute_with_retry(query):
+    """
+    Execute a read query, retrying with exponential backoff. For bulk lookups
+    whose callers must not mistake a failed read for "no rows".
+
+    Args:
+        query: Supabase query builder
+
+    Returns:
+        The query's response, the last error is raised if every attempt fails
+    """
+    for attempt in range(LOOKUP_MAX_ATTEMPTS):
+        try:
+            return query.execute()
+        except Exception:
+            if attempt == LOOKUP_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(LOOKUP_RETRY_BASE_DELAY * 2**attempt)
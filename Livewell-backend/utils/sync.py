@@ -0,0 +1,287 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from utils.supabase_config import init_supabase
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Synced tables and the column each row is keyed by on the client
+SYNC_COLLECTIONS = {
+    "medications": "med_id",
+    "vaccinations": "vac_id",
+    "tracking_data": "today_date",
+    "goal_recommendations": "recommend_id",
+}
+
+# Most changed rows returned per collection, the client asks again while has_more
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+
+# Separates the parts of a cursor, never found in timestamps or row keys
+CURSOR_SEPARATOR = "|"
+
+# Where a stream was read up to: (time, row key) of the last row sent
+Position = Optional[Tuple[str, Optional[str]]]
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def now_iso() -> str:
+    """
+    Current UTC time for updated_at and deleted_at columns
+
+    Returns:
+        str: ISO timestamp
+    """
+    return datetime.now(timezone.utc).isoformat()
+
+
+def encode_cursor(changes: Position, deleted: Position) -> str:
+    """
+    Build the cursor returned to the client
+
+    Args:
+        changes (tuple): (updated_at, row key) of the last changed row sent
+        deleted (tuple): (deleted_at, row_id) of the last tombstone sent
+
+    Returns:
+        str: Opaque cursor, "changes time|key|deleted time|key"
+    """
+    parts = []
+    for position in (changes, deleted):
+        time, key = position or (None, None)
+        parts += [time or "", "" if key is None else str(key)]
+
+    return CURSOR_SEPARATOR.join(parts)
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Position, Position]:
+    """
+    Read a cursor returned by a previous sync
+
+    Args:
+        cursor (str): Cursor, None for a full sync
+
+    Returns:
+        tuple: (changes position, deleted position), None where not synced yet
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    if not cursor:
+        return None, None
+
+    parts = cursor.split(CURSOR_SEPARATOR)
+
+    # Plain timestamp from before cursors had a key, both streams resume after it
+    if len(parts) == 1:
+        return (cursor, None), (cursor, None)
+
+    if len(parts) != 4:
+        raise ValueError(f"Invalid sync cursor: {cursor}")
+
+    changes_time, changes_key, deleted_time, deleted_key = parts
+
+    return (
+        (changes_time, changes_key or None) if changes_time else None,
+        (deleted_time, deleted_key or None) if deleted_time else None,
+    )
+
+
+def after_position(query, time_column: str, key_column: str, position: Position):
+    """
+    Filter a query to rows after a (time, key) position, rows sharing the
+    position's time are told apart by their key so none is skipped at a page end
+
+    Args:
+        query: Supabase query
+        time_column (str): Timestamp column the rows are ordered by
+        key_column (str): Column breaking ties between equal timestamps
+        position (tuple): (time, key) of the last row sent, key may be None
+
+    Returns:
+        The filtered query
+    """
+    if position is None:
+        return query
+
+    time, key = position
+    if key is None:
+        return query.gt(time_column, time)
+
+    return query.or_(
+        f'{time_column}.gt."{time}",'
+        f'and({time_column}.eq."{time}",{key_column}.gt."{key}")'
+    )
+
+
+def last_position(rows: list, time_column: str, key_column: str) -> Position:
+    """
+    Position of the last row of a page
+
+    Args:
+        rows (list): Page of rows, ordered by time then key
+        time_column (str): Timestamp column
+        key_column (str): Tie-breaking column
+
+    Returns:
+        tuple: (time, key), None if no row has a time
+    """
+    for row in reversed(rows):
+        if row.get(time_column):
+            return row[time_column], str(row[key_column])
+
+    return None
+
+
+def record_tombstones(user_id: str, collection: str, row_ids: List[str]):
+    """
+    Remember deleted rows so clients can drop them on their next sync
+
+    Args:
+        user_id (str): User ID
+        collection (str): Table the rows were deleted from
+        row_ids (list): Keys of the deleted rows
+    """
+    if not row_ids:
+        return
+
+    deleted_at = now_iso()
+
+    try:
+        supabase_admin.table("sync_tombstones").insert(
+            [
+                {
+                    "id": user_id,
+                    "collection": collection,
+                    "row_id": str(row_id),
+                    "deleted_at": deleted_at,
+                }
+                for row_id in row_ids
+            ]
+        ).execute()
+    except Exception as e:
+        logger.error(f"Failed to record {collection} tombstones: {e}")
+
+
+def get_changed_rows(user_id: str, collection: str, position: Position) -> list:
+    """
+    Get rows created or updated after a position, oldest first
+
+    Args:
+        user_id (str): User ID
+        collection (str): Table name
+        position (tuple): (updated_at, row key) of the last row sent, None for every row
+
+    Returns:
+        list: Changed rows
+    """
+    key = SYNC_COLLECTIONS[collection]
+    query = supabase_admin.table(collection).select("*").eq("id", user_id)
+    query = after_position(query, "updated_at", key, position)
+
+    return query.order("updated_at").order(key).limit(SYNC_PAGE_SIZE).execute().data
+
+
+def get_deleted_rows(user_id: str, collection: str, position: Position) -> list:
+    """
+    Get tombstones recorded after a position, oldest first
+
+    Args:
+        user_id (str): User ID
+        collection (str): Table name
+        position (tuple): (deleted_at, row_id) of the last tombstone sent,
+            None on a first sync (nothing to delete yet)
+
+    Returns:
+        list: Tombstone rows (row_id, deleted_at)
+    """
+    if position is None:
+        return []
+
+    query = (
+        supabase_admin.table("sync_tombstones")
+        .select("row_id, deleted_at")
+        .eq("id", user_id)
+        .eq("collection", collection)
+    )
+    query = after_position(query, "deleted_at", "row_id", position)
+
+    return (
+        query.order("deleted_at").order("row_id").limit(SYNC_PAGE_SIZE).execute().data
+    )
+
+
+async def get_collection_changes(
+    user_id: str, collection: str, since: Optional[str]
+) -> dict:
+    """
+    Get one collection's changes since a cursor. Changed rows and tombstones
+    are paged separately, the cursor keeps a (time, key) position for each.
+
+    Args:
+        user_id (str): User ID
+        collection (str): Table name
+        since (str): Cursor from the previous sync
+
+    Returns:
+        dict: {"changes": rows, "deleted": row keys, "cursor": next cursor,
+            "has_more": True if another page is waiting}
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    changes_position, deleted_position = decode_cursor(since)
+    started = now_iso()
+
+    changes, deleted = await asyncio.gather(
+        asyncio.to_thread(get_changed_rows, user_id, collection, changes_position),
+        asyncio.to_thread(get_deleted_rows, user_id, collection, deleted_position),
+    )
+
+    # A full sync sends every row, only deletes after it started matter
+    if deleted_position is None:
+        deleted_position = (started, None)
+
+    has_more = len(changes) == SYNC_PAGE_SIZE or len(deleted) == SYNC_PAGE_SIZE
+
+    cursor = encode_cursor(
+        last_position(changes, "updated_at", SYNC_COLLECTIONS[collection])
+        or changes_position,
+        last_position(deleted, "deleted_at", "row_id") or deleted_position,
+    )
+
+    return {
+        "changes": changes,
+        "deleted": [row["row_id"] for row in deleted],
+        "cursor": cursor,
+        "has_more": has_more,
+    }
+
+
+async def get_changes(user_id: str, cursors: Dict[str, Optional[str]]) -> dict:
+    """
+    Get changes for every synced collection, queried concurrently
+
+    Args:
+        user_id (str): User ID
+        cursors (dict): {collection: cursor from the previous sync or None}
+
+    Returns:
+        dict: {collection: changes}
+    """
+    results = await asyncio.gather(
+        *(
+            get_collection_changes(user_id, collection, cursors.get(collection))
+            for collection in SYNC_COLLECTIONS
+        )
+    )
+
+    return dict(zip(SYNC_COLLECTIONS, results))
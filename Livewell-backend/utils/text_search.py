@@ -0,0 +1,212 @@
+import re
+import math
+import heapq
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# A match in the name counts more than one in the category or description
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+# A whole-word match scores higher than a prefix match
+PREFIX_PENALTY = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase words
+
+    Args:
+        text (str): Text
+
+    Returns:
+        list: Tokens
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class SearchIndex:
+    """
+    Inverted index over documents with weighted fields.
+
+    Terms are kept in a sorted list so a query word matches every term it is
+    a prefix of (typeahead). Documents are added and removed one at a time,
+    so a changed resource never needs a full rebuild. Updates may run on a
+    background thread, a lock keeps searches from seeing them half applied.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.categories: Dict[str, str] = {}
+        self.terms: List[str] = []
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def add(self, doc_id: str, fields: Dict[str, str], category: str):
+        """
+        Add or replace one document
+
+        Args:
+            doc_id (str): Document ID
+            fields (dict): {field name: text}, weighted by FIELD_WEIGHTS
+            category (str): Category used for facets and filtering
+        """
+        self.remove(doc_id)
+
+        weights = {}
+        for field, text in fields.items():
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0), FIELD_WEIGHTS.get(field, 1.0))
+
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self.dirty = True
+            self.postings[term][doc_id] = weight
+
+        self.doc_terms[doc_id] = list(weights)
+        self.categories[doc_id] = category
+
+    def remove(self, doc_id: str):
+        """
+        Remove one document
+
+        Args:
+            doc_id (str): Document ID
+        """
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+                self.dirty = True
+
+        self.categories.pop(doc_id, None)
+
+    def update(self, docs: Dict[str, tuple], removed: List[str]):
+        """
+        Apply a batch of changes under the lock
+
+        Args:
+            docs (dict): {doc_id: (fields, category)} to add or replace
+            removed (list): Document IDs to remove
+        """
+        with self.lock:
+            for doc_id in removed:
+                self.remove(doc_id)
+            for doc_id, (fields, category) in docs.items():
+                self.add(doc_id, fields, category)
+
+    def expand(self, word: str) -> List[str]:
+        """
+        Get every indexed term starting with a word
+
+        Args:
+            word (str): Query word
+
+        Returns:
+            list: Matching terms
+        """
+        if self.dirty:
+            self.terms = sorted(self.postings)
+            self.dirty = False
+
+        terms = self.terms
+        matches = []
+        i = bisect_left(terms, word)
+
+        while i < len(terms) and terms[i].startswith(word):
+            matches.append(terms[i])
+            i += 1
+
+        return matches
+
+    def search(
+        self, query: str, category: Optional[str] = None, limit: int = 20
+    ) -> dict:
+        """
+        Find documents matching every query word, by prefix
+
+        Args:
+            query (str): Search text
+            category (str): Optional category filter
+            limit (int): Maximum number of results
+
+        Returns:
+            dict: {"ids": ranked document IDs, "facets": {category: count},
+                "total": number of matches}
+        """
+        words = tokenize(query)
+        if not words:
+            return {"ids": [], "facets": {}, "total": 0}
+
+        with self.lock:
+            return self.rank(words, category, limit)
+
+    def rank(self, words: List[str], category: Optional[str], limit: int) -> dict:
+        """
+        Score and rank the documents matching every word, called under the lock
+
+        Args:
+            words (list): Query words
+            category (str): Optional category filter
+            limit (int): Maximum number of results
+
+        Returns:
+            dict: Same as search()
+        """
+        total_docs = max(len(self.doc_terms), 1)
+        scores = None
+
+        for word in words:
+            word_scores = {}
+
+            for term in self.expand(word):
+                docs = self.postings[term]
+                idf = math.log(1 + total_docs / len(docs))
+                factor = 1.0 if term == word else PREFIX_PENALTY
+
+                for doc_id, weight in docs.items():
+                    score = weight * idf * factor
+                    if score > word_scores.get(doc_id, 0):
+                        word_scores[doc_id] = score
+
+            # Every word must match
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {
+                    doc_id: score + word_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in word_scores
+                }
+
+            if not scores:
+                return {"ids": [], "facets": {}, "total": 0}
+
+        # Facet counts cover every match, before the category filter
+        facets = {}
+        for doc_id in scores:
+            facets[self.categories[doc_id]] = facets.get(self.categories[doc_id], 0) + 1
+
+        if category:
+            scores = {
+                doc_id: score
+                for doc_id, score in scores.items()
+                if self.categories[doc_id] == category
+            }
+
+        ranked = heapq.nsmallest(
+            limit, scores, key=lambda doc_id: (-scores[doc_id], doc_id)
+        )
+
+        return {"ids": ranked, "facets": facets, "total": len(scores)}
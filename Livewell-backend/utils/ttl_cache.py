@@ -0,0 +1,123 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-process cache, entries expire after ttl seconds and the least
+    recently used entry is evicted when the cache is full.
+
+    A value read from the source while the key was invalidated would put the old
+    value back. Readers take a token() before reading and pass it to set(), which
+    skips the value if the key was invalidated after the token was taken.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # Invalidation number of recently invalidated keys, bounded like the
+        # entries. Keys that fell out count as invalidated at the floor.
+        self.invalidations = 0
+        self.invalidated = OrderedDict()
+        self.invalidated_floor = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a value if it is cached and not expired
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Any: Cached value, None on a miss
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def token(self) -> int:
+        """
+        Take before reading a value from its source, see set()
+
+        Returns:
+            int: Invalidations so far
+        """
+        with self.lock:
+            return self.invalidations
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        token: Optional[int] = None,
+    ) -> bool:
+        """
+        Cache a value
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to cache
+            ttl (float): Seconds to keep it, defaults to the cache's ttl
+            token (int): token() taken before the value was read, the value is
+                skipped if the key was invalidated since
+
+        Returns:
+            bool: True if the value was cached
+        """
+        with self.lock:
+            if token is not None and token < self.invalidated.get(
+                key, self.invalidated_floor
+            ):
+                return False
+
+            self.entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+            return True
+
+    def invalidate(self, key: Hashable):
+        """
+        Drop one cached value, reads that started before it will not cache theirs
+
+        Args:
+            key (Hashable): Cache key
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+            self.invalidations += 1
+            self.invalidated[key] = self.invalidations
+            self.invalidated.move_to_end(key)
+
+            while len(self.invalidated) > self.maxsize:
+                _, self.invalidated_floor = self.invalidated.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every cached value
+        """
+        with self.lock:
+            self.entries.clear()
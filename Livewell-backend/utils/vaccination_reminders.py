@@ -0,0 +1,159 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+from firebase_admin import messaging
+from utils.supabase_config import init_supabase
+from utils.notification_outbox import notification_outbox
+from utils.device_tokens import get_tokens_for_users
+
+logger = logging.getLogger(__name__)
+
+# Init supabase admin
+supabase_admin = init_supabase()
+
+# Remind users about doses due within this many days
+REMINDER_DAYS_AHEAD = int(os.getenv("VACCINATION_REMINDER_DAYS", "7"))
+
+# Also remind about doses that became due this many days ago, e.g. a dose due
+# today that was logged after today's run
+REMINDER_DAYS_OVERDUE = int(os.getenv("VACCINATION_REMINDER_OVERDUE_DAYS", "1"))
+
+# Rows per page when reading due vaccinations
+PAGE_SIZE = 1000
+
+# Vaccination IDs per reminded_at update, the IDs go in the query string
+MARK_BATCH_SIZE = 100
+
+
+# ============================================================================
+# Functions
+# ============================================================================
+
+
+def get_due_vaccinations(since: str, until: str) -> List[dict]:
+    """
+    Get vaccinations not reminded about yet with next_dose_date in [since, until]
+
+    Args:
+        since (str): First due date, in YYYY-MM-DD format
+        until (str): Last due date, in YYYY-MM-DD format
+
+    Returns:
+        list: Vaccination rows (vac_id, user's id, name, next_dose_date)
+    """
+    rows = []
+    start = 0
+
+    while True:
+        result = (
+            supabase_admin.table("vaccinations")
+            .select("vac_id, id, name, next_dose_date")
+            .is_("reminded_at", "null")
+            .gte("next_dose_date", since)
+            .lte("next_dose_date", until)
+            .order("vac_id")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        )
+        rows.extend(result.data)
+
+        if len(result.data) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def mark_reminded(vac_ids: List[str]):
+    """
+    Record that these doses were reminded about, so later runs skip them
+
+    Args:
+        vac_ids (list): Vaccination IDs
+    """
+    reminded_at = datetime.now(timezone.utc).isoformat()
+
+    for i in range(0, len(vac_ids), MARK_BATCH_SIZE):
+        supabase_admin.table("vaccinations").update({"reminded_at": reminded_at}).in_(
+            "vac_id", vac_ids[i : i + MARK_BATCH_SIZE]
+        ).execute()
+
+
+def build_body(vaccinations: List[dict]) -> str:
+    """
+    Reminder text for one user's due vaccinations
+
+    Args:
+        vaccinations (list): The user's due vaccinations
+
+    Returns:
+        str: Notification body
+    """
+    if len(vaccinations) == 1:
+        vac = vaccinations[0]
+        return f"Your next dose of {vac['name']} is due on {vac['next_dose_date']}"
+
+    doses = ", ".join(
+        f"{vac['name']} ({vac['next_dose_date']})" for vac in vaccinations
+    )
+    return f"You have {len(vaccinations)} vaccinations due soon: {doses}"
+
+
+async def send_vaccination_reminders():
+    """
+    Daily job: remind users about vaccinations due in the next REMINDER_DAYS_AHEAD days.
+    Each dose is marked with reminded_at once its reminder is queued, editing its
+    next_dose_date clears the mark, so new and changed doses are picked up by the
+    next run. Doses of users without a device stay unmarked until they have one.
+    """
+    today = datetime.now()
+    since = (today - timedelta(days=REMINDER_DAYS_OVERDUE)).strftime("%Y-%m-%d")
+    until = (today + timedelta(days=REMINDER_DAYS_AHEAD)).strftime("%Y-%m-%d")
+
+    try:
+        due = await asyncio.to_thread(get_due_vaccinations, since, until)
+    except Exception as e:
+        logger.error(f"Failed to get due vaccinations: {e}")
+        return
+
+    # Group by user, one notification each
+    by_user = {}
+    for vac in due:
+        by_user.setdefault(vac["id"], []).append(vac)
+
+    try:
+        tokens = await asyncio.to_thread(get_tokens_for_users, list(by_user))
+    except Exception as e:
+        # Nothing is marked, the next run reminds about these doses
+        logger.error(f"Failed to get device tokens for vaccination reminders: {e}")
+        return
+
+    reminded = []
+
+    # One multicast per user covers all of their devices
+    for user_id, vaccinations in by_user.items():
+        if user_id not in tokens:
+            continue
+
+        notification_outbox.enqueue_multicast(
+            messaging.MulticastMessage(
+                data={
+                    "title": "Vaccination Reminder",
+                    "body": build_body(vaccinations),
+                    "type": "vaccination_reminder",
+                    "click_action": "FLUTTER_NOTIFICATION_CLICK",
+                },
+                tokens=tokens[user_id],
+            )
+        )
+        reminded.extend(vac["vac_id"] for vac in vaccinations)
+
+    try:
+        await asyncio.to_thread(mark_reminded, reminded)
+    except Exception as e:
+        logger.error(f"Failed to mark vaccinations as reminded: {e}")
+
+    logger.info(
+        f"Vaccination reminders: {len(reminded)} of {len(due)} due doses for "
+        f"{len(by_user)} users in [{since}, {until}]"
+    )